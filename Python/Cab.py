@@ -1,11 +1,15 @@
 # Zula In-Memory Cab Booking System
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
+from typing import List, Dict, Tuple, Optional
 import itertools
+import secrets
+import heapq
+import time
 
 # Base User Class
 class User(ABC):
+    __slots__ = ("id", "name", "password", "age", "gender")
     _id_counter = itertools.count(1)
 
     def __init__(self, name: str, password: str, age: int, gender: str):
@@ -20,11 +24,14 @@ class User(ABC):
         pass
 
 class Driver(User):
+    __slots__ = ("current_location", "is_available", "rest_flag", "rest_until", "total_trips", "total_fare", "ride_history")
+
     def __init__(self, name, password, age, gender):
         super().__init__(name, password, age, gender)
         self.current_location = None
         self.is_available = True
         self.rest_flag = False
+        self.rest_until: Optional[float] = None  # Timestamp when the current rest ends
         self.total_trips = 0
         self.total_fare = 0
         self.ride_history = []
@@ -33,6 +40,8 @@ class Driver(User):
         return "Driver"
 
 class Customer(User):
+    __slots__ = ("ride_history",)
+
     def __init__(self, name, password, age, gender):
         super().__init__(name, password, age, gender)
         self.ride_history = []
@@ -41,16 +50,21 @@ class Customer(User):
         return "Customer"
 
 class Admin(User):
+    __slots__ = ()
+
     def get_role(self):
         return "Admin"
 
 class Location:
+    __slots__ = ("id", "name", "distance")
+
     def __init__(self, name: str, distance: int):
         self.id = name.upper()
         self.name = name.upper()
         self.distance = distance
 
 class Cab:
+    __slots__ = ("id", "driver", "current_location", "total_trips", "total_fare", "total_commission", "ride_history")
     _id_counter = itertools.count(1)
 
     def __init__(self, driver: Driver):
@@ -59,9 +73,12 @@ class Cab:
         self.current_location = None
         self.total_trips = 0
         self.total_fare = 0
+        self.total_commission = 0  # Sum of zula_commission over this cab's rides
         self.ride_history = []
 
 class Ride:
+    __slots__ = ("source", "dest", "cab", "driver", "customer", "fare", "zula_commission")
+
     def __init__(self, source: Location, dest: Location, cab: Cab, fare: int, customer: Customer):
         self.source = source
         self.dest = dest
@@ -72,40 +89,67 @@ class Ride:
         self.zula_commission = int(fare * 0.3)
 
 class ZulaSystem:
-    def __init__(self):
+    REST_SECONDS = 60  # Rest after each trip; drivers are released automatically once it expires
+
+    def __init__(self, clock=None):
+        self.clock = clock or time.time  # Returns the current time in seconds
+        self.resting_drivers: List[Tuple[float, int, Driver]] = []  # Min-heap of (rest_until, driver id, driver)
         self.drivers: Dict[int, Driver] = {}
         self.customers: Dict[int, Customer] = {}
         self.admins: Dict[int, Admin] = {}
         self.locations: Dict[str, Location] = {}
         self.cabs: Dict[int, Cab] = {}
         self.location_to_cabs: Dict[str, List[int]] = {}
+        # Fleet-wide running totals, updated per ride so summaries never rescan history
+        self.total_trips = 0
+        self.total_fare = 0
+        self.total_commission = 0
+        # role -> name -> users with that name, so login never scans a whole role
+        self.users_by_name: Dict[str, Dict[str, List[User]]] = {"driver": {}, "customer": {}, "admin": {}}
+        self.sessions: Dict[str, User] = {}  # Session token -> logged in user
 
     def signup_user(self, role: str, name: str, password: str, age: int, gender: str):
         if role.lower() == "driver":
             driver = Driver(name, password, age, gender)
             self.drivers[driver.id] = driver
+            self._index_user("driver", driver)
             return driver
         elif role.lower() == "customer":
             customer = Customer(name, password, age, gender)
             self.customers[customer.id] = customer
+            self._index_user("customer", customer)
             return customer
         elif role.lower() == "admin":
             admin = Admin(name, password, age, gender)
             self.admins[admin.id] = admin
+            self._index_user("admin", admin)
             return admin
 
+    def _index_user(self, role: str, user: User):
+        self.users_by_name[role].setdefault(user.name, []).append(user)
+
     def login_user(self, role: str, name: str, password: str):
-        users = {
-            "driver": self.drivers,
-            "customer": self.customers,
-            "admin": self.admins
-        }.get(role.lower())
-
-        for user in users.values():
-            if user.name == name and user.password == password:
+        users = self.users_by_name.get(role.lower(), {})
+        for user in users.get(name, []):  # Only users sharing this name, usually one
+            if user.password == password:
                 return user
         return None
 
+    def login_session(self, role: str, name: str, password: str) -> Optional[str]:
+        # Returns a token that later calls can pass to get_session_user instead of credentials
+        user = self.login_user(role, name, password)
+        if not user:
+            return None
+        token = secrets.token_hex(16)
+        self.sessions[token] = user
+        return token
+
+    def get_session_user(self, token: str) -> Optional[User]:
+        return self.sessions.get(token)
+
+    def logout(self, token: str):
+        self.sessions.pop(token, None)
+
     def add_location(self, name: str, distance: int):
         loc = Location(name, distance)
         self.locations[loc.name] = loc
@@ -155,6 +199,7 @@ class ZulaSystem:
             print("Invalid location")
             return
 
+        self.reset_driver_rest_flags()  # Release drivers whose rest has expired
         available_cabs = []
         for cab_id in self.location_to_cabs.get(source.upper(), []):
             cab = self.cabs[cab_id]
@@ -172,21 +217,31 @@ class ZulaSystem:
             cab.ride_history.append(ride)
             cab.total_fare += fare
             cab.total_trips += 1
+            cab.total_commission += ride.zula_commission
+            self.total_trips += 1
+            self.total_fare += fare
+            self.total_commission += ride.zula_commission
             cab.current_location = dst.name
             customer.ride_history.append(ride)
             cab.driver.ride_history.append(ride)
             cab.driver.total_fare += fare
             cab.driver.total_trips += 1
             cab.driver.rest_flag = True
+            cab.driver.rest_until = self.clock() + self.REST_SECONDS
+            heapq.heappush(self.resting_drivers, (cab.driver.rest_until, cab.driver.id, cab.driver))
             cab.driver.is_available = False
             cab.driver.current_location = dst.name
             return ride
         print("No cab available")
 
     def reset_driver_rest_flags(self):
-        for driver in self.drivers.values():
-            if driver.rest_flag:
+        # Pops only the rests that have expired instead of scanning every driver
+        now = self.clock()
+        while self.resting_drivers and self.resting_drivers[0][0] <= now:
+            rest_until, _, driver = heapq.heappop(self.resting_drivers)
+            if driver.rest_flag and driver.rest_until == rest_until:  # Skip entries superseded by a newer rest
                 driver.rest_flag = False
+                driver.rest_until = None
                 driver.is_available = True
 
     def view_customer_history(self, customer: Customer):
@@ -202,11 +257,12 @@ class ZulaSystem:
                 print(f"{ride.source.name} -> {ride.dest.name} | Cab: {ride.cab.id} | Fare: {ride.fare} | Commission: {ride.zula_commission}")
 
     def admin_cab_summary(self):
+        print(f"Fleet: {self.total_trips} trips | Fare: {self.total_fare} | Commission: {self.total_commission}")
         for cab in self.cabs.values():
             print(f"\nCab ID: {cab.id}")
             print(f"Total Trips: {cab.total_trips}")
             print(f"Total Fare: {cab.total_fare}")
-            print(f"Total Commission: {int(cab.total_fare * 0.3)}")
+            print(f"Total Commission: {cab.total_commission}")
             for ride in cab.ride_history:
                 print(f"{ride.source.name} -> {ride.dest.name} | Fare: {ride.fare} | Customer: {ride.customer.name}")
 
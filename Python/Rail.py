@@ -4,6 +4,8 @@ import datetime
 # Train Class
 # ------------------------
 class Train:
+    __slots__ = ("train_no", "name", "source", "destination", "total_seats", "available_seats")  # No per-instance __dict__
+
     def __init__(self, train_no, name, source, destination, seats):
         self.train_no = train_no
         self.name = name
@@ -31,6 +33,8 @@ class Train:
 # User Class
 # ------------------------
 class User:
+    __slots__ = ("username", "password", "tickets")
+
     def __init__(self, username, password):
         self.username = username
         self.password = password
@@ -65,6 +69,7 @@ class User:
 # Ticket Class
 # ------------------------
 class Ticket:
+    __slots__ = ("ticket_id", "user", "train", "booking_time")
     ticket_counter = 1
 
     def __init__(self, user, train):
@@ -58,6 +58,7 @@ class ZulaSystem:
         self.locations = {}
         self.location_cabs = defaultdict(list)
         self.cabs = {}
+        self.skipping_drivers = set()  # Drivers with skip_next set, so resets don't scan every driver
         self.rides = []
         self.next_user_id = 1
         self.next_location_id = 1
@@ -119,9 +120,9 @@ class ZulaSystem:
         distance = abs(dest.distance - source.distance)
         fare = distance * 10
 
-        available_cabs = [cab for cab in self.cabs.values()
-                          if cab.location.name == source_name and
-                          cab.driver.is_available and not cab.driver.skip_next]
+        # Only the cabs parked at the source can be offered, so look there instead of scanning the fleet
+        available_cabs = [self.cabs[cab_id] for cab_id in self.location_cabs[source_name]
+                          if self.cabs[cab_id].driver.is_available and not self.cabs[cab_id].driver.skip_next]
 
         if not available_cabs:
             print("No cabs available at this location.")
@@ -138,6 +139,7 @@ class ZulaSystem:
         driver.total_fare += fare
         driver.total_trips += 1
         driver.skip_next = True
+        self.skipping_drivers.add(driver)
         driver.ride_history.append(ride)
         driver.is_available = False
 
@@ -148,9 +150,9 @@ class ZulaSystem:
         selected_cab.location = dest
         driver.is_available = True
 
-        for drv in self.drivers.values():
-            if drv.skip_next:
-                drv.skip_next = False
+        for drv in self.skipping_drivers:
+            drv.skip_next = False
+        self.skipping_drivers.clear()
 
         return ride
 
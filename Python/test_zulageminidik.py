@@ -0,0 +1,311 @@
+import itertools
+import math
+import os
+import random
+import tempfile
+import unittest
+
+from zulageminidik import ContractionHierarchy, Graph, SQLiteStore, VirtualClock, ZulaSystem, solve_assignment
+
+
+def random_city(seed, nodes=30, roads=80, stretch=(1.0, 1.5), placed_share=1.0):
+    """
+    A random road network with node positions. Road length is the straight-line distance
+    times a factor drawn from `stretch`; a factor below 1 makes roads shorter than the straight line.
+    Returns (graph, positions), with coordinates set on a `placed_share` fraction of the nodes.
+    """
+    rng = random.Random(seed)
+    positions = {node: (rng.uniform(0, 100), rng.uniform(0, 100)) for node in range(1, nodes + 1)}
+    graph = Graph()
+    for _ in range(roads):
+        a, b = rng.sample(sorted(positions), 2)
+        graph.add_edge(a, b, round(math.dist(positions[a], positions[b]) * rng.uniform(*stretch), 3))
+    for node in graph.adj_list:
+        if rng.random() < placed_share:
+            graph.set_coordinates(node, *positions[node])
+    return graph, positions
+
+
+class AStarTest(unittest.TestCase):
+    def assert_matches_dijkstra(self, graph):
+        for start in graph.adj_list:
+            distances, _ = graph.get_shortest_distances(start)
+            for end in graph.adj_list:
+                distance, path = graph.get_shortest_path(start, end)
+                self.assertAlmostEqual(distance, distances[end], msg=f"{start} -> {end}")
+                if path:
+                    self.assertEqual((path[0], path[-1]), (start, end))
+
+    def test_straight_line_heuristic(self):
+        for seed in range(5):
+            self.assert_matches_dijkstra(random_city(seed)[0])
+
+    def test_partial_coordinates(self):
+        for seed in range(5):
+            self.assert_matches_dijkstra(random_city(seed, placed_share=0.6)[0])
+
+    def test_roads_shorter_than_straight_line(self):
+        for seed in range(5):
+            graph, _ = random_city(seed, stretch=(0.2, 1.5))
+            self.assertFalse(graph._check_straight_line())
+            self.assert_matches_dijkstra(graph)
+
+    def test_landmarks_with_coordinates(self):
+        for seed in range(5):
+            graph, _ = random_city(seed, stretch=(0.5, 1.5), placed_share=0.8)
+            graph.enable_landmarks(4)
+            self.assert_matches_dijkstra(graph)
+
+    def test_short_road_added_after_coordinates(self):
+        graph, positions = random_city(1)
+        graph.get_shortest_path(1, 2) # Caches the straight-line check
+        self.assertTrue(graph._straight_line_usable)
+        graph.add_edge(1, 2, 0.5 * math.dist(positions[1], positions[2]))
+        self.assert_matches_dijkstra(graph)
+
+
+class AssignmentTest(unittest.TestCase):
+    def test_matches_brute_force(self):
+        rng = random.Random(8)
+        for _ in range(200):
+            rows, columns = rng.randint(1, 4), rng.randint(1, 6)
+            rows = min(rows, columns)
+            costs = [[rng.choice([rng.randint(0, 20), rng.uniform(0, 20)]) for _ in range(columns)] for _ in range(rows)]
+            assignment = solve_assignment(costs)
+            self.assertEqual(len(set(assignment)), rows) # Each row gets its own column
+            best = min(sum(costs[row][column] for row, column in enumerate(choice))
+                       for choice in itertools.permutations(range(columns), rows))
+            self.assertAlmostEqual(sum(costs[row][column] for row, column in enumerate(assignment)), best)
+
+    def test_more_rows_than_columns(self):
+        with self.assertRaises(ValueError):
+            solve_assignment([[1], [2]])
+
+
+class ContractionHierarchyTest(unittest.TestCase):
+    def test_matches_dijkstra(self):
+        for seed in range(6):
+            graph, _ = random_city(seed, nodes=40, roads=90)
+            hierarchy = ContractionHierarchy.build(graph)
+            for start in graph.adj_list:
+                distances, _ = graph.get_shortest_distances(start)
+                for end in graph.adj_list:
+                    distance, path = hierarchy.get_shortest_path(start, end)
+                    self.assertAlmostEqual(distance, distances[end], msg=f"seed {seed}: {start} -> {end}")
+                    if path:
+                        self.assertEqual((path[0], path[-1]), (start, end))
+                        # The unpacked path is a real route of the returned length
+                        length = sum(min(weight for neighbor, weight in graph.adj_list[a] if neighbor == b)
+                                     for a, b in zip(path, path[1:]))
+                        self.assertAlmostEqual(length, distance)
+
+    def test_saved_index_only_matches_its_own_graph(self):
+        graph = Graph()
+        graph.add_edge(1, 2, 3)
+        graph.add_edge(2, 3, 4)
+        # Same node count, edge count and weight total, different roads
+        swapped = Graph()
+        swapped.add_edge(1, 2, 4)
+        swapped.add_edge(2, 3, 3)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "ch.json")
+            ContractionHierarchy.build(graph).save(path)
+            loaded = ContractionHierarchy.load(path)
+        self.assertEqual(loaded.fingerprint, ContractionHierarchy.graph_fingerprint(graph))
+        self.assertNotEqual(loaded.fingerprint, ContractionHierarchy.graph_fingerprint(swapped))
+        self.assertEqual(loaded.get_shortest_path(1, 3), (7, [1, 2, 3]))
+
+
+def busy_session(zula, clock):
+    """Books and completes a ride, signs up, moves a cab, adds a road, and leaves one ride on the road."""
+    admin_id = next(iter(zula.admins))
+    customer_ids = list(zula.customers)
+    zula.hail_cab(customer_ids[0], "A", "G")
+    clock.advance(3600)
+    zula.run_pending_events()
+    zula.signup("customer", "newcomer", "pw", 25, "F")
+    zula.admin_update_cab_location(admin_id, next(iter(zula.cabs)), "X")
+    zula.add_location_to_system(admin_id, "Y")
+    zula.add_road_connection("Y", "X", 4)
+    ride = zula.hail_cab(customer_ids[1], "P", "C")
+    assert ride.id in zula.active_rides
+    return ride
+
+
+def comparable_state(zula):
+    """
+    A system's snapshot data minus scheduler bookkeeping: replay re-schedules events whose outcome
+    was journaled too, and those fire as no-ops, so only events that still matter are compared.
+    """
+    state = zula.to_snapshot()
+    active = {record["id"] for record in state["active_rides"]}
+    rest_until = {driver[0]: driver[7] for driver in state["drivers"]}
+    state["events"] = sorted((due, name, args) for due, _, name, args in state["events"]
+                             if (name == "complete_ride" and args[0] in active)
+                             or (name == "_end_rest_if_due" and rest_until.get(args[0]) == args[1]))
+    del state["event_sequence"]
+    return state
+
+
+class StateJournalTest(unittest.TestCase):
+    def setUp(self):
+        temporary = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary.cleanup)
+        self.directory = temporary.name
+        self.clock = VirtualClock()
+
+    def open(self, **kwargs):
+        return ZulaSystem.open_persistent(self.directory, clock=self.clock.now, quiet=True, **kwargs)
+
+    def assert_reopens_identically(self, zula, **kwargs):
+        expected = comparable_state(zula)
+        zula.journal.close()
+        reopened = self.open(**kwargs)
+        self.assertEqual(comparable_state(reopened), expected)
+        return reopened
+
+    def test_replay_log_tail_with_active_ride(self):
+        zula = self.open()
+        ride = busy_session(zula, self.clock)
+        reopened = self.assert_reopens_identically(zula)
+        self.assertFalse(reopened.cabs[ride.cab_id].is_available)
+        # The restored ride still completes on schedule
+        self.clock.advance(3600)
+        reopened.run_pending_events()
+        self.assertNotIn(ride.id, reopened.active_rides)
+        self.assertTrue(reopened.cabs[ride.cab_id].is_available)
+
+    def test_snapshot_with_active_ride(self):
+        zula = self.open(snapshot_every=1) # Every mutation is followed by a snapshot
+        ride = busy_session(zula, self.clock)
+        with open(zula.journal.log_path) as f:
+            self.assertEqual(f.read(), "") # Nothing left to replay: state comes from the snapshot alone
+        reopened = self.assert_reopens_identically(zula)
+        self.assertEqual(reopened.active_rides[ride.id].path, ride.path)
+
+    def test_torn_final_record_is_ignored(self):
+        zula = self.open()
+        busy_session(zula, self.clock)
+        expected = comparable_state(zula)
+        zula.journal.close()
+        with open(zula.journal.log_path, "a") as f:
+            f.write('{"seq": 999, "op": "sign')
+        self.assertEqual(comparable_state(self.open()), expected)
+
+
+class SQLiteStoreTest(unittest.TestCase):
+    # Reloading rebuilds the cab index and scheduler in load order and starts a new graph version, so those are left out
+    RESTORED = ("counters", "locations", "adjacency", "coordinates", "customers", "drivers",
+                "admins", "cabs", "cabs_by_driver", "unavailable_drivers", "rides", "active_rides")
+
+    def setUp(self):
+        temporary = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary.cleanup)
+        self.path = os.path.join(temporary.name, "zula.db")
+        self.clock = VirtualClock()
+
+    def open(self, **kwargs):
+        zula = ZulaSystem(store=SQLiteStore(self.path, **kwargs), clock=self.clock.now, quiet=True)
+        self.addCleanup(zula.store.conn.close)
+        return zula
+
+    def restored_state(self, zula):
+        state = zula.to_snapshot()
+        restored = {key: state[key] for key in self.RESTORED}
+        restored["credentials"] = sorted(state["credentials"])
+        return restored
+
+    def test_reopen_restores_state(self):
+        zula = self.open()
+        ride = busy_session(zula, self.clock)
+        expected = self.restored_state(zula)
+        zula.store.close()
+        reopened = self.open()
+        self.assertEqual(self.restored_state(reopened), expected)
+        self.assertFalse(reopened.cabs[ride.cab_id].is_available)
+        self.clock.advance(3600)
+        reopened.run_pending_events()
+        self.assertNotIn(ride.id, reopened.active_rides)
+        self.assertEqual([r.id for r in reopened.store.rides_for_driver(ride.driver_id)][-1], ride.id)
+
+    def test_crash_before_batch_commit(self):
+        zula = self.open(batch_size=100, max_batch_seconds=3600)
+        customer_id = next(iter(zula.customers))
+        ride = zula.hail_cab(customer_id, "A", "G")
+        trips = zula.cab_drivers[ride.driver_id].total_trips
+        self.clock.current_time = ride.end_time # The ride is over, its driver's rest is not
+        zula.run_pending_events()
+        self.assertTrue(zula.store.pending) # Completed, but its batch has not committed yet
+        zula.store.conn.close() # Crash: the queued batch is lost
+        reopened = self.open()
+        self.assertIn(ride.id, reopened.active_rides) # Booked rides were committed at once
+        reopened.run_pending_events()
+        self.assertNotIn(ride.id, reopened.active_rides)
+        reopened.store.flush()
+        self.assertEqual([r.id for r in reopened.store.rides_for_customer(customer_id)], [ride.id]) # Completed exactly once
+        self.assertEqual(reopened.cab_drivers[ride.driver_id].total_trips, trips + 1)
+
+
+class BulkImportTest(unittest.TestCase):
+    def setUp(self):
+        temporary = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary.cleanup)
+        self.directory = temporary.name
+        self.zula = ZulaSystem(quiet=True)
+
+    def write(self, name, text):
+        path = os.path.join(self.directory, name)
+        with open(path, "w", newline="") as f:
+            f.write(text)
+        return path
+
+    def test_locations_skip_counts(self):
+        path = self.write("locations.csv", "name,x,y\n"
+                                           "North,1,2\n"
+                                           "South,,\n" # No coordinates is fine
+                                           "East,nan,3\n"
+                                           "West,1,abc\n"
+                                           "North,5,5\n" # Duplicate name
+                                           "A,0,0\n" # Clashes with an existing location
+                                           ",1,1\n")
+        self.assertEqual(self.zula.load_locations(path), (2, 5))
+        self.assertNotIn("East", self.zula.location_names_to_ids) # Nothing half-added from a bad row
+
+    def test_roads_skip_counts(self):
+        path = self.write("roads.csv", "from,to,distance\n"
+                                       "A,B,4\n"
+                                       "A,C,2.5\n"
+                                       "A,B,ten\n"
+                                       "A,B,inf\n"
+                                       "A,B,0\n"
+                                       "A,Nowhere,3\n"
+                                       "A,B\n") # Missing column
+        edges = sum(len(neighbors) for neighbors in self.zula.location_graph.adj_list.values())
+        self.assertEqual(self.zula.load_roads(path), (2, 5))
+        self.assertEqual(sum(len(neighbors) for neighbors in self.zula.location_graph.adj_list.values()), edges + 4)
+
+    def test_drivers_skip_counts(self):
+        cabs = len(self.zula.cabs)
+        path = self.write("drivers.jsonl", '{"name": "d1", "password": "p", "age": 30, "gender": "M", "location": "A"}\n'
+                                           '{"name": "d2", "password": "p", "age": "", "gender": "F", "location": "A"}\n'
+                                           '{"name": "d3", "password": "p", "age": 30, "gender": "F", "location": "Nowhere"}\n'
+                                           '{"name": "d4", "password": "p", "age": 30, "location": "A"}\n'
+                                           '{"name": "d5", "password": "p", "age": 3\n' # Torn JSON line
+                                           '\n'
+                                           '[1, 2, 3]\n'
+                                           '{"name": "d1", "password": "p", "age": 41, "gender": "M", "location": "B"}\n')
+        self.assertEqual(self.zula.load_drivers(path), (1, 6))
+        self.assertEqual(len(self.zula.cabs), cabs + 1)
+
+    def test_customers_skip_counts(self):
+        path = self.write("customers.csv", "name,password,age,gender\n"
+                                           "c1,p,20,F\n"
+                                           "c2,p,,M\n"
+                                           "c3,p,twenty,M\n"
+                                           "c4,p\n"
+                                           "c1,p,22,F\n")
+        self.assertEqual(self.zula.load_customers(path), (1, 4))
+
+
+if __name__ == "__main__":
+    unittest.main()
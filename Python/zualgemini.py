@@ -1,7 +1,13 @@
 import datetime
 import random
+import heapq
+import bisect
+
+from zula_events import VirtualClock, EventScheduler
 
 class User:
+    __slots__ = ("id", "name", "password", "age", "gender")  # No per-instance __dict__
+
     def __init__(self, id, name, password, age, gender):
         self.id = id
         self.name = name
@@ -16,6 +22,8 @@ class User:
         return f"User(ID: {self.id}, Name: {self.name}, Type: {self.__class__.__name__})"
     
 class Customer(User):
+    __slots__ = ("trip_history",)
+
     def __init__(self, id, name, password, age, gender):
         super().__init__(id, name, password, age, gender)
         self.trip_history = []  # List of Ride objects
@@ -27,10 +35,13 @@ class Customer(User):
     # Customer object will interact with ZulaSystem for these actions.
 
 class Driver(User):
+    __slots__ = ("current_location_id", "is_on_rest", "rest_until", "total_trips", "total_fare_earned", "total_commission_earned", "trip_history")
+
     def __init__(self, id, name, password, age, gender, current_location_id):
         super().__init__(id, name, password, age, gender)
         self.current_location_id = current_location_id  # Store location ID
         self.is_on_rest = False
+        self.rest_until = None  # When the current rest ends (datetime), None if not resting
         self.total_trips = 0
         self.total_fare_earned = 0.0
         self.total_commission_earned = 0.0 # Commission for driver from Zula
@@ -59,6 +70,8 @@ class Driver(User):
         }
 
 class Admin(User):
+    __slots__ = ()
+
     def __init__(self, id, name, password, age, gender):
         super().__init__(id, name, password, age, gender)
 
@@ -66,6 +79,8 @@ class Admin(User):
     # will be methods within the ZulaSystem, called by an Admin instance.
 
 class Location:
+    __slots__ = ("id", "name", "distance_from_origin")
+
     def __init__(self, id, name, distance_from_origin):
         self.id = id
         self.name = name
@@ -75,6 +90,8 @@ class Location:
         return f"Location(ID: {self.id}, Name: {self.name}, Dist: {self.distance_from_origin})"
 
 class Cab:
+    __slots__ = ("id", "current_location_id", "driver_id", "is_available")
+
     def __init__(self, id, current_location_id, driver_id):
         self.id = id
         self.current_location_id = current_location_id
@@ -91,6 +108,8 @@ class Cab:
         return f"Cab(ID: {self.id}, Location: {self.current_location_id}, Driver: {self.driver_id}, Available: {self.is_available})"
 
 class Ride:
+    __slots__ = ("id", "customer_id", "driver_id", "cab_id", "source", "destination", "fare", "zula_commission", "start_time", "end_time")
+
     def __init__(self, id, customer_id, driver_id, cab_id, source, destination, fare, zula_commission, start_time, end_time):
         self.id = id
         self.customer_id = customer_id
@@ -107,11 +126,79 @@ class Ride:
         return (f"Ride(ID: {self.id}, From: {self.source.name} to {self.destination.name}, "
                 f"Cab ID: {self.cab_id}, Fare: {self.fare:.2f})")
 
-import time
 import math
 
-class ZulaSystem:
+class CabPositionIndex:
+    # Locations sorted by distance_from_origin, each with a bucket of cabs that can be hailed right now
+    # (cab free and driver not on rest). Nearest cabs come from walking outward from the pickup offset.
     def __init__(self):
+        self.offsets = [] # Sorted distance_from_origin values, one per location
+        self.location_ids = [] # Location ids, aligned with self.offsets
+        self.available_at = {} # {location_id: {cab_id: None}} - dict used as an insertion-ordered set
+        self.cab_positions = {} # {cab_id: location_id} for available cabs only
+
+    def add_location(self, location_id, offset):
+        i = bisect.bisect_right(self.offsets, offset)
+        self.offsets.insert(i, offset)
+        self.location_ids.insert(i, location_id)
+
+    def remove_location(self, location_id, offset):
+        i = bisect.bisect_left(self.offsets, offset)
+        while i < len(self.offsets) and self.offsets[i] == offset: # Several locations can share an offset
+            if self.location_ids[i] == location_id:
+                del self.offsets[i]
+                del self.location_ids[i]
+                break
+            i += 1
+
+    def move_location(self, location_id, old_offset, new_offset):
+        # Repositions a location; cabs waiting there stay in its bucket
+        self.remove_location(location_id, old_offset)
+        self.add_location(location_id, new_offset)
+
+    def set_available(self, cab_id, location_id, available):
+        old_location_id = self.cab_positions.pop(cab_id, None)
+        if old_location_id is not None:
+            bucket = self.available_at[old_location_id]
+            del bucket[cab_id]
+            if not bucket:
+                del self.available_at[old_location_id] # Clean up empty bucket
+        if available:
+            self.cab_positions[cab_id] = location_id
+            self.available_at.setdefault(location_id, {})[cab_id] = None
+
+    def move_cab(self, cab_id, new_location_id):
+        # Keeps an available cab's bucket in step with its location; unavailable cabs are not tracked
+        if cab_id in self.cab_positions:
+            self.set_available(cab_id, new_location_id, True)
+
+    def nearest_available(self, offset, limit=None):
+        # Returns [(cab_id, location_id, distance)] in distance order: at least `limit` cabs (all if None),
+        # plus every other cab tied with the farthest one so callers can break ties fairly
+        matches = []
+        lo = bisect.bisect_left(self.offsets, offset) - 1
+        hi = lo + 1
+        while lo >= 0 or hi < len(self.offsets):
+            lo_distance = offset - self.offsets[lo] if lo >= 0 else float('inf')
+            hi_distance = self.offsets[hi] - offset if hi < len(self.offsets) else float('inf')
+            if lo_distance <= hi_distance:
+                location_id, distance = self.location_ids[lo], lo_distance
+                lo -= 1
+            else:
+                location_id, distance = self.location_ids[hi], hi_distance
+                hi += 1
+            if limit is not None and len(matches) >= limit and distance > matches[-1][2]:
+                break
+            for cab_id in self.available_at.get(location_id, ()):
+                matches.append((cab_id, location_id, distance))
+        return matches
+
+class ZulaSystem:
+    TRIP_DURATION_SECONDS = 1 # Simulated duration of every trip
+    MAX_RECOMMENDED_CABS = 5 # Cabs offered per hail
+    DRIVER_REST_SECONDS = 60 # Rest after each trip; ends automatically via the scheduler
+
+    def __init__(self, clock=None):
         self.next_user_id = 1
         self.next_location_id = 1
         self.next_cab_id = 1
@@ -124,12 +211,22 @@ class ZulaSystem:
         self.users_by_credentials = {}  # {(name, password): user_id}
 
         self.locations = {}  # {location_id: Location object}
+        self.location_names_to_ids = {}  # {location_name: location_id} for quick lookup by name
         self.cabs = {}  # {cab_id: Cab object}
+        self.cabs_by_driver = {}  # {driver_id: cab_id} - each driver has at most one cab
         # {location_id: [cab_id1, cab_id2, ...]}
         self.cab_locations = {}
+        self.cab_positions = CabPositionIndex() # Available cabs by position on the line
         # {driver_id: True/False} True if on rest
         self.unavailable_drivers = set()
         self.rides_history = {}  # {ride_id: Ride object}
+        self.total_fare = 0.0  # Running totals over rides_history, updated as rides complete
+        self.total_zula_commission = 0.0
+        self.active_rides = {}  # {ride_id: Ride object} - booked, not yet completed
+
+        # Trips complete as scheduled events rather than blocking on time.sleep
+        self.clock = clock or datetime.datetime.now
+        self.scheduler = EventScheduler(self.clock)
 
         self.initialize_data() # Initialize with some dummy data
 
@@ -177,10 +274,8 @@ class ZulaSystem:
 
     # Helper to get location by name
     def _get_location_by_name(self, name):
-        for loc_id, loc_obj in self.locations.items():
-            if loc_obj.name == name:
-                return loc_obj
-        return None
+        location_id = self.location_names_to_ids.get(name)
+        return self.locations.get(location_id) if location_id is not None else None
 
     # Task 2: Login / Sign Up
     def signup(self, user_type, name, password, age, gender, initial_location_name=None):
@@ -210,9 +305,11 @@ class ZulaSystem:
             cab_id = self._generate_id("cab")
             cab = Cab(cab_id, location_obj.id, user_id)
             self.cabs[cab_id] = cab
+            self.cabs_by_driver[user_id] = cab_id
             if location_obj.id not in self.cab_locations:
                 self.cab_locations[location_obj.id] = []
             self.cab_locations[location_obj.id].append(cab_id)
+            self._refresh_cab_availability(cab)
             print(f"Cab {cab_id} assigned to driver {user.name} at {location_obj.name}.")
         elif user_type == "admin":
             user = Admin(user_id, name, password, age, gender)
@@ -265,6 +362,10 @@ class ZulaSystem:
     def get_cab_by_id(self, cab_id):
         return self.cabs.get(cab_id)
 
+    def get_cab_for_driver(self, driver_id):
+        cab_id = self.cabs_by_driver.get(driver_id)
+        return self.cabs.get(cab_id) if cab_id is not None else None
+
     def get_location_name(self, location_id):
         loc = self.get_location_by_id(location_id)
         return loc.name if loc else "Unknown Location"
@@ -288,37 +389,28 @@ class ZulaSystem:
         fare = distance * 10
         return fare
 
-    def get_closest_available_driver_info(self, source_location_id):
+    def get_closest_available_driver_info(self, source_location_id, limit=None):
         source_loc = self.get_location_by_id(source_location_id)
         if not source_loc:
             print("Error: Source location not found.")
             return []
 
+        # The position index only holds free cabs whose drivers are not on rest (Task 3),
+        # so this walks outward from the pickup and stops once `limit` cabs are found
         available_cabs_info = []
-        for loc_id, cab_ids_at_loc in self.cab_locations.items():
-            location_obj = self.get_location_by_id(loc_id)
-            if not location_obj:
-                continue
-
-            for cab_id in cab_ids_at_loc:
-                cab = self.get_cab_by_id(cab_id)
-                if not cab or not cab.is_available:
-                    continue
-
-                driver = self.get_driver_by_id(cab.driver_id)
-                # Task 3: Driver rest
-                if driver and not driver.is_on_rest:
-                    distance_to_pickup = abs(source_loc.distance_from_origin - location_obj.distance_from_origin)
-                    available_cabs_info.append({
-                        "cab_id": cab.id,
-                        "driver_id": driver.id,
-                        "current_location_id": loc_id,
-                        "distance_to_pickup": distance_to_pickup
-                    })
+        for cab_id, loc_id, distance_to_pickup in self.cab_positions.nearest_available(source_loc.distance_from_origin, limit):
+            available_cabs_info.append({
+                "cab_id": cab_id,
+                "driver_id": self.cabs[cab_id].driver_id,
+                "current_location_id": loc_id,
+                "distance_to_pickup": distance_to_pickup
+            })
 
         # Sort by distance to pickup, then by driver's total trips for fair allocation (Task 8)
         available_cabs_info.sort(key=lambda x: (x["distance_to_pickup"], self.cab_drivers[x["driver_id"]].total_trips))
 
+        if limit is not None:
+            available_cabs_info = available_cabs_info[:limit]
         return available_cabs_info
 
     def hail_cab(self, customer_id, source_location_name, destination_location_name):
@@ -327,6 +419,8 @@ class ZulaSystem:
             print("Error: Customer not found.")
             return None
 
+        self.run_pending_events() # Release cabs whose trips have already finished
+
         source_loc = self._get_location_by_name(source_location_name)
         dest_loc = self._get_location_by_name(destination_location_name)
         if not source_loc:
@@ -342,7 +436,7 @@ class ZulaSystem:
             return None
 
         recommended_cabs_info = []
-        closest_drivers_info = self.get_closest_available_driver_info(source_loc.id)
+        closest_drivers_info = self.get_closest_available_driver_info(source_loc.id, limit=self.MAX_RECOMMENDED_CABS)
 
         print("\nRecommended Cabs:")
         print("--------------------------------------------------")
@@ -399,34 +493,90 @@ class ZulaSystem:
         fare = self.calculate_fare(source_id, destination_id)
         zula_commission = fare * 0.30  # Task 6: Zula's 30% commission
 
-        start_time = datetime.datetime.now()
-        # Simulate travel time
-        time.sleep(1)
-        end_time = datetime.datetime.now()
+        start_time = self.clock()
+        # Simulate travel time with a scheduled completion instead of blocking
+        end_time = start_time + datetime.timedelta(seconds=self.TRIP_DURATION_SECONDS)
 
         ride_id = self._generate_id("ride")
         ride = Ride(ride_id, customer_id, driver_id, cab_id, source_loc, dest_loc, fare, zula_commission, start_time, end_time)
-        self.rides_history[ride_id] = ride
-
-        # Update driver and cab status
-        driver.complete_ride(ride)
-        cab.set_location(destination_id) # Cab moves to destination
-        cab.set_availability(True) # Cab is available after dropping off
-        self.unavailable_drivers.add(driver.id) # Driver on rest (Task 3)
-
-        # Update cab_locations mapping
-        self.update_cab_location_in_memory(cab_id, source_id, destination_id)
+        self.active_rides[ride_id] = ride
 
-        customer.trip_history.append(ride)
+        cab.set_availability(False) # Cab is on the road until the trip completes
+        self._refresh_cab_availability(cab)
+        self.scheduler.schedule(end_time, self.complete_ride, ride_id)
 
-        print(f"\nRide completed! Ride ID: {ride.id}")
+        print(f"\nRide booked! Ride ID: {ride.id}")
         print(f"  From: {source_loc.name} to {dest_loc.name}")
         print(f"  Cab ID: {cab_id}, Driver: {driver.name}")
         print(f"  Fare: ${fare:.2f}")
-        print(f"  Zula's Commission: ${zula_commission:.2f}")
-        print(f"  Driver {driver.name} is now on rest.")
+        print(f"  Expected arrival: {end_time.strftime('%H:%M:%S')}")
+        return ride
+
+    def complete_ride(self, ride_id):
+        ride = self.active_rides.pop(ride_id, None)
+        if not ride:
+            return None
+
+        driver = self.get_driver_by_id(ride.driver_id)
+        cab = self.get_cab_by_id(ride.cab_id)
+        customer = self.get_customer_by_id(ride.customer_id)
+        self.rides_history[ride_id] = ride
+        self.total_fare += ride.fare
+        self.total_zula_commission += ride.zula_commission
+
+        # Update driver and cab status
+        if driver:
+            driver.complete_ride(ride)
+            self.unavailable_drivers.add(driver.id) # Driver on rest (Task 3)
+            # Rest runs from the arrival time, even if this event fired late
+            driver.rest_until = ride.end_time + datetime.timedelta(seconds=self.DRIVER_REST_SECONDS)
+            self.scheduler.schedule(driver.rest_until, self._end_rest_if_due, driver.id, driver.rest_until)
+        if cab:
+            # Update cab_locations mapping (the cab started wherever it was hailed from, not at the pickup)
+            self.update_cab_location_in_memory(cab.id, cab.current_location_id, ride.destination.id)
+            cab.set_location(ride.destination.id) # Cab moves to destination
+            cab.set_availability(True) # Cab is available after dropping off
+            self._refresh_cab_availability(cab) # Stays out of the pool while the driver rests
+        if customer:
+            customer.trip_history.append(ride)
+
+        print(f"\nRide completed! Ride ID: {ride.id}")
+        print(f"  From: {ride.source.name} to {ride.destination.name}")
+        print(f"  Cab ID: {ride.cab_id}, Driver: {self.get_driver_name(ride.driver_id)}")
+        print(f"  Fare: ${ride.fare:.2f}")
+        print(f"  Zula's Commission: ${ride.zula_commission:.2f}")
+        if driver:
+            print(f"  Driver {driver.name} is now on rest until {driver.rest_until.strftime('%H:%M:%S')}.")
         return ride
 
+    def run_pending_events(self):
+        # Fires trip completions that are due on the system clock
+        return self.scheduler.run_due()
+
+    def _refresh_cab_availability(self, cab):
+        # A cab can be hailed only when it is free and its driver is not on rest
+        driver = self.get_driver_by_id(cab.driver_id)
+        available = cab.is_available and driver is not None and not driver.is_on_rest
+        self.cab_positions.set_available(cab.id, cab.current_location_id, available)
+
+    def _end_rest_if_due(self, driver_id, rest_until):
+        # Scheduled rest expiry; stale if the rest was ended early or replaced by a newer one
+        driver = self.get_driver_by_id(driver_id)
+        if driver and driver.rest_until == rest_until:
+            self.end_driver_rest(driver_id)
+
+    def end_driver_rest(self, driver_id):
+        driver = self.get_driver_by_id(driver_id)
+        if not driver or not driver.is_on_rest:
+            return False
+        driver.is_on_rest = False
+        driver.rest_until = None
+        self.unavailable_drivers.discard(driver_id)
+        cab = self.get_cab_for_driver(driver_id)
+        if cab:
+            self._refresh_cab_availability(cab)
+        return True
+
     # Task 5: View Customer History
     def view_customer_history(self, customer_id):
         customer = self.get_customer_by_id(customer_id)
@@ -449,10 +599,10 @@ class ZulaSystem:
 
     # Task 6: Zula's Commission (Integrated into process_ride and view_admin_summary)
     def view_zula_commission_summary(self):
-        total_zula_commission = sum(ride.zula_commission for ride in self.rides_history.values())
         print(f"\n--- Zula's Commission Summary ---")
-        print(f"Total Zula's Commission from all rides: ${total_zula_commission:.2f}")
-        return {"total_zula_commission": total_zula_commission}
+        print(f"Completed rides: {len(self.rides_history)}, Total fare: ${self.total_fare:.2f}")
+        print(f"Total Zula's Commission from all rides: ${self.total_zula_commission:.2f}")
+        return {"total_zula_commission": self.total_zula_commission, "total_rides": len(self.rides_history), "total_fare": self.total_fare}
 
     # Task 7: Admin - Redirect cabs
     def redirect_cabs(self, admin_id, source_location_name):
@@ -466,7 +616,8 @@ class ZulaSystem:
             print(f"Error: Location '{source_location_name}' not found.")
             return False
 
-        cabs_at_location = self.cab_locations.get(source_loc.id, [])
+        # Cabs on a ride finish at their drop-off, so only parked cabs count and can be moved
+        cabs_at_location = [cab_id for cab_id in self.cab_locations.get(source_loc.id, []) if self.cabs[cab_id].is_available]
         if len(cabs_at_location) <= 2:
             print(f"No more than 2 cabs at {source_loc.name}. No redirection needed.")
             return False
@@ -508,6 +659,7 @@ class ZulaSystem:
             self.cab_locations[new_location_id] = []
         if cab_id not in self.cab_locations[new_location_id]: # Avoid duplicates
             self.cab_locations[new_location_id].append(cab_id)
+        self.cab_positions.move_cab(cab_id, new_location_id)
 
     # Task 8: Allocate fairly to all drivers (integrated into get_closest_available_driver_info sorting)
     # The sorting prioritizes closer cabs, then those with fewer total trips.
@@ -525,10 +677,10 @@ class ZulaSystem:
             return False
 
         # Check if driver already has a cab
-        for cab in self.cabs.values():
-            if cab.driver_id == driver_id:
-                print(f"Error: Driver {driver.name} already has a cab (ID: {cab.id}).")
-                return False
+        cab = self.get_cab_for_driver(driver_id)
+        if cab:
+            print(f"Error: Driver {driver.name} already has a cab (ID: {cab.id}).")
+            return False
 
         location_obj = self._get_location_by_name(initial_location_name)
         if not location_obj:
@@ -538,10 +690,12 @@ class ZulaSystem:
         cab_id = self._generate_id("cab")
         cab = Cab(cab_id, location_obj.id, driver_id)
         self.cabs[cab_id] = cab
+        self.cabs_by_driver[driver_id] = cab_id
 
         if location_obj.id not in self.cab_locations:
             self.cab_locations[location_obj.id] = []
         self.cab_locations[location_obj.id].append(cab_id)
+        self._refresh_cab_availability(cab)
 
         driver.current_location_id = location_obj.id # Update driver's location
         print(f"Admin added Cab {cab_id} for driver {driver.name} at {location_obj.name}.")
@@ -564,8 +718,11 @@ class ZulaSystem:
             if not self.cab_locations[cab.current_location_id]:
                 del self.cab_locations[cab.current_location_id]
 
+        self.cab_positions.set_available(cab_id, None, False)
+
         # Remove from cabs dictionary
         del self.cabs[cab_id]
+        self.cabs_by_driver.pop(cab.driver_id, None)
 
         # Optionally, disassociate from driver (e.g., driver is now cab-less)
         driver = self.get_driver_by_id(cab.driver_id)
@@ -585,6 +742,10 @@ class ZulaSystem:
         if not cab:
             print(f"Error: Cab with ID {cab_id} not found.")
             return False
+        if not cab.is_available:
+            # complete_ride would put it at the drop-off anyway
+            print(f"Error: Cab {cab_id} is on a ride and can only be moved once it completes.")
+            return False
 
         new_location_obj = self._get_location_by_name(new_location_name)
         if not new_location_obj:
@@ -622,6 +783,8 @@ class ZulaSystem:
         location_id = self._generate_id("location")
         location = Location(location_id, name, distance_from_origin)
         self.locations[location_id] = location
+        self.location_names_to_ids[name] = location_id
+        self.cab_positions.add_location(location_id, distance_from_origin)
         self.cab_locations[location_id] = [] # Initialize empty list for cabs at this location
         print(f"Location '{name}' (ID: {location_id}) added.")
         return True
@@ -643,6 +806,8 @@ class ZulaSystem:
             return False
 
         del self.locations[location_obj.id]
+        del self.location_names_to_ids[location_obj.name]
+        self.cab_positions.remove_location(location_obj.id, location_obj.distance_from_origin)
         if location_obj.id in self.cab_locations:
             del self.cab_locations[location_obj.id] # Remove its entry
         print(f"Admin removed Location '{location_name}' (ID: {location_obj.id}).")
@@ -665,9 +830,12 @@ class ZulaSystem:
             if self._get_location_by_name(new_name):
                 print(f"Error: Location with new name '{new_name}' already exists.")
                 return False
+            del self.location_names_to_ids[location_obj.name]
+            self.location_names_to_ids[new_name] = location_obj.id
             location_obj.name = new_name
             updated = True
         if new_distance is not None and new_distance != location_obj.distance_from_origin:
+            self.cab_positions.move_location(location_obj.id, location_obj.distance_from_origin, new_distance)
             location_obj.distance_from_origin = new_distance
             updated = True
 
@@ -757,13 +925,9 @@ class ZulaSystem:
             return False
 
         # Remove associated cab if any
-        cab_to_remove = None
-        for cab_id, cab in self.cabs.items():
-            if cab.driver_id == driver_id:
-                cab_to_remove = cab_id
-                break
-        if cab_to_remove:
-            self.admin_remove_cab(admin_id, cab_to_remove)
+        cab = self.get_cab_for_driver(driver_id)
+        if cab:
+            self.admin_remove_cab(admin_id, cab.id)
 
         # Remove from users_by_credentials
         for (n, p), u_id in list(self.users_by_credentials.items()):
@@ -772,6 +936,7 @@ class ZulaSystem:
                 break
 
         del self.cab_drivers[driver_id]
+        self.unavailable_drivers.discard(driver_id)
         print(f"Admin removed Driver {driver.name} (ID: {driver_id}).")
         return True
 
@@ -803,14 +968,15 @@ class ZulaSystem:
             updated = True
         if current_location_name:
             new_loc_obj = self._get_location_by_name(current_location_name)
-            if new_loc_obj:
+            cab = self.get_cab_for_driver(driver_id)
+            if new_loc_obj and cab and not cab.is_available:
+                print(f"Warning: Driver {driver.name}'s cab is on a ride. Location not changed.")
+            elif new_loc_obj:
                 driver.current_location_id = new_loc_obj.id
                 # Also update associated cab's location if it exists
-                for cab_id, cab in self.cabs.items():
-                    if cab.driver_id == driver_id:
-                        self.update_cab_location_in_memory(cab_id, cab.current_location_id, new_loc_obj.id)
-                        cab.set_location(new_loc_obj.id)
-                        break
+                if cab:
+                    self.update_cab_location_in_memory(cab.id, cab.current_location_id, new_loc_obj.id)
+                    cab.set_location(new_loc_obj.id)
                 updated = True
             else:
                 print(f"Warning: New location '{current_location_name}' not found for driver update.")
@@ -995,6 +1161,7 @@ def main():
             print("0. Logout" if current_user else "0. Exit")
 
         choice = input("Enter your choice: ")
+        zula.run_pending_events() # Complete trips that arrived while waiting for input
 
         if choice == '1': # Login
             user_type = input("Enter user type (customer/driver/admin): ").lower()
@@ -1041,10 +1208,7 @@ def main():
                 if choice == '7': # View My Summary
                     zula.view_driver_summary(current_user.id)
                 elif choice == '8': # End Rest Period
-                    if current_user.is_on_rest:
-                        current_user.is_on_rest = False
-                        if current_user.id in zula.unavailable_drivers:
-                            zula.unavailable_drivers.remove(current_user.id)
+                    if zula.end_driver_rest(current_user.id):
                         print(f"Driver {current_user.name} is now available.")
                     else:
                         print("You are not currently on rest.")
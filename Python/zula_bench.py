@@ -0,0 +1,438 @@
+import argparse
+import contextlib
+import csv
+import datetime
+import io
+import math
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+import Zula
+import zualgemini
+from zulageminidik import ZulaSystem, VirtualClock, Customer, Driver, Ride, RideLedger
+
+# --- Benchmarks for the Zula engines ---
+#
+# Usage:
+#   python zula_bench.py matching [--grid 20] [--drivers 300] [--batch 100] [--batches 5]
+#   python zula_bench.py gemini-hail [--sizes 100 1000 10000] [--drivers 200] [--hails 100]
+#   python zula_bench.py memory [--customers 1000000] [--drivers 100000] [--rides 1000000]
+#   python zula_bench.py bulk-load [--locations 100000] [--roads 300000] [--drivers 50000] [--customers 50000]
+#   python zula_bench.py load [--grid 30] [--density 0.5] [--events 20000] [--engines zulageminidik zualgemini Zula.py]
+
+def quietly(func, *args, **kwargs):
+    """Runs func with its console output discarded (zualgemini prints on every call; zulageminidik runs with quiet=True)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+def build_grid_city(zula, size, rng):
+    """Adds a size x size grid of locations with random road lengths. Returns the location names."""
+    names = [f"L{row}_{col}" for row in range(size) for col in range(size)]
+    for name in names:
+        zula.add_location_to_system(name=name)
+    for row in range(size):
+        for col in range(size):
+            if col + 1 < size:
+                zula.add_road_connection(f"L{row}_{col}", f"L{row}_{col + 1}", rng.randint(1, 9))
+            if row + 1 < size:
+                zula.add_road_connection(f"L{row}_{col}", f"L{row + 1}_{col}", rng.randint(1, 9))
+    return names
+
+def build_zulageminidik(grid, drivers, customers, seed):
+    """Creates a ZulaSystem on a virtual clock with a synthetic city, fleet and customer base."""
+    rng = random.Random(seed)
+    clock = VirtualClock()
+    zula = ZulaSystem(clock=clock.now, quiet=True)
+    names = build_grid_city(zula, grid, rng)
+    for i in range(drivers):
+        zula.signup("driver", f"bench_driver{i}", "pw", 30, "M", rng.choice(names))
+    customer_ids = [zula.signup("customer", f"bench_customer{i}", "pw", 30, "F").id for i in range(customers)]
+    return zula, clock, names, customer_ids
+
+# --- Batch matching: greedy vs optimal ---
+def run_matching_batch(zula, batch, strategy):
+    """Runs one batch and returns (total pickup distance, served rides, seconds)."""
+    start = time.perf_counter()
+    rides = zula.hail_cabs_batch(batch, strategy)
+    elapsed = time.perf_counter() - start
+
+    total_pickup = 0
+    served = 0
+    for ride in rides:
+        if ride:
+            # The clock is not advanced, so each cab is still where it was when matched
+            cab = zula.get_cab_by_id(ride.cab_id)
+            total_pickup += zula.location_graph.get_distance(cab.current_location_id, ride.source_id)
+            served += 1
+    return total_pickup, served, elapsed
+
+def bench_matching(args):
+    print(f"Batch matching: {args.grid}x{args.grid} grid, {args.drivers} drivers, "
+          f"{args.batches} batches of {args.batch} hails")
+    print(f"{'Strategy':<10} {'Served':<8} {'Total Pickup':<14} {'Avg Pickup':<12} {'ms / batch':<10}")
+    for strategy in ("greedy", "optimal"):
+        zula, clock, names, customer_ids = build_zulageminidik(args.grid, args.drivers, args.batch, args.seed)
+        rng = random.Random(args.seed + 1) # Same hail stream for both strategies
+        total_pickup = total_served = total_seconds = 0
+        for _ in range(args.batches):
+            batch = [(customer_id, rng.choice(names), rng.choice(names)) for customer_id in customer_ids]
+            pickup, served, seconds = run_matching_batch(zula, batch, strategy)
+            total_pickup += pickup
+            total_served += served
+            total_seconds += seconds
+            # Let every trip finish and every driver's rest expire before the next batch
+            clock.advance(3600)
+            zula.run_pending_events()
+        average = total_pickup / total_served if total_served else 0
+        print(f"{strategy:<10} {total_served:<8} {total_pickup:<14.1f} {average:<12.2f} "
+              f"{1000 * total_seconds / args.batches:<10.1f}")
+
+# --- zualgemini: hail latency as the city grows ---
+def build_zualgemini(locations, drivers, seed):
+    """Creates a zualgemini ZulaSystem on a virtual clock with locations L0..L{n-1} on a line."""
+    rng = random.Random(seed)
+    clock = zualgemini.VirtualClock()
+    zula = quietly(zualgemini.ZulaSystem, clock=clock.now)
+    names = [f"L{i}" for i in range(locations)]
+    for i, name in enumerate(names):
+        quietly(zula.add_location, name=name, distance_from_origin=i)
+    for i in range(drivers):
+        quietly(zula.signup, "driver", f"bench_driver{i}", "pw", 30, "M", rng.choice(names))
+    customer = quietly(zula.signup, "customer", "bench_customer", "pw", 30, "F")
+    return zula, clock, names, customer.id
+
+def bench_gemini_hail(args):
+    print(f"zualgemini hail latency: {args.drivers} drivers, {args.hails} hails per size")
+    print(f"{'Locations':<12} {'us / name lookup':<18} {'ms / hail':<10}")
+    for size in args.sizes:
+        zula, clock, names, customer_id = build_zualgemini(size, args.drivers, args.seed)
+        rng = random.Random(args.seed + 1)
+
+        lookups = [rng.choice(names) for _ in range(10000)]
+        start = time.perf_counter()
+        for name in lookups:
+            zula._get_location_by_name(name)
+        lookup_seconds = (time.perf_counter() - start) / len(lookups)
+
+        hail_seconds = 0
+        for _ in range(args.hails):
+            source, destination = rng.choice(names), rng.choice(names)
+            start = time.perf_counter()
+            quietly(zula.hail_cab, customer_id, source, destination)
+            hail_seconds += time.perf_counter() - start
+            clock.advance(zula.TRIP_DURATION_SECONDS)
+        print(f"{size:<12} {1e6 * lookup_seconds:<18.2f} {1000 * hail_seconds / args.hails:<10.3f}")
+
+# --- Memory per entity: slotted classes vs __dict__-backed instances ---
+def as_namespace(obj):
+    """Copies a slotted instance's attributes into a SimpleNamespace, the __dict__-backed baseline."""
+    slots = [name for cls in type(obj).__mro__ for name in getattr(cls, "__slots__", ())]
+    return SimpleNamespace(**{name: getattr(obj, name) for name in slots})
+
+def bytes_per_item(make, count):
+    """Builds count items with make(i) and returns the traced bytes they hold, per item."""
+    tracemalloc.start()
+    items = [make(i) for i in range(count)]
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del items
+    return used / count
+
+def bench_memory(args):
+    rng = random.Random(args.seed)
+    start = datetime.datetime(2024, 1, 1)
+    paths = [[rng.randint(1, 1000) for _ in range(rng.randint(2, 12))] for _ in range(1000)]
+
+    def customer(i):
+        return Customer(i, f"customer{i}", "pw", 30, "F")
+
+    def driver(i):
+        return Driver(i, f"driver{i}", "pw", 30, "M", i % 1000)
+
+    def ride(i):
+        path = paths[i % len(paths)]
+        return Ride(i, i % 100000, i % 10000, i % 10000, path[0], path[-1], 10.0 * len(path), 3.0 * len(path),
+                    list(path), start + datetime.timedelta(seconds=i), start + datetime.timedelta(seconds=i + 60))
+
+    def ledger_bytes_per_ride(count):
+        tracemalloc.start()
+        ledger = RideLedger()
+        for i in range(count):
+            ledger.append(ride(i))
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return used / count
+
+    print(f"{'Entity':<10} {'Count':<10} {'__dict__ B':<12} {'__slots__ B':<12} {'Ledger row B':<12}")
+    for name, make, count in (("Customer", customer, args.customers), ("Driver", driver, args.drivers), ("Ride", ride, args.rides)):
+        baseline = bytes_per_item(lambda i: as_namespace(make(i)), count)
+        slotted = bytes_per_item(make, count)
+        row = f"{ledger_bytes_per_ride(count):.1f}" if name == "Ride" else "-"
+        print(f"{name:<10} {count:<10} {baseline:<12.1f} {slotted:<12.1f} {row:<12}")
+
+# --- Bulk import: CSV files straight into a ZulaSystem ---
+def write_csv(file_path, header, rows):
+    with open(file_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+def bench_bulk_load(args):
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        files = {
+            "locations": os.path.join(directory, "locations.csv"),
+            "roads": os.path.join(directory, "roads.csv"),
+            "drivers": os.path.join(directory, "drivers.csv"),
+            "customers": os.path.join(directory, "customers.csv"),
+        }
+        # Locations on a square-ish grid; roads join random nearby locations. A road is never
+        # shorter than the straight line between its ends, so the A* straight-line heuristic stays valid.
+        width = max(1, int(args.locations ** 0.5))
+        position = lambda i: (i % width, i // width)
+        def road(a):
+            b = (a + rng.randint(1, width)) % args.locations
+            return f"N{a}", f"N{b}", math.ceil(math.dist(position(a), position(b))) + rng.randint(1, 4)
+        write_csv(files["locations"], ["name", "x", "y"],
+                  ((f"N{i}", *position(i)) for i in range(args.locations)))
+        write_csv(files["roads"], ["from", "to", "distance"],
+                  (road(rng.randrange(args.locations)) for _ in range(args.roads)))
+        write_csv(files["drivers"], ["name", "password", "age", "gender", "location"],
+                  ((f"bench_driver{i}", "pw", 30, "M", f"N{rng.randrange(args.locations)}") for i in range(args.drivers)))
+        write_csv(files["customers"], ["name", "password", "age", "gender"],
+                  ((f"bench_customer{i}", "pw", 30, "F") for i in range(args.customers)))
+
+        zula = ZulaSystem(clock=VirtualClock().now, quiet=True)
+        print(f"{'File':<12} {'Rows':<10} {'Seconds':<10} {'Rows / s':<12}")
+        total_seconds = 0
+        for kind, loader in (("locations", zula.load_locations), ("roads", zula.load_roads),
+                             ("drivers", zula.load_drivers), ("customers", zula.load_customers)):
+            start = time.perf_counter()
+            loaded, _ = loader(files[kind])
+            elapsed = time.perf_counter() - start
+            total_seconds += elapsed
+            print(f"{kind:<12} {loaded:<10} {elapsed:<10.2f} {loaded / elapsed:<12.0f}")
+        print(f"{'total':<12} {'':<10} {total_seconds:<10.2f}")
+
+# --- Load generation: one seeded event stream replayed against every engine ---
+def make_city(size, rng):
+    """
+    A size x size grid city shared by all engines: (names, roads, offsets).
+    roads are (name, name, length) for the graph engines; offsets place each location
+    on zualgemini's line (row-major order), which has no road graph.
+    """
+    names = [f"L{row}_{col}" for row in range(size) for col in range(size)]
+    roads = []
+    for row in range(size):
+        for col in range(size):
+            if col + 1 < size:
+                roads.append((f"L{row}_{col}", f"L{row}_{col + 1}", rng.randint(1, 9)))
+            if row + 1 < size:
+                roads.append((f"L{row}_{col}", f"L{row + 1}_{col}", rng.randint(1, 9)))
+    offsets = {name: index for index, name in enumerate(names)}
+    return names, roads, offsets
+
+def make_events(count, names, customers, cabs, rng, hail_share, move_share):
+    """
+    A seeded stream of ("hail", customer, source, destination), ("move", cab, location) and
+    ("tick", seconds) events. Customers and cabs are indexes, so one stream fits every engine.
+    Ticks move the virtual clock, which is what completes trips and ends driver rests.
+    """
+    events = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < hail_share:
+            events.append(("hail", rng.randrange(customers), rng.choice(names), rng.choice(names)))
+        elif roll < hail_share + move_share:
+            events.append(("move", rng.randrange(cabs), rng.choice(names)))
+        else:
+            events.append(("tick", rng.randint(1, 20)))
+    return events
+
+class ZulageminidikLoad:
+    """zulageminidik.ZulaSystem, run quiet on a virtual clock."""
+    name = "zulageminidik"
+
+    def __init__(self, city, drivers, customers, rng):
+        names, roads, _ = city
+        self.clock = VirtualClock()
+        self.zula = ZulaSystem(clock=self.clock.now, quiet=True)
+        for name in names:
+            self.zula.add_location_to_system(name=name)
+        for road in roads:
+            self.zula.add_road_connection(*road)
+        first_cab = self.zula.next_cab_id
+        for i in range(drivers):
+            self.zula.signup("driver", f"load_driver{i}", "pw", 30, "M", rng.choice(names))
+        self.cab_ids = list(range(first_cab, self.zula.next_cab_id))
+        self.customer_ids = [self.zula.signup("customer", f"load_customer{i}", "pw", 30, "F").id for i in range(customers)]
+        self.admin_id = next(iter(self.zula.admins))
+
+    def hail(self, customer, source, destination):
+        return self.zula.hail_cab(self.customer_ids[customer], source, destination)
+
+    def move(self, cab, location):
+        self.zula.admin_update_cab_location(self.admin_id, self.cab_ids[cab], location)
+
+    def tick(self, seconds):
+        self.clock.advance(seconds)
+        self.zula.run_pending_events()
+
+class ZualgeminiLoad:
+    """zualgemini.ZulaSystem on a virtual clock. It always prints, so replays run with stdout discarded."""
+    name = "zualgemini"
+
+    def __init__(self, city, drivers, customers, rng):
+        names, _, offsets = city
+        self.clock = zualgemini.VirtualClock()
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.zula = zualgemini.ZulaSystem(clock=self.clock.now)
+            for name in names:
+                self.zula.add_location(name=name, distance_from_origin=offsets[name])
+            first_cab = self.zula.next_cab_id
+            for i in range(drivers):
+                self.zula.signup("driver", f"load_driver{i}", "pw", 30, "M", rng.choice(names))
+            self.cab_ids = list(range(first_cab, self.zula.next_cab_id))
+            self.customer_ids = [self.zula.signup("customer", f"load_customer{i}", "pw", 30, "F").id for i in range(customers)]
+        self.admin_id = next(iter(self.zula.admins))
+
+    def hail(self, customer, source, destination):
+        return self.zula.hail_cab(self.customer_ids[customer], source, destination)
+
+    def move(self, cab, location):
+        self.zula.admin_update_cab_location(self.admin_id, self.cab_ids[cab], location)
+
+    def tick(self, seconds):
+        self.clock.advance(seconds)
+        self.zula.run_pending_events()
+
+class ZulaLoad:
+    """Zula.py's ZulaSystem. Trips finish instantly there; ticks only let driver rests expire."""
+    name = "Zula.py"
+
+    def __init__(self, city, drivers, customers, rng):
+        names, roads, offsets = city
+        self.seconds = 0.0
+        self.zula = Zula.ZulaSystem(clock=lambda: self.seconds)
+        for name in names:
+            self.zula.add_location(name, offsets[name])
+        for road in roads:
+            self.zula.connect_locations(*road)
+        for i in range(drivers):
+            driver = self.zula.signup_user("driver", f"load_driver{i}", "pw", 30, "M")
+            self.zula.add_cab(driver.id, rng.choice(names))
+        self.cab_ids = list(self.zula.cabs)
+        self.customers = [self.zula.signup_user("customer", f"load_customer{i}", "pw", 30, "F") for i in range(customers)]
+
+    def hail(self, customer, source, destination):
+        return self.zula.hail_cab(self.customers[customer], source, destination)
+
+    def move(self, cab, location):
+        self.zula.update_cab_location(self.cab_ids[cab], location)
+
+    def tick(self, seconds):
+        self.seconds += seconds
+
+LOAD_ENGINES = {engine.name: engine for engine in (ZulageminidikLoad, ZualgeminiLoad, ZulaLoad)}
+
+def replay(engine, events):
+    """Runs the event stream. Returns (seconds, hail latencies in seconds, hails served)."""
+    latencies = []
+    served = 0
+    start = time.perf_counter()
+    # Only engines that still print write anything; devnull keeps their output out of the memory figures
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for event in events:
+            if event[0] == "hail":
+                hail_start = time.perf_counter()
+                ride = engine.hail(*event[1:])
+                latencies.append(time.perf_counter() - hail_start)
+                served += ride is not None
+            elif event[0] == "move":
+                engine.move(*event[1:])
+            else:
+                engine.tick(event[1])
+    return time.perf_counter() - start, latencies, served
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+def bench_load(args):
+    city = make_city(args.grid, random.Random(args.seed))
+    drivers = max(1, int(args.density * len(city[0])))
+    events = make_events(args.events, city[0], args.customers, drivers, random.Random(args.seed + 1),
+                         args.hail_share, args.move_share)
+    print(f"Load: {args.grid}x{args.grid} grid, {drivers} drivers, {args.customers} customers, "
+          f"{args.events} events (seed {args.seed})")
+    print(f"{'Engine':<15} {'Events / s':<12} {'Served':<14} {'p50 hail ms':<13} {'p99 hail ms':<13} {'Peak MB':<8}")
+    for name in args.engines:
+        engine_class = LOAD_ENGINES[name]
+        # Same seed for every engine, so all of them see the same fleet placement and event stream
+        engine = engine_class(city, drivers, args.customers, random.Random(args.seed + 2))
+        seconds, latencies, served = replay(engine, events)
+        latencies.sort()
+
+        peak = "-"
+        if not args.skip_memory:
+            # Separate run: tracemalloc slows allocation-heavy code too much to share with the timed one
+            tracemalloc.start()
+            replay(engine_class(city, drivers, args.customers, random.Random(args.seed + 2)), events)
+            peak = f"{tracemalloc.get_traced_memory()[1] / 2 ** 20:.1f}"
+            tracemalloc.stop()
+
+        print(f"{name:<15} {len(events) / seconds:<12.0f} {f'{served}/{len(latencies)}':<14} "
+              f"{1000 * percentile(latencies, 0.50):<13.3f} {1000 * percentile(latencies, 0.99):<13.3f} {peak:<8}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks for the Zula cab engines.")
+    parser.add_argument("--seed", type=int, default=42)
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    matching = subparsers.add_parser("matching", help="Greedy vs optimal batch matching")
+    matching.add_argument("--grid", type=int, default=20, help="City is a grid x grid road network")
+    matching.add_argument("--drivers", type=int, default=300)
+    matching.add_argument("--batch", type=int, default=100, help="Hails per batch")
+    matching.add_argument("--batches", type=int, default=5)
+    matching.set_defaults(func=bench_matching)
+
+    gemini_hail = subparsers.add_parser("gemini-hail", help="zualgemini hail latency vs number of locations")
+    gemini_hail.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    gemini_hail.add_argument("--drivers", type=int, default=200)
+    gemini_hail.add_argument("--hails", type=int, default=100)
+    gemini_hail.set_defaults(func=bench_gemini_hail)
+
+    memory = subparsers.add_parser("memory", help="Bytes per customer/driver/ride, with and without __slots__")
+    memory.add_argument("--customers", type=int, default=1000000)
+    memory.add_argument("--drivers", type=int, default=100000)
+    memory.add_argument("--rides", type=int, default=1000000, help="Rides held as objects at once; the ledger scales linearly")
+    memory.set_defaults(func=bench_memory)
+
+    bulk_load = subparsers.add_parser("bulk-load", help="Time the CSV bulk loaders on a synthetic city and fleet")
+    bulk_load.add_argument("--locations", type=int, default=100000)
+    bulk_load.add_argument("--roads", type=int, default=300000)
+    bulk_load.add_argument("--drivers", type=int, default=50000)
+    bulk_load.add_argument("--customers", type=int, default=50000)
+    bulk_load.set_defaults(func=bench_bulk_load)
+
+    load = subparsers.add_parser("load", help="Replay one seeded hail/move/clock stream against each engine")
+    load.add_argument("--grid", type=int, default=30, help="City is a grid x grid road network")
+    load.add_argument("--density", type=float, default=0.5, help="Drivers per location")
+    load.add_argument("--customers", type=int, default=200)
+    load.add_argument("--events", type=int, default=20000)
+    load.add_argument("--hail-share", type=float, default=0.6, help="Fraction of events that are hails")
+    load.add_argument("--move-share", type=float, default=0.1, help="Fraction that are admin cab moves; the rest advance the clock")
+    load.add_argument("--engines", nargs="+", choices=list(LOAD_ENGINES), default=list(LOAD_ENGINES))
+    load.add_argument("--skip-memory", action="store_true", help="Skip the second, tracemalloc-instrumented run")
+    load.set_defaults(func=bench_load)
+
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
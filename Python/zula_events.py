@@ -0,0 +1,51 @@
+import datetime
+import heapq
+
+# --- Simulated time shared by the Zula engines ---
+#
+# zulageminidik.py and zualgemini.py both run trips and driver rests as timed events on a clock
+# they are given, so simulations and benchmarks never wait on the wall clock.
+
+class VirtualClock:
+    """
+    Simulated clock for running the system without wall-clock waits.
+    Time only moves forward when advance() is called.
+    """
+    def __init__(self, start_time=None):
+        self.current_time = start_time or datetime.datetime.now()
+
+    def now(self):
+        return self.current_time
+
+    def advance(self, seconds):
+        """Moves the clock forward and returns the new time."""
+        self.current_time += datetime.timedelta(seconds=seconds)
+        return self.current_time
+
+class EventScheduler:
+    """
+    Min-heap of timed callbacks (e.g. trip completions).
+    Nothing runs on its own: run_due() fires every event whose time has come according to the clock.
+    """
+    def __init__(self, clock):
+        self.clock = clock # Callable returning the current datetime
+        self.events = [] # [(due_time, sequence, callback, args)] - min-heap
+        self._sequence = 0 # Keeps same-time events in scheduling order; a plain int so snapshots can save it
+
+    def schedule(self, due_time, callback, *args):
+        """Queues callback(*args) to run once the clock reaches due_time."""
+        self._sequence += 1
+        heapq.heappush(self.events, (due_time, self._sequence, callback, args))
+
+    def run_due(self):
+        """Fires all events that are due and returns how many ran."""
+        now = self.clock()
+        fired = 0
+        while self.events and self.events[0][0] <= now:
+            _, _, callback, args = heapq.heappop(self.events)
+            callback(*args)
+            fired += 1
+        return fired
+
+    def next_due_time(self):
+        return self.events[0][0] if self.events else None
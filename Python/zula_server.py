@@ -0,0 +1,199 @@
+import argparse
+import asyncio
+import json
+
+from zulageminidik import ZulaSystem, SQLiteStore, Customer, Driver, Admin
+
+# --- asyncio front-end for ZulaSystem ---
+#
+# Protocol: one JSON object per line in each direction.
+#   -> {"op": "login", "user_type": "customer", "name": "cust1", "password": "pass1"}
+#   <- {"ok": true, "user_id": 5, "user_type": "customer"}
+# Ops: signup, login, logout, hail, history, stats, ping.
+# hail/history act on the user logged in on the same connection.
+# history is paged: {"op": "history", "offset": 0, "limit": 100} returns up to `limit` rides (at most
+# HISTORY_PAGE_LIMIT) plus "next_offset" while more remain.
+
+EVENT_POLL_SECONDS = 0.05 # How often trip completions are fired on the system clock
+HISTORY_PAGE_LIMIT = 100 # Default and maximum rides per history response
+
+class ZulaServer:
+    """
+    Accepts many concurrent client connections and forwards their requests to a single ZulaSystem.
+    Every call into the system runs under one lock, so matching and state updates are serialized:
+    two customers hailing at the same time can never be handed the same cab.
+    The system runs quiet: clients get structured responses, nothing is printed per request.
+    """
+    def __init__(self, zula=None):
+        self.zula = zula or ZulaSystem(quiet=True)
+        self.lock = asyncio.Lock()
+        self.handlers = {
+            "ping": self.handle_ping,
+            "signup": self.handle_signup,
+            "login": self.handle_login,
+            "logout": self.handle_logout,
+            "hail": self.handle_hail,
+            "history": self.handle_history,
+            "stats": self.handle_stats,
+        }
+
+    async def handle_connection(self, reader, writer):
+        """Serves one client until it disconnects."""
+        session = {"user": None} # Per-connection login state
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = await self.dispatch(line, session)
+                writer.write((json.dumps(response) + "\n").encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, line, session):
+        """Parses one request line and runs the matching handler."""
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError:
+            return {"ok": False, "error": "Invalid JSON."}
+        if not isinstance(request, dict):
+            return {"ok": False, "error": "Request must be a JSON object."}
+
+        handler = self.handlers.get(request.get("op"))
+        if not handler:
+            return {"ok": False, "error": f"Unknown op '{request.get('op')}'."}
+
+        try:
+            async with self.lock:
+                return handler(request, session)
+        except (KeyError, TypeError, ValueError) as e:
+            return {"ok": False, "error": f"Bad request: {e}"}
+
+    async def run_events(self):
+        """Background task that completes trips as their arrival time passes."""
+        while True:
+            await asyncio.sleep(EVENT_POLL_SECONDS)
+            async with self.lock:
+                self.zula.run_pending_events()
+
+    # --- Handlers (called with the lock held) ---
+    def handle_ping(self, request, session):
+        return {"ok": True}
+
+    def handle_signup(self, request, session):
+        user = self.zula.signup(request["user_type"], request["name"], request["password"],
+                                int(request["age"]), request["gender"], request.get("initial_location_name"))
+        if not user:
+            return {"ok": False, "error": "Sign up failed."}
+        session["user"] = user
+        return {"ok": True, "user_id": user.id, "user_type": request["user_type"]}
+
+    def handle_login(self, request, session):
+        user = self.zula.login(request["user_type"], request["name"], request["password"])
+        if not user:
+            return {"ok": False, "error": "Invalid credentials."}
+        session["user"] = user
+        return {"ok": True, "user_id": user.id, "user_type": request["user_type"]}
+
+    def handle_logout(self, request, session):
+        session["user"] = None
+        return {"ok": True}
+
+    def handle_hail(self, request, session):
+        customer = session["user"]
+        if not isinstance(customer, Customer):
+            return {"ok": False, "error": "Login as a customer to hail a cab."}
+        ride = self.zula.hail_cab(customer.id, request["source"], request["destination"])
+        if not ride:
+            return {"ok": False, "error": "No cab available for this route."}
+        return {"ok": True, "ride": self.ride_to_dict(ride)}
+
+    def handle_history(self, request, session):
+        # One page per request, so a large ledger never holds the lock for a full dump
+        offset = int(request.get("offset", 0))
+        limit = int(request.get("limit", HISTORY_PAGE_LIMIT))
+        if offset < 0 or not 0 < limit <= HISTORY_PAGE_LIMIT:
+            return {"ok": False, "error": f"offset must be >= 0 and limit between 1 and {HISTORY_PAGE_LIMIT}."}
+        user = session["user"]
+        if isinstance(user, (Customer, Driver)):
+            rows = user.trip_history
+        elif isinstance(user, Admin):
+            rows = range(len(self.zula.ride_ledger))
+        else:
+            return {"ok": False, "error": "Login required."}
+        page = rows[offset:offset + limit]
+        response = {"ok": True, "rides": [self.ride_to_dict(ride) for ride in self.zula.ride_ledger.rides(page)]}
+        if offset + limit < len(rows):
+            response["next_offset"] = offset + limit
+        return response
+
+    def handle_stats(self, request, session):
+        # Running totals for dashboards: overall, or {"group": "driver"|"cab"|"location", "key": id}
+        if not isinstance(session["user"], Admin):
+            return {"ok": False, "error": "Login as an admin to view stats."}
+        group = request.get("group")
+        if group not in (None, "driver", "cab", "location"):
+            return {"ok": False, "error": f"Unknown stats group '{group}'."}
+        key = int(request["key"]) if group else None
+        return {"ok": True, "stats": self.zula.get_ride_stats(group, key)}
+
+    def ride_to_dict(self, ride):
+        """Converts a Ride into a JSON-friendly dict with location names resolved."""
+        return {
+            "ride_id": ride.id,
+            "cab_id": ride.cab_id,
+            "driver": self.zula.get_driver_name(ride.driver_id),
+            "source": self.zula.get_location_name(ride.source_id),
+            "destination": self.zula.get_location_name(ride.destination_id),
+            "fare": ride.fare,
+            "zula_commission": ride.zula_commission,
+            "path": [self.zula.get_location_name(loc_id) for loc_id in ride.path],
+            "start_time": ride.start_time.isoformat(),
+            "end_time": ride.end_time.isoformat(),
+        }
+
+async def serve(host, port, unix_path=None, data_dir=None, db_path=None):
+    """Starts the server on TCP (or a Unix socket) and runs until cancelled."""
+    zula = None
+    if data_dir:
+        zula = ZulaSystem.open_persistent(data_dir, quiet=True)
+    elif db_path:
+        zula = ZulaSystem(store=SQLiteStore(db_path), quiet=True)
+    server = ZulaServer(zula)
+    if unix_path:
+        listener = await asyncio.start_unix_server(server.handle_connection, path=unix_path)
+        print(f"Zula server listening on unix:{unix_path}")
+    else:
+        listener = await asyncio.start_server(server.handle_connection, host, port)
+        print(f"Zula server listening on {host}:{port}")
+
+    events_task = asyncio.create_task(server.run_events())
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        events_task.cancel()
+        if server.zula.journal:
+            server.zula.journal.close()
+        if server.zula.store:
+            server.zula.store.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the Zula cab system over line-delimited JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="Listen on this Unix socket path instead of TCP")
+    storage = parser.add_mutually_exclusive_group()
+    storage.add_argument("--data-dir", help="Keep state in this directory (snapshot + journal) across restarts")
+    storage.add_argument("--db", help="Keep state in this SQLite database across restarts")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, args.data_dir, args.db))
+    except KeyboardInterrupt:
+        print("Zula server stopped.")
+
+if __name__ == "__main__":
+    main()
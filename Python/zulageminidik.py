@@ -1,12 +1,27 @@
 import datetime
 import random
 import heapq
+import hashlib
+import json
+import math
+import os
+import sys
 import time
+import sqlite3
+import functools
+import contextlib
+import csv
+from array import array
+from collections import OrderedDict
+
+from zula_events import VirtualClock, EventScheduler
 
 # --- 1. Core Classes ---
 
 class User:
     """Base class for all users in the system."""
+    __slots__ = ("id", "name", "password", "age", "gender")  # Fixed attribute set: instances carry no __dict__
+
     def __init__(self, id, name, password, age, gender):
         self.id = id
         self.name = name
@@ -23,35 +38,40 @@ class User:
 
 class Customer(User):
     """Represents a customer in the Zula system."""
+    __slots__ = ("trip_history",)
+
     def __init__(self, id, name, password, age, gender):
         super().__init__(id, name, password, age, gender)
-        self.trip_history = []  # List of Ride objects
+        self.trip_history = array('i')  # Rows of the customer's rides in ZulaSystem.ride_ledger
 
     def view_history(self):
-        """Returns the customer's ride history."""
+        """Returns the customer's ride history as rows of the ride ledger."""
         return self.trip_history
 
 class Driver(User):
     """Represents a cab driver in the Zula system."""
+    __slots__ = ("current_location_id", "is_on_rest", "rest_until", "total_trips", "total_fare_earned", "total_commission_earned", "trip_history")
+
     def __init__(self, id, name, password, age, gender, current_location_id):
         super().__init__(id, name, password, age, gender)
         self.current_location_id = current_location_id  # Stores current location ID
         self.is_on_rest = False  # True if driver is on a mandatory rest period
+        self.rest_until = None  # When the current rest period ends (datetime), None if not resting
         self.total_trips = 0
         self.total_fare_earned = 0.0
         self.total_commission_earned = 0.0 # Commission for driver from Zula (70% of fare)
-        self.trip_history = []  # List of Ride objects
+        self.trip_history = array('i')  # Rows of the driver's rides in ZulaSystem.ride_ledger
 
-    def complete_ride(self, ride):
-        """Updates driver stats and sets rest status after a ride."""
+    def complete_ride(self, ride, ledger_row):
+        """Updates driver stats and sets rest status after a ride recorded at ledger_row."""
         self.total_trips += 1
         self.total_fare_earned += ride.fare
         self.total_commission_earned += (ride.fare - ride.zula_commission)
-        self.trip_history.append(ride)
+        self.trip_history.append(ledger_row)
         self.is_on_rest = True  # Driver goes on rest after a trip
 
-    def view_my_summary(self):
-        """Returns a summary of the driver's performance."""
+    def view_my_summary(self, ledger):
+        """Returns a summary of the driver's performance, reading trips from the ride ledger."""
         # Using driver ID as Cab ID for simplicity as 1 driver per cab
         return {
             "Cab ID": self.id,
@@ -65,16 +85,20 @@ class Driver(User):
                 "Path": ride.path, # Storing path (list of IDs)
                 "Start Time": ride.start_time.strftime("%Y-%m-%d %H:%M:%S"),
                 "End Time": ride.end_time.strftime("%Y-%m-%d %H:%M:%S")
-            } for ride in self.trip_history]
+            } for ride in ledger.rides(self.trip_history)]
         }
 
 class Admin(User):
     """Represents an admin user with management privileges."""
+    __slots__ = ()
+
     def __init__(self, id, name, password, age, gender):
         super().__init__(id, name, password, age, gender)
 
 class Location:
     """Represents a geographical location in the system."""
+    __slots__ = ("id", "name")
+
     def __init__(self, id, name):
         self.id = id
         self.name = name
@@ -84,6 +108,8 @@ class Location:
 
 class Cab:
     """Represents a cab (vehicle) in the Zula system."""
+    __slots__ = ("id", "current_location_id", "driver_id", "is_available")
+
     def __init__(self, id, current_location_id, driver_id):
         self.id = id
         self.current_location_id = current_location_id
@@ -103,7 +129,9 @@ class Cab:
                 f"Driver ID: {self.driver_id}, Available: {self.is_available})")
 
 class Ride:
-    """Represents a completed ride transaction."""
+    """Represents a ride transaction; it sits in active_rides until it completes."""
+    __slots__ = ("id", "customer_id", "driver_id", "cab_id", "source_id", "destination_id", "fare", "zula_commission", "path", "start_time", "end_time")
+
     def __init__(self, id, customer_id, driver_id, cab_id, source_id, destination_id, fare, zula_commission, path, start_time, end_time):
         self.id = id
         self.customer_id = customer_id
@@ -124,15 +152,37 @@ class Ride:
 class Graph:
     """
     Implements a weighted graph using an adjacency list to represent locations and road connections.
-    Uses Dijkstra's algorithm for shortest path finding.
+    Uses A* (Dijkstra with early exit when no heuristic is available) for point-to-point queries.
+    Heuristics come from optional per-location coordinates and/or landmark distances (ALT).
+    Optionally keeps a precomputed all-pairs distance / next-hop table so that
+    repeated queries on a rarely-changing road network become table lookups.
     """
     def __init__(self):
         self.adj_list = {} # {location_id: [(neighbor_id, weight), ...]}
 
+        # Optional all-pairs table (see enable_all_pairs_precompute)
+        self.all_pairs_enabled = False
+        self._node_ids = None # [location_id, ...] - dense index -> location ID
+        self._node_index = None # {location_id: dense index}
+        self._apsp_distances = None # array('d') of size n*n, row = source
+        self._apsp_next_hop = None # array('i') of size n*n, -1 if unreachable
+
+        # Optional A* heuristics (see set_coordinates / enable_landmarks)
+        self.coordinates = {} # {location_id: (x, y)}
+        self._straight_line_usable = None # Cached result of _check_straight_line()
+        self.landmark_count = 0
+        self._landmark_distances = None # [{location_id: distance from landmark}, ...]
+        self.last_settled_count = 0 # Nodes settled by the most recent point-to-point search
+
+        # Optional CSR copy used for Dijkstra (see enable_compact)
+        self.compact_enabled = False
+        self._compact = None
+
     def add_node(self, node_id):
         """Adds a node (location) to the graph if it doesn't exist."""
         if node_id not in self.adj_list:
             self.adj_list[node_id] = []
+            self._topology_changed()
 
     def add_edge(self, loc1_id, loc2_id, weight):
         """
@@ -143,19 +193,244 @@ class Graph:
         self.add_node(loc2_id)
         self.adj_list[loc1_id].append((loc2_id, weight))
         self.adj_list[loc2_id].append((loc1_id, weight))
+        self._topology_changed()
+
+    def add_edges(self, edges):
+        """Adds many bidirectional edges [(loc1_id, loc2_id, weight), ...], invalidating derived structures once."""
+        adj_list = self.adj_list
+        for loc1_id, loc2_id, weight in edges:
+            adj_list.setdefault(loc1_id, []).append((loc2_id, weight))
+            adj_list.setdefault(loc2_id, []).append((loc1_id, weight))
+        self._topology_changed()
+
+    def _topology_changed(self):
+        """Drops every structure derived from the current set of nodes and edges."""
+        self._invalidate_all_pairs()
+        self._landmark_distances = None
+        self._straight_line_usable = None
+        self._compact = None
+
+    # --- Compact (CSR) representation ---
+    def freeze(self):
+        """Returns an immutable CompactGraph snapshot of the current topology (cached until the next change)."""
+        if self._compact is None:
+            self._compact = CompactGraph.from_graph(self)
+        return self._compact
+
+    def enable_compact(self):
+        """Runs Dijkstra-based queries over the CSR arrays, re-freezing lazily after topology changes."""
+        self.compact_enabled = True
+
+    # --- A* heuristics ---
+    def set_coordinates(self, node_id, x, y):
+        """
+        Records a location's position for the straight-line A* heuristic.
+        The heuristic is only used while every location has coordinates and no road is
+        shorter than the straight-line distance between its ends (see _check_straight_line).
+        """
+        self.coordinates[node_id] = (x, y)
+        self._straight_line_usable = None
 
-    def get_shortest_path(self, start_id, end_id):
+    def _check_straight_line(self):
         """
-        Finds the shortest path and distance between two locations using Dijkstra's algorithm.
-        Returns a tuple: (shortest_distance, list_of_location_ids_in_path).
-        Returns (float('inf'), []) if no path exists.
+        True if straight-line distance is a consistent A* heuristic for this graph: every location
+        has coordinates and every road is at least as long as the straight line between its ends.
+        Otherwise it could overestimate and A* would return longer routes without any error.
         """
-        if start_id not in self.adj_list or end_id not in self.adj_list:
+        coordinates = self.coordinates
+        for node_id, edges in self.adj_list.items():
+            position = coordinates.get(node_id)
+            if position is None:
+                return False
+            for neighbor, weight in edges:
+                other = coordinates.get(neighbor)
+                if other is None:
+                    return False
+                straight = ((position[0] - other[0]) ** 2 + (position[1] - other[1]) ** 2) ** 0.5
+                if weight < straight * (1 - 1e-9): # Tolerate float rounding when weight == distance
+                    return False
+        return True
+
+    def enable_landmarks(self, count=8):
+        """
+        Turns on the ALT heuristic: distances from `count` landmark locations give lower bounds
+        via the triangle inequality. Landmarks are picked lazily and re-picked after topology changes.
+        """
+        self.landmark_count = count
+        self._landmark_distances = None
+
+    def _build_landmarks(self):
+        """Picks landmarks by farthest-point selection and stores their distance maps."""
+        landmark_distances = []
+        if self.adj_list and self.landmark_count > 0:
+            candidate = next(iter(self.adj_list))
+            closest_landmark = {node: float('inf') for node in self.adj_list}
+            for _ in range(min(self.landmark_count, len(self.adj_list))):
+                distances, _ = self.get_shortest_distances(candidate)
+                landmark_distances.append(distances)
+                for node, distance in distances.items():
+                    if distance < closest_landmark[node]:
+                        closest_landmark[node] = distance
+                # Next landmark: the reachable node farthest from every landmark so far
+                farthest = max(((distance, node) for node, distance in closest_landmark.items()
+                                if distance != float('inf')), default=(0, None))
+                if farthest[0] == 0:
+                    break
+                candidate = farthest[1]
+        self._landmark_distances = landmark_distances
+
+    def _heuristic_for(self, end_id):
+        """
+        Returns a lower-bound estimate function h(node) of the distance to end_id, or None.
+        The straight-line bound is skipped unless _check_straight_line holds (checked once per
+        topology or coordinate change); the landmark bound, or plain Dijkstra, is used instead.
+        """
+        estimators = []
+
+        if self._straight_line_usable is None:
+            self._straight_line_usable = self._check_straight_line()
+        end_position = self.coordinates.get(end_id)
+        if end_position and self._straight_line_usable:
+            coordinates = self.coordinates
+            def straight_line(node_id):
+                position = coordinates[node_id]
+                return ((position[0] - end_position[0]) ** 2 + (position[1] - end_position[1]) ** 2) ** 0.5
+            estimators.append(straight_line)
+
+        if self.landmark_count > 0:
+            if self._landmark_distances is None:
+                self._build_landmarks()
+            landmark_targets = [(distances, distances.get(end_id, float('inf'))) for distances in self._landmark_distances]
+            landmark_targets = [(distances, to_end) for distances, to_end in landmark_targets if to_end != float('inf')]
+            if landmark_targets:
+                def landmarks(node_id):
+                    best = 0
+                    for distances, to_end in landmark_targets:
+                        to_node = distances.get(node_id, float('inf'))
+                        if to_node != float('inf'):
+                            bound = abs(to_end - to_node)
+                            if bound > best:
+                                best = bound
+                    return best
+                estimators.append(landmarks)
+
+        if not estimators:
+            return None
+        if len(estimators) == 1:
+            return estimators[0]
+        return lambda node_id: max(estimator(node_id) for estimator in estimators)
+
+    # --- All-pairs precompute ---
+    def enable_all_pairs_precompute(self):
+        """
+        Switches shortest-path queries to the all-pairs table.
+        The table is built lazily on the next query and rebuilt after any topology change.
+        Memory is O(n^2), so this is meant for networks that change rarely but are queried often.
+        """
+        self.all_pairs_enabled = True
+
+    def disable_all_pairs_precompute(self):
+        """Drops the all-pairs table and goes back to on-demand Dijkstra."""
+        self.all_pairs_enabled = False
+        self._invalidate_all_pairs()
+
+    def _invalidate_all_pairs(self):
+        """Discards the all-pairs table after a topology change."""
+        self._node_ids = None
+        self._node_index = None
+        self._apsp_distances = None
+        self._apsp_next_hop = None
+
+    def build_all_pairs(self):
+        """
+        Builds the all-pairs distance and next-hop tables by running Dijkstra from every node.
+        Both tables are flat row-major arrays indexed by dense node indices.
+        """
+        node_ids = list(self.adj_list)
+        node_index = {node_id: index for index, node_id in enumerate(node_ids)}
+        n = len(node_ids)
+        apsp_distances = array('d', [float('inf')]) * (n * n)
+        apsp_next_hop = array('i', [-1]) * (n * n)
+
+        for source_index, source_id in enumerate(node_ids):
+            distances, previous_nodes = self.get_shortest_distances(source_id)
+            row = source_index * n
+            first_hops = {source_id: source_id}
+            for node_id, distance in distances.items():
+                if distance == float('inf'):
+                    continue
+                # Walk up the predecessor tree until we reach a node whose first hop is known
+                trail = []
+                current = node_id
+                while current not in first_hops:
+                    trail.append(current)
+                    parent = previous_nodes[current]
+                    if parent == source_id:
+                        first_hops[current] = current
+                        trail.pop()
+                        break
+                    current = parent
+                hop = first_hops[current]
+                for trail_node in trail:
+                    first_hops[trail_node] = hop
+
+                target_index = node_index[node_id]
+                apsp_distances[row + target_index] = distance
+                apsp_next_hop[row + target_index] = node_index[first_hops[node_id]]
+
+        self._node_ids = node_ids
+        self._node_index = node_index
+        self._apsp_distances = apsp_distances
+        self._apsp_next_hop = apsp_next_hop
+
+    def _ensure_all_pairs(self):
+        """Builds the all-pairs table if it is enabled and currently missing."""
+        if self._apsp_distances is None:
+            self.build_all_pairs()
+
+    def _all_pairs_path(self, start_id, end_id):
+        """Looks up (distance, path) in the all-pairs table."""
+        self._ensure_all_pairs()
+        n = len(self._node_ids)
+        start_index = self._node_index[start_id]
+        end_index = self._node_index[end_id]
+        distance = self._apsp_distances[start_index * n + end_index]
+        if distance == float('inf'):
             return float('inf'), []
 
+        path = [start_id]
+        current_index = start_index
+        while current_index != end_index:
+            current_index = self._apsp_next_hop[current_index * n + end_index]
+            path.append(self._node_ids[current_index])
+        return distance, path
+
+    def get_distance(self, start_id, end_id):
+        """Returns only the shortest distance between two locations (float('inf') if unreachable)."""
+        if start_id not in self.adj_list or end_id not in self.adj_list:
+            return float('inf')
+        if self.all_pairs_enabled:
+            self._ensure_all_pairs()
+            n = len(self._node_ids)
+            return self._apsp_distances[self._node_index[start_id] * n + self._node_index[end_id]]
+        return self.get_shortest_path(start_id, end_id)[0]
+
+    def get_shortest_distances(self, start_id):
+        """
+        Runs a single-source Dijkstra from start_id over the whole graph.
+        Returns a tuple: ({node_id: distance}, {node_id: previous_node_id}).
+        Unreachable nodes keep a distance of float('inf') and a predecessor of None.
+        Since roads are bidirectional, the same tree also gives distances *to* start_id.
+        """
+        if self.compact_enabled:
+            return self.freeze().get_shortest_distances(start_id)
+
         distances = {node: float('inf') for node in self.adj_list}
-        distances[start_id] = 0
         previous_nodes = {node: None for node in self.adj_list}
+        if start_id not in self.adj_list:
+            return distances, previous_nodes
+
+        distances[start_id] = 0
         priority_queue = [(0, start_id)] # (distance, node) - min-heap
 
         while priority_queue:
@@ -171,18 +446,1138 @@ class Graph:
                     previous_nodes[neighbor] = current_node
                     heapq.heappush(priority_queue, (distance, neighbor))
 
-        # Reconstruct path
+        return distances, previous_nodes
+
+    def iter_nearest_nodes(self, start_id):
+        """
+        Lazily runs Dijkstra from start_id and yields (node_id, distance, previous_node_id)
+        as each node is settled, nearest first. Callers can stop as soon as they have enough.
+        """
+        if start_id not in self.adj_list:
+            return
+
+        distances = {start_id: 0}
+        settled = set()
+        priority_queue = [(0, start_id, None)] # (distance, node, previous node) - min-heap
+
+        while priority_queue:
+            current_distance, current_node, previous_node = heapq.heappop(priority_queue)
+            if current_node in settled:
+                continue
+            settled.add(current_node)
+            yield current_node, current_distance, previous_node
+
+            for neighbor, weight in self.adj_list[current_node]:
+                distance = current_distance + weight
+                if neighbor not in settled and distance < distances.get(neighbor, float('inf')):
+                    distances[neighbor] = distance
+                    heapq.heappush(priority_queue, (distance, neighbor, current_node))
+
+    @staticmethod
+    def reconstruct_path(previous_nodes, start_id, end_id):
+        """
+        Rebuilds the start_id -> end_id path from a predecessor map.
+        Returns [] if end_id is not reachable from start_id.
+        """
         path = []
         current = end_id
         while current is not None:
-            path.insert(0, current)
-            current = previous_nodes[current]
+            path.append(current)
+            current = previous_nodes.get(current)
+        path.reverse()
 
         # If the start_id is not the first element, it means no path was found to end_id
         if not path or path[0] != start_id:
+            return []
+        return path
+
+    def get_shortest_path(self, start_id, end_id):
+        """
+        Finds the shortest path and distance between two locations using A*
+        (plain Dijkstra with early exit when no heuristic is configured).
+        Returns a tuple: (shortest_distance, list_of_location_ids_in_path).
+        Returns (float('inf'), []) if no path exists.
+        """
+        if start_id not in self.adj_list or end_id not in self.adj_list:
             return float('inf'), []
 
-        return distances[end_id], path
+        if self.all_pairs_enabled:
+            return self._all_pairs_path(start_id, end_id)
+
+        if self.compact_enabled and not self.coordinates and not self.landmark_count:
+            return self.freeze().get_shortest_path(start_id, end_id)
+
+        return self._a_star(start_id, end_id)
+
+    def _a_star(self, start_id, end_id):
+        """A* search that stops as soon as end_id is settled."""
+        heuristic = self._heuristic_for(end_id)
+        distances = {start_id: 0}
+        previous_nodes = {start_id: None}
+        settled = set()
+        start_estimate = heuristic(start_id) if heuristic else 0
+        priority_queue = [(start_estimate, 0, start_id)] # (distance + estimate, distance, node) - min-heap
+
+        while priority_queue:
+            _, current_distance, current_node = heapq.heappop(priority_queue)
+            if current_node in settled:
+                continue
+            settled.add(current_node)
+
+            if current_node == end_id:
+                self.last_settled_count = len(settled)
+                return current_distance, self.reconstruct_path(previous_nodes, start_id, end_id)
+
+            for neighbor, weight in self.adj_list[current_node]:
+                distance = current_distance + weight
+                if neighbor not in settled and distance < distances.get(neighbor, float('inf')):
+                    distances[neighbor] = distance
+                    previous_nodes[neighbor] = current_node
+                    estimate = heuristic(neighbor) if heuristic else 0
+                    heapq.heappush(priority_queue, (distance + estimate, distance, neighbor))
+
+        self.last_settled_count = len(settled)
+        return float('inf'), []
+
+class CompactGraph:
+    """
+    Immutable compressed-sparse-row (CSR) copy of a Graph, produced by Graph.freeze().
+    Location IDs are mapped to dense indices 0..n-1; the edges of node i are
+    neighbors[offsets[i]:offsets[i + 1]] with matching weights. Flat typed arrays take a
+    fraction of the memory of a dict of tuple lists and keep Dijkstra's inner loop on ints.
+    """
+    def __init__(self, node_ids, offsets, neighbors, weights):
+        self.node_ids = node_ids # [location_id, ...] - dense index -> location ID
+        self.node_index = {node_id: index for index, node_id in enumerate(node_ids)}
+        self.offsets = offsets # array('i') of size n + 1
+        self.neighbors = neighbors # array('i') of size 2 * edges (roads are bidirectional)
+        self.weights = weights # array('d'), parallel to neighbors
+
+    @classmethod
+    def from_graph(cls, graph):
+        """Builds the CSR arrays from a Graph's adjacency list."""
+        node_ids = list(graph.adj_list)
+        node_index = {node_id: index for index, node_id in enumerate(node_ids)}
+        offsets = array('i', [0])
+        neighbors = array('i')
+        weights = array('d')
+        for node_id in node_ids:
+            for neighbor, weight in graph.adj_list[node_id]:
+                neighbors.append(node_index[neighbor])
+                weights.append(weight)
+            offsets.append(len(neighbors))
+        return cls(node_ids, offsets, neighbors, weights)
+
+    def _dijkstra(self, start_index, end_index=-1):
+        """
+        Dijkstra over dense indices. Stops early once end_index is settled (if given).
+        Returns (distances array('d'), previous array('i') with -1 for none).
+        """
+        n = len(self.node_ids)
+        offsets, neighbors, weights = self.offsets, self.neighbors, self.weights
+        distances = array('d', [float('inf')]) * n
+        previous = array('i', [-1]) * n
+        distances[start_index] = 0.0
+        priority_queue = [(0.0, start_index)]
+        while priority_queue:
+            current_distance, current = heapq.heappop(priority_queue)
+            if current_distance > distances[current]:
+                continue
+            if current == end_index:
+                break
+            for edge in range(offsets[current], offsets[current + 1]):
+                neighbor = neighbors[edge]
+                distance = current_distance + weights[edge]
+                if distance < distances[neighbor]:
+                    distances[neighbor] = distance
+                    previous[neighbor] = current
+                    heapq.heappush(priority_queue, (distance, neighbor))
+        return distances, previous
+
+    def get_shortest_distances(self, start_id):
+        """Same contract as Graph.get_shortest_distances: ({node_id: distance}, {node_id: previous_node_id})."""
+        node_ids = self.node_ids
+        if start_id not in self.node_index:
+            return {node_id: float('inf') for node_id in node_ids}, {node_id: None for node_id in node_ids}
+        distances, previous = self._dijkstra(self.node_index[start_id])
+        return (dict(zip(node_ids, distances)),
+                {node_id: (node_ids[parent] if parent >= 0 else None) for node_id, parent in zip(node_ids, previous)})
+
+    def get_shortest_path(self, start_id, end_id):
+        """Same contract as Graph.get_shortest_path: (distance, [location_id, ...])."""
+        if start_id not in self.node_index or end_id not in self.node_index:
+            return float('inf'), []
+        start_index = self.node_index[start_id]
+        end_index = self.node_index[end_id]
+        distances, previous = self._dijkstra(start_index, end_index)
+        if distances[end_index] == float('inf'):
+            return float('inf'), []
+        path = []
+        current = end_index
+        while current != -1:
+            path.append(self.node_ids[current])
+            current = previous[current]
+        path.reverse()
+        return distances[end_index], path
+
+class ContractionHierarchy:
+    """
+    Contraction Hierarchies index for fast shortest-path queries on a static road network.
+    Nodes are contracted one by one (least important first); shortcuts preserve shortest
+    distances among the remaining nodes. A query is then a small bidirectional upward search.
+    Build it once from a Graph (build), save it to disk and load it at startup.
+    """
+    WITNESS_SETTLE_LIMIT = 60 # Max nodes a witness search may settle before giving up and adding the shortcut
+
+    def __init__(self):
+        self.rank = {} # {node_id: contraction order}
+        self.upward = {} # {node_id: {higher_ranked_neighbor: (weight, middle_node or None)}}
+        self.fingerprint = None # Hash of the graph the index was built from
+
+    @staticmethod
+    def graph_fingerprint(graph):
+        """
+        SHA-256 of a graph's node IDs and sorted (u, v, weight) edge list, used to detect a stale index.
+        Any change to the topology or a weight changes the hash, even if counts and totals stay the same.
+        """
+        digest = hashlib.sha256()
+        digest.update(repr(sorted(graph.adj_list)).encode())
+        for u, v, weight in sorted((u, v, float(weight)) for u, edges in graph.adj_list.items() for v, weight in edges):
+            digest.update(f"{u},{v},{weight!r};".encode())
+        return digest.hexdigest()
+
+    @classmethod
+    def build(cls, graph):
+        """Preprocesses a Graph into a contraction hierarchy."""
+        hierarchy = cls()
+        # Working copy: {node: {neighbor: (weight, middle)}}; parallel roads collapse to the shortest
+        remaining = {node: {} for node in graph.adj_list}
+        for node, edges in graph.adj_list.items():
+            for neighbor, weight in edges:
+                if neighbor != node and weight < remaining[node].get(neighbor, (float('inf'), None))[0]:
+                    remaining[node][neighbor] = (weight, None)
+        contracted_neighbors = {node: 0 for node in remaining}
+
+        queue = [(hierarchy._priority(remaining, contracted_neighbors, node), node) for node in remaining]
+        heapq.heapify(queue)
+        next_rank = 0
+        while queue:
+            _, node = heapq.heappop(queue)
+            if node in hierarchy.rank:
+                continue
+            # Lazy update: re-check the priority and defer if the node is no longer the cheapest
+            priority = hierarchy._priority(remaining, contracted_neighbors, node)
+            if queue and priority > queue[0][0]:
+                heapq.heappush(queue, (priority, node))
+                continue
+
+            hierarchy.rank[node] = next_rank
+            next_rank += 1
+            neighbors = remaining.pop(node)
+            hierarchy.upward[node] = dict(neighbors) # Every neighbor left is contracted later, so ranks higher
+            for u, w, shortcut_weight in list(hierarchy._shortcuts_for(remaining, node, neighbors)):
+                if shortcut_weight < remaining[u].get(w, (float('inf'), None))[0]:
+                    remaining[u][w] = (shortcut_weight, node)
+                    remaining[w][u] = (shortcut_weight, node)
+            for neighbor in neighbors:
+                del remaining[neighbor][node]
+                contracted_neighbors[neighbor] += 1
+
+        hierarchy.fingerprint = cls.graph_fingerprint(graph)
+        return hierarchy
+
+    def _priority(self, remaining, contracted_neighbors, node):
+        """Edge difference plus contracted-neighbor count: cheap nodes to remove go first."""
+        neighbors = remaining[node]
+        shortcut_count = sum(1 for _ in self._shortcuts_for(remaining, node, neighbors))
+        return shortcut_count - len(neighbors) + contracted_neighbors[node]
+
+    def _shortcuts_for(self, remaining, node, neighbors):
+        """
+        Yields (u, w, weight) for each neighbor pair u-w whose shortest connection runs through node,
+        i.e. no witness path avoiding node is at least as short.
+        """
+        neighbor_items = list(neighbors.items())
+        for index, (u, (weight_u, _)) in enumerate(neighbor_items):
+            targets = {w: weight_u + weight_w for w, (weight_w, _) in neighbor_items[index + 1:]}
+            if not targets:
+                continue
+            witness = self._witness_distances(remaining, u, node, max(targets.values()), targets)
+            for w, via_distance in targets.items():
+                if witness.get(w, float('inf')) > via_distance:
+                    yield u, w, via_distance
+
+    def _witness_distances(self, remaining, start, excluded, max_distance, targets):
+        """Bounded Dijkstra from start that never passes through `excluded`."""
+        distances = {start: 0}
+        settled = set()
+        found = 0
+        priority_queue = [(0, start)]
+        while priority_queue and len(settled) < self.WITNESS_SETTLE_LIMIT:
+            distance, node = heapq.heappop(priority_queue)
+            if node in settled:
+                continue
+            if distance > max_distance:
+                break
+            settled.add(node)
+            if node in targets:
+                found += 1
+                if found == len(targets):
+                    break
+            for neighbor, (weight, _) in remaining[node].items():
+                if neighbor == excluded or neighbor in settled:
+                    continue
+                new_distance = distance + weight
+                if new_distance < distances.get(neighbor, float('inf')):
+                    distances[neighbor] = new_distance
+                    heapq.heappush(priority_queue, (new_distance, neighbor))
+        return distances
+
+    def _search_step(self, side, other_side, best):
+        """
+        Settles one node of an upward search. `side` is (distances, previous_nodes, queue).
+        Returns the (distance, meeting_node) improvement found, or None.
+        """
+        distances, previous_nodes, priority_queue = side
+        distance, node = heapq.heappop(priority_queue)
+        if distance > distances[node]:
+            return None
+        for neighbor, (weight, _) in self.upward.get(node, {}).items():
+            new_distance = distance + weight
+            if new_distance < distances.get(neighbor, float('inf')):
+                distances[neighbor] = new_distance
+                previous_nodes[neighbor] = node
+                heapq.heappush(priority_queue, (new_distance, neighbor))
+        total = distance + other_side[0].get(node, float('inf'))
+        if total < best:
+            return total, node
+        return None
+
+    def _edge(self, a, b):
+        """Returns (weight, middle) of the hierarchy edge between a and b."""
+        if b in self.upward.get(a, {}):
+            return self.upward[a][b]
+        return self.upward[b][a]
+
+    def _unpack(self, node_path):
+        """Expands shortcuts along a path of hierarchy edges into original road segments."""
+        path = [node_path[0]]
+        for a, b in zip(node_path, node_path[1:]):
+            stack = [(a, b)]
+            while stack:
+                x, y = stack.pop()
+                _, middle = self._edge(x, y)
+                if middle is None:
+                    path.append(y)
+                else:
+                    stack.append((middle, y)) # Second half, processed after the first
+                    stack.append((x, middle))
+        return path
+
+    def get_shortest_path(self, start_id, end_id):
+        """Returns (distance, path) like Graph.get_shortest_path, answered from the hierarchy."""
+        if start_id not in self.rank or end_id not in self.rank:
+            return float('inf'), []
+        forward = ({start_id: 0}, {start_id: None}, [(0, start_id)])
+        backward = ({end_id: 0}, {end_id: None}, [(0, end_id)])
+
+        best_distance = float('inf')
+        meeting_node = None
+        # Alternate upward searches; a side stops once its smallest key cannot beat the best meeting
+        while True:
+            progressed = False
+            for side, other_side in ((forward, backward), (backward, forward)):
+                if side[2] and side[2][0][0] < best_distance:
+                    progressed = True
+                    improvement = self._search_step(side, other_side, best_distance)
+                    if improvement:
+                        best_distance, meeting_node = improvement
+            if not progressed:
+                break
+        if meeting_node is None:
+            return float('inf'), []
+
+        forward_previous = forward[1]
+        backward_previous = backward[1]
+        up_path = Graph.reconstruct_path(forward_previous, start_id, meeting_node)
+        down_path = Graph.reconstruct_path(backward_previous, end_id, meeting_node)[::-1]
+        return best_distance, self._unpack(up_path + down_path[1:])
+
+    def save(self, file_path):
+        """Writes the index to a JSON file."""
+        data = {
+            "fingerprint": self.fingerprint,
+            "rank": [[node, rank] for node, rank in self.rank.items()],
+            "upward": [[node, neighbor, weight, middle]
+                       for node, edges in self.upward.items()
+                       for neighbor, (weight, middle) in edges.items()],
+        }
+        with open(file_path, "w") as f:
+            json.dump(data, f)
+
+    @classmethod
+    def load(cls, file_path):
+        """Reads an index written by save()."""
+        with open(file_path) as f:
+            data = json.load(f)
+        hierarchy = cls()
+        hierarchy.fingerprint = data["fingerprint"]
+        hierarchy.rank = {node: rank for node, rank in data["rank"]}
+        hierarchy.upward = {node: {} for node in hierarchy.rank}
+        for node, neighbor, weight, middle in data["upward"]:
+            hierarchy.upward[node][neighbor] = (weight, middle)
+        return hierarchy
+
+class CabIndex:
+    """
+    Spatial index of cabs by location.
+    Keeps every cab per location (in arrival order, for redirection) and, separately,
+    the set of cabs that can take a ride right now (cab free and driver not on rest).
+    Add, remove, move and availability changes are all O(1).
+    """
+    def __init__(self):
+        self.cabs_at = {} # {location_id: {cab_id: None}} - dict used as an insertion-ordered set
+        self.available_at = {} # {location_id: {cab_id, ...}} - only available, non-resting cabs
+        self.cab_positions = {} # {cab_id: location_id}
+
+    def add(self, cab_id, location_id, available=True):
+        """Registers a cab at a location."""
+        self.cab_positions[cab_id] = location_id
+        self.cabs_at.setdefault(location_id, {})[cab_id] = None
+        if available:
+            self.available_at.setdefault(location_id, set()).add(cab_id)
+
+    def remove(self, cab_id):
+        """Drops a cab from the index entirely."""
+        location_id = self.cab_positions.pop(cab_id, None)
+        if location_id is None:
+            return
+        cabs_here = self.cabs_at.get(location_id)
+        if cabs_here is not None:
+            cabs_here.pop(cab_id, None)
+            if not cabs_here:
+                del self.cabs_at[location_id] # Clean up empty bucket
+        self._discard_available(cab_id, location_id)
+
+    def move(self, cab_id, new_location_id):
+        """Moves a cab to a new location, keeping its availability."""
+        old_location_id = self.cab_positions.get(cab_id)
+        if old_location_id == new_location_id:
+            return
+        available = self.is_available(cab_id)
+        self.remove(cab_id)
+        self.add(cab_id, new_location_id, available)
+
+    def set_available(self, cab_id, available):
+        """Marks a cab as able (or not) to take a ride."""
+        location_id = self.cab_positions.get(cab_id)
+        if location_id is None:
+            return
+        if available:
+            self.available_at.setdefault(location_id, set()).add(cab_id)
+        else:
+            self._discard_available(cab_id, location_id)
+
+    def _discard_available(self, cab_id, location_id):
+        available_here = self.available_at.get(location_id)
+        if available_here is not None:
+            available_here.discard(cab_id)
+            if not available_here:
+                del self.available_at[location_id]
+
+    def is_available(self, cab_id):
+        location_id = self.cab_positions.get(cab_id)
+        return location_id is not None and cab_id in self.available_at.get(location_id, ())
+
+    def cabs_at_location(self, location_id):
+        """Returns all cab IDs at a location, in the order they arrived."""
+        return list(self.cabs_at.get(location_id, ()))
+
+    def count_at(self, location_id):
+        return len(self.cabs_at.get(location_id, ()))
+
+    def nearest_available(self, graph, location_id, k=None):
+        """
+        Finds the k nearest available cabs to location_id by expanding Dijkstra outward
+        until k cabs are found. Cabs tied with the k-th distance are all included so the
+        caller can still apply its own tiebreak.
+        Returns ([(cab_id, cab_location_id, distance), ...], {node_id: previous_node_id}).
+        """
+        matches = []
+        previous_nodes = {}
+        cutoff = float('inf')
+        if not self.available_at:
+            return matches, previous_nodes
+
+        for node_id, distance, previous_node in graph.iter_nearest_nodes(location_id):
+            if distance > cutoff:
+                break
+            previous_nodes[node_id] = previous_node
+            for cab_id in self.available_at.get(node_id, ()):
+                matches.append((cab_id, node_id, distance))
+            if k is not None and len(matches) >= k and cutoff == float('inf'):
+                cutoff = distance
+        return matches, previous_nodes
+
+class RouteCache:
+    """
+    Bounded LRU cache of shortest-path results keyed by (source_id, destination_id).
+    Entries are tied to a graph version: when the version moves on, the whole cache is dropped.
+    """
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self.entries = OrderedDict() # {(source_id, destination_id): (distance, path)}
+        self.version = 0 # Graph version the cached entries were computed against
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, source_id, destination_id, graph_version):
+        """Returns the cached (distance, path) or None on a miss."""
+        if graph_version != self.version:
+            self.entries.clear()
+            self.version = graph_version
+        key = (source_id, destination_id)
+        route = self.entries.get(key)
+        if route is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return route
+
+    def put(self, source_id, destination_id, graph_version, route):
+        """Stores a (distance, path) result, evicting the least recently used entry if full."""
+        if graph_version != self.version:
+            self.entries.clear()
+            self.version = graph_version
+        self.entries[(source_id, destination_id)] = route
+        self.entries.move_to_end((source_id, destination_id))
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def stats(self):
+        """Returns hit/miss counters and the current size of the cache."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.entries), "max_size": self.max_size}
+
+class RideStats:
+    """
+    Running totals over completed rides, so summaries never rescan the ride history.
+    Each total is [rides, fare, zula_commission], kept overall and per driver, cab,
+    pickup location and hour (keyed by the ride's end time truncated to the hour).
+    """
+    def __init__(self):
+        self.overall = [0, 0.0, 0.0]
+        self.by_driver = {} # {driver_id: [rides, fare, zula_commission]}
+        self.by_cab = {} # {cab_id: [...]}
+        self.by_location = {} # {source_location_id: [...]}
+        self.by_hour = {} # {datetime at the start of the hour: [...]}
+
+    def record(self, ride):
+        """Adds one completed ride to every total. O(1)."""
+        hour = ride.end_time.replace(minute=0, second=0, microsecond=0)
+        self._add(self.overall, ride)
+        self._add(self.by_driver.setdefault(ride.driver_id, [0, 0.0, 0.0]), ride)
+        self._add(self.by_cab.setdefault(ride.cab_id, [0, 0.0, 0.0]), ride)
+        self._add(self.by_location.setdefault(ride.source_id, [0, 0.0, 0.0]), ride)
+        self._add(self.by_hour.setdefault(hour, [0, 0.0, 0.0]), ride)
+
+    @staticmethod
+    def _add(totals, ride):
+        totals[0] += 1
+        totals[1] += ride.fare
+        totals[2] += ride.zula_commission
+
+    def totals(self, group=None, key=None):
+        """
+        Returns {"rides", "fare", "zula_commission"} overall, or for one key of a group
+        ("driver", "cab", "location" or "hour"). Unknown keys report zeros.
+        """
+        if group is None:
+            totals = self.overall
+        else:
+            totals = getattr(self, f"by_{group}").get(key, (0, 0.0, 0.0))
+        return {"rides": totals[0], "fare": totals[1], "zula_commission": totals[2]}
+
+class RideLedger:
+    """
+    Append-only columnar store of completed rides.
+    Each field lives in its own typed array and paths are interned (rides along the same
+    route share one tuple), so a stored ride costs a few dozen bytes instead of a Ride object,
+    its attribute dict and its own path list. Rows are addressed by index; rides() rebuilds
+    Ride objects on demand for display.
+    """
+    def __init__(self):
+        self.ride_ids = array('q')
+        self.customer_ids = array('q')
+        self.driver_ids = array('q')
+        self.cab_ids = array('q')
+        self.source_ids = array('q')
+        self.destination_ids = array('q')
+        self.fares = array('d')
+        self.zula_commissions = array('d')
+        self.start_times = array('d') # POSIX timestamps
+        self.end_times = array('d')
+        self.path_ids = array('i') # Index into self.paths
+        self.paths = [] # Interned paths, each a tuple of location IDs
+        self._path_index = {} # {path tuple: path_id}
+        self._row_by_ride_id = array('i') # Indexed by ride ID (IDs are dense); -1 = not completed
+
+    def __len__(self):
+        return len(self.ride_ids)
+
+    def append(self, ride):
+        """Stores a completed ride and returns its row."""
+        path = tuple(ride.path)
+        path_id = self._path_index.get(path)
+        if path_id is None:
+            path_id = len(self.paths)
+            self.paths.append(path)
+            self._path_index[path] = path_id
+
+        row = len(self.ride_ids)
+        self.ride_ids.append(ride.id)
+        self.customer_ids.append(ride.customer_id)
+        self.driver_ids.append(ride.driver_id)
+        self.cab_ids.append(ride.cab_id)
+        self.source_ids.append(ride.source_id)
+        self.destination_ids.append(ride.destination_id)
+        self.fares.append(ride.fare)
+        self.zula_commissions.append(ride.zula_commission)
+        self.start_times.append(ride.start_time.timestamp())
+        self.end_times.append(ride.end_time.timestamp())
+        self.path_ids.append(path_id)
+        if ride.id >= len(self._row_by_ride_id):
+            self._row_by_ride_id.extend([-1] * (ride.id + 1 - len(self._row_by_ride_id)))
+        self._row_by_ride_id[ride.id] = row
+        return row
+
+    def row_for(self, ride_id):
+        """Returns the row of a completed ride, or None."""
+        if 0 <= ride_id < len(self._row_by_ride_id) and self._row_by_ride_id[ride_id] >= 0:
+            return self._row_by_ride_id[ride_id]
+        return None
+
+    def ride(self, row):
+        """Materializes the ride stored at row as a Ride object."""
+        return Ride(self.ride_ids[row], self.customer_ids[row], self.driver_ids[row], self.cab_ids[row],
+                    self.source_ids[row], self.destination_ids[row], self.fares[row], self.zula_commissions[row],
+                    list(self.paths[self.path_ids[row]]),
+                    datetime.datetime.fromtimestamp(self.start_times[row]),
+                    datetime.datetime.fromtimestamp(self.end_times[row]))
+
+    def rides(self, rows=None):
+        """Yields Ride objects for the given rows (every ride if rows is None), in order."""
+        for row in (range(len(self)) if rows is None else rows):
+            yield self.ride(row)
+
+def solve_assignment(cost_matrix):
+    """
+    Solves the rectangular assignment problem with the Hungarian algorithm (O(n^2 * m)).
+    cost_matrix: n rows (requests) x m columns (cabs), n <= m, all costs finite.
+    Returns a list of length n with the column assigned to each row.
+    """
+    n = len(cost_matrix)
+    m = len(cost_matrix[0]) if n else 0
+    if n > m:
+        raise ValueError("Assignment needs at least as many columns as rows")
+
+    # Potentials and matching are 1-indexed; index 0 is a sentinel column.
+    row_potential = [0.0] * (n + 1)
+    col_potential = [0.0] * (m + 1)
+    matched_row = [0] * (m + 1) # matched_row[j] = row assigned to column j (0 = free)
+    way = [0] * (m + 1)
+
+    for i in range(1, n + 1):
+        matched_row[0] = i
+        j0 = 0
+        min_slack = [float('inf')] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0 = matched_row[j0]
+            row = cost_matrix[i0 - 1]
+            u_i0 = row_potential[i0]
+            delta = float('inf')
+            j1 = 0
+            for j in range(1, m + 1):
+                if not used[j]:
+                    slack = row[j - 1] - u_i0 - col_potential[j]
+                    if slack < min_slack[j]:
+                        min_slack[j] = slack
+                        way[j] = j0
+                    if min_slack[j] < delta:
+                        delta = min_slack[j]
+                        j1 = j
+            for j in range(m + 1):
+                if used[j]:
+                    row_potential[matched_row[j]] += delta
+                    col_potential[j] -= delta
+                else:
+                    min_slack[j] -= delta
+            j0 = j1
+            if matched_row[j0] == 0:
+                break
+        # Flip the augmenting path
+        while j0:
+            j1 = way[j0]
+            matched_row[j0] = matched_row[j1]
+            j0 = j1
+
+    assignment = [-1] * n
+    for j in range(1, m + 1):
+        if matched_row[j]:
+            assignment[matched_row[j] - 1] = j - 1
+    return assignment
+
+class StateJournal:
+    """
+    Durability for a ZulaSystem: an append-only log of state mutations plus periodic snapshots.
+    Each successful mutation is written as one JSON line ({"seq", "op", "args", "kwargs"}) before
+    the call returns. Every `snapshot_every` records the whole system is saved as JSON data
+    (ZulaSystem.to_snapshot; written to a temporary file, then atomically renamed) and the log is truncated.
+    Startup loads the snapshot and replays only the log records newer than it, so restart cost follows
+    the log tail, not history. Snapshots are plain data, never pickles: loading one cannot run code.
+    """
+    SNAPSHOT_FILE = "snapshot.json"
+    LEGACY_SNAPSHOT_FILE = "snapshot.pickle" # Written by older versions; refused rather than unpickled
+    LOG_FILE = "journal.jsonl"
+
+    def __init__(self, directory, snapshot_every=1000, sync=False):
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.sync = sync # fsync every record: survives power loss, at the cost of one disk flush per mutation
+        self.seq = 0 # Sequence number of the last record written or replayed
+        self.records_since_snapshot = 0
+        self.replaying = False
+        self.torn = False # Replay stopped at a partial record, so the log must be rewritten before appending
+        self._log = None
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def snapshot_path(self):
+        return os.path.join(self.directory, self.SNAPSHOT_FILE)
+
+    @property
+    def log_path(self):
+        return os.path.join(self.directory, self.LOG_FILE)
+
+    def load_snapshot(self):
+        """Returns the system state stored in the latest snapshot (see ZulaSystem.to_snapshot), or None if there is none."""
+        if not os.path.exists(self.snapshot_path):
+            if os.path.exists(os.path.join(self.directory, self.LEGACY_SNAPSHOT_FILE)):
+                raise ValueError(f"'{self.directory}' holds a pickle snapshot from an older version, which is not "
+                                 f"loaded because unpickling can run arbitrary code. Remove the directory to start fresh.")
+            return None
+        with open(self.snapshot_path) as f:
+            snapshot = json.load(f)
+        self.seq = snapshot["seq"]
+        return snapshot["system"]
+
+    def replay(self, zula):
+        """Re-applies log records newer than the snapshot. Returns how many were applied."""
+        if not os.path.exists(self.log_path):
+            return 0
+        applied = 0
+        self.replaying = True
+        listeners, zula.listeners = zula.listeners, [] # Replayed changes are not announced again
+        try:
+            with open(self.log_path) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        self.torn = True
+                        break # Torn final write from a crash: everything before it is intact
+                    if record["seq"] <= self.seq:
+                        continue # Already contained in the snapshot
+                    zula.apply_journal_record(record["op"], record["args"], record["kwargs"])
+                    self.seq = record["seq"]
+                    applied += 1
+        finally:
+            self.replaying = False
+            zula.listeners = listeners
+        self.records_since_snapshot = applied
+        return applied
+
+    def open_log(self):
+        self._log = open(self.log_path, "a")
+
+    def append(self, op, args, kwargs):
+        """Writes one mutation record and flushes it to the OS (and to disk if sync is set)."""
+        self.seq += 1
+        self._log.write(json.dumps({"seq": self.seq, "op": op, "args": args, "kwargs": kwargs}) + "\n")
+        self._log.flush()
+        if self.sync:
+            os.fsync(self._log.fileno())
+        self.records_since_snapshot += 1
+
+    def snapshot(self, zula):
+        """Saves the whole system as JSON, then starts a fresh log."""
+        temp_path = self.snapshot_path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"seq": self.seq, "system": zula.to_snapshot()}, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.snapshot_path)
+        # Records up to self.seq are now in the snapshot; replay would skip them even if truncation is lost
+        if self._log:
+            self._log.close()
+        self._log = open(self.log_path, "w")
+        self.records_since_snapshot = 0
+
+    def close(self):
+        if self._log:
+            self._log.close()
+            self._log = None
+
+def journaled(method):
+    """
+    Marks a ZulaSystem method as a loggable mutation. When the outermost call succeeds
+    (returns something other than None/False) it is recorded so replay can call it again.
+    Only deterministic methods are marked; ride bookings and random redirects log their outcome instead.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.journal is None or self.journal.replaying:
+            return method(self, *args, **kwargs)
+        self._journal_depth += 1
+        try:
+            result = method(self, *args, **kwargs)
+        finally:
+            self._journal_depth -= 1
+        if result is not None and result is not False:
+            self._record(method.__name__, list(args), kwargs)
+        return result
+    wrapper.journaled = True
+    return wrapper
+
+def bulk_import(method):
+    """Runs a ZulaSystem bulk loader with its store writes deferred to one commit (see SQLiteStore.bulk)."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not self.store:
+            return method(self, *args, **kwargs)
+        with self.store.bulk():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+class SQLiteStore:
+    """
+    SQLite storage backend for a ZulaSystem (see ZulaSystem(store=...)).
+    Users, cabs, locations, road edges, booked and completed rides are written through to the
+    database; the system's dicts stay the hot cache that matching runs against.
+    Signups, admin changes, cab moves and bookings commit immediately. Completed rides (with their
+    driver's and cab's new state, and the ID counters) are queued and committed in batches of
+    `batch_size`, or once the oldest has waited `max_batch_seconds` (see flush_due), in one
+    transaction with one executemany per table; repeated updates to a row are coalesced. A crash
+    before a batch commits loses nothing: those rides are still in active_rides and complete
+    again on restart. bulk() defers every write to a single commit for imports.
+    The database runs in WAL mode, and ride history is indexed by customer and driver.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY, role TEXT NOT NULL, name TEXT NOT NULL, password TEXT NOT NULL,
+            age INTEGER, gender TEXT, current_location_id INTEGER,
+            is_on_rest INTEGER NOT NULL DEFAULT 0, rest_until REAL,
+            total_trips INTEGER NOT NULL DEFAULT 0, total_fare_earned REAL NOT NULL DEFAULT 0,
+            total_commission_earned REAL NOT NULL DEFAULT 0);
+        CREATE TABLE IF NOT EXISTS locations (id INTEGER PRIMARY KEY, name TEXT NOT NULL, x REAL, y REAL);
+        CREATE TABLE IF NOT EXISTS edges (loc1_id INTEGER NOT NULL, loc2_id INTEGER NOT NULL, weight NOT NULL);
+        CREATE TABLE IF NOT EXISTS cabs (id INTEGER PRIMARY KEY, driver_id INTEGER NOT NULL, current_location_id INTEGER NOT NULL);
+        CREATE TABLE IF NOT EXISTS rides (
+            id INTEGER PRIMARY KEY, customer_id INTEGER NOT NULL, driver_id INTEGER NOT NULL, cab_id INTEGER NOT NULL,
+            source_id INTEGER NOT NULL, destination_id INTEGER NOT NULL, fare REAL NOT NULL,
+            zula_commission REAL NOT NULL, path TEXT NOT NULL, start_time REAL NOT NULL, end_time REAL NOT NULL);
+        CREATE TABLE IF NOT EXISTS active_rides (
+            id INTEGER PRIMARY KEY, customer_id INTEGER NOT NULL, driver_id INTEGER NOT NULL, cab_id INTEGER NOT NULL,
+            source_id INTEGER NOT NULL, destination_id INTEGER NOT NULL, fare REAL NOT NULL,
+            zula_commission REAL NOT NULL, path TEXT NOT NULL, start_time REAL NOT NULL, end_time REAL NOT NULL);
+        CREATE INDEX IF NOT EXISTS rides_by_customer ON rides (customer_id, end_time);
+        CREATE INDEX IF NOT EXISTS rides_by_driver ON rides (driver_id, end_time);
+        CREATE INDEX IF NOT EXISTS cabs_by_driver ON cabs (driver_id);
+    """
+    # Statements are fixed strings, so sqlite3 prepares each once and reuses it from its statement cache
+    UPSERT_USER = "INSERT OR REPLACE INTO users VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    UPSERT_LOCATION = "INSERT OR REPLACE INTO locations VALUES (?, ?, ?, ?)"
+    UPSERT_CAB = "INSERT OR REPLACE INTO cabs VALUES (?, ?, ?)"
+    UPSERT_META = "INSERT OR REPLACE INTO meta VALUES (?, ?)"
+    INSERT_EDGE = "INSERT INTO edges VALUES (?, ?, ?)"
+    INSERT_RIDE = "INSERT INTO rides VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    UPSERT_ACTIVE_RIDE = "INSERT OR REPLACE INTO active_rides VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    DELETE_USER = "DELETE FROM users WHERE id = ?"
+    DELETE_LOCATION = "DELETE FROM locations WHERE id = ?"
+    DELETE_CAB = "DELETE FROM cabs WHERE id = ?"
+    DELETE_ACTIVE_RIDE = "DELETE FROM active_rides WHERE id = ?"
+    # History is listed in completion order, like the ride ledger
+    RIDE_COLUMNS = "id, customer_id, driver_id, cab_id, source_id, destination_id, fare, zula_commission, path, start_time, end_time"
+
+    def __init__(self, path, batch_size=500, max_batch_seconds=1.0):
+        self.path = path
+        self.batch_size = batch_size # Completed rides per commit; 1 commits every ride immediately
+        self.max_batch_seconds = max_batch_seconds # Longest a queued ride waits for its batch (see flush_due)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL") # Readers don't block the writer, commits append to the WAL
+        self.conn.execute("PRAGMA synchronous=NORMAL") # fsync at checkpoints rather than on every commit
+        self.conn.executescript(self.SCHEMA)
+        # Pending writes, keyed by row ID so a row updated several times is written once
+        self._users = {}
+        self._locations = {}
+        self._cabs = {}
+        self._counters = {}
+        self._active_rides = {}
+        self._deleted = {self.DELETE_USER: set(), self.DELETE_LOCATION: set(), self.DELETE_CAB: set(),
+                         self.DELETE_ACTIVE_RIDE: set()}
+        self._edges = []
+        self._rides = []
+        self.pending = 0
+        self._batch_started = None # time.monotonic() when the oldest uncommitted batched write was queued
+        self._bulk_depth = 0
+
+    def is_empty(self):
+        return self.conn.execute("SELECT 1 FROM users LIMIT 1").fetchone() is None
+
+    # --- Writes ---
+    @staticmethod
+    def _user_row(user):
+        rest_until = None
+        if isinstance(user, Driver):
+            role = "driver"
+            rest_until = user.rest_until.timestamp() if user.rest_until else None
+            row = (user.current_location_id, int(user.is_on_rest), rest_until,
+                   user.total_trips, user.total_fare_earned, user.total_commission_earned)
+        else:
+            role = "customer" if isinstance(user, Customer) else "admin"
+            row = (None, 0, None, 0, 0.0, 0.0)
+        return (user.id, role, user.name, user.password, user.age, user.gender) + row
+
+    @staticmethod
+    def _ride_row(ride):
+        return (ride.id, ride.customer_id, ride.driver_id, ride.cab_id, ride.source_id,
+                ride.destination_id, ride.fare, ride.zula_commission, json.dumps(ride.path),
+                ride.start_time.timestamp(), ride.end_time.timestamp())
+
+    def save_user(self, user):
+        self._users[user.id] = self._user_row(user)
+        self._deleted[self.DELETE_USER].discard(user.id)
+        self._queued()
+
+    def save_location(self, location, coordinates=None):
+        x, y = coordinates if coordinates is not None else (None, None)
+        self._locations[location.id] = (location.id, location.name, x, y)
+        self._deleted[self.DELETE_LOCATION].discard(location.id)
+        self._queued()
+
+    def save_cab(self, cab):
+        self._cabs[cab.id] = (cab.id, cab.driver_id, cab.current_location_id)
+        self._deleted[self.DELETE_CAB].discard(cab.id)
+        self._queued()
+
+    def save_counter(self, name, value):
+        # Batched: a counter only matters once a row using the ID is stored, and it commits with that row
+        self._counters[name] = (name, value)
+        self._queued(batched=True)
+
+    def add_edge(self, loc1_id, loc2_id, weight):
+        self._edges.append((loc1_id, loc2_id, weight))
+        self._queued()
+
+    def add_edges(self, edges):
+        self._edges.extend(edges)
+        self._queued()
+
+    def save_active_ride(self, ride):
+        """Stores a booked ride so a restart puts it back on the road."""
+        self._active_rides[ride.id] = self._ride_row(ride)
+        self._queued()
+
+    def add_ride(self, ride, driver=None, cab=None):
+        """
+        Queues a completed ride for the next batch, together with its driver's and cab's new state
+        and the removal of its active_rides row, so all of them commit in the same transaction.
+        """
+        self._rides.append(self._ride_row(ride))
+        self._active_rides.pop(ride.id, None)
+        self._deleted[self.DELETE_ACTIVE_RIDE].add(ride.id)
+        if driver:
+            self._users[driver.id] = self._user_row(driver)
+        if cab:
+            self._cabs[cab.id] = (cab.id, cab.driver_id, cab.current_location_id)
+        self._queued(batched=True)
+
+    def delete_user(self, user_id):
+        self._users.pop(user_id, None)
+        self._deleted[self.DELETE_USER].add(user_id)
+        self._queued()
+
+    def delete_location(self, location_id):
+        self._locations.pop(location_id, None)
+        self._deleted[self.DELETE_LOCATION].add(location_id)
+        self._queued()
+
+    def delete_cab(self, cab_id):
+        self._cabs.pop(cab_id, None)
+        self._deleted[self.DELETE_CAB].add(cab_id)
+        self._queued()
+
+    def _queued(self, batched=False):
+        """Commits now, unless the write is batched (then only once the batch is full) or inside bulk()."""
+        self.pending += 1
+        if self._bulk_depth:
+            return
+        if not batched or len(self._rides) >= self.batch_size:
+            self.flush()
+        elif self._batch_started is None:
+            self._batch_started = time.monotonic()
+
+    def flush_due(self):
+        """Commits a partial batch once its oldest write has waited max_batch_seconds. Call it periodically."""
+        if self._batch_started is not None and time.monotonic() - self._batch_started >= self.max_batch_seconds:
+            self.flush()
+
+    @contextlib.contextmanager
+    def bulk(self):
+        """Defers every write inside the block to one commit at its end (used by bulk imports)."""
+        self._bulk_depth += 1
+        try:
+            yield self
+        finally:
+            self._bulk_depth -= 1
+            if not self._bulk_depth:
+                self.flush()
+
+    def flush(self):
+        """Commits every queued write in a single transaction."""
+        if not self.pending:
+            return
+        with self.conn:
+            for statement, rows in ((self.UPSERT_USER, self._users), (self.UPSERT_LOCATION, self._locations),
+                                    (self.UPSERT_CAB, self._cabs), (self.UPSERT_META, self._counters),
+                                    (self.UPSERT_ACTIVE_RIDE, self._active_rides)):
+                self.conn.executemany(statement, rows.values())
+                rows.clear()
+            for statement, ids in self._deleted.items():
+                self.conn.executemany(statement, ((row_id,) for row_id in ids))
+                ids.clear()
+            self.conn.executemany(self.INSERT_EDGE, self._edges)
+            self.conn.executemany(self.INSERT_RIDE, self._rides)
+            self._edges.clear()
+            self._rides.clear()
+        self.pending = 0
+        self._batch_started = None
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    # --- Queries (queued writes are committed first so results are current) ---
+    @staticmethod
+    def _ride_from_row(row):
+        return Ride(row[0], row[1], row[2], row[3], row[4], row[5], row[6], row[7], json.loads(row[8]),
+                    datetime.datetime.fromtimestamp(row[9]), datetime.datetime.fromtimestamp(row[10]))
+
+    def rides_for_customer(self, customer_id):
+        self.flush()
+        cursor = self.conn.execute(f"SELECT {self.RIDE_COLUMNS} FROM rides WHERE customer_id = ? ORDER BY end_time, id", (customer_id,))
+        return [self._ride_from_row(row) for row in cursor]
+
+    def rides_for_driver(self, driver_id):
+        self.flush()
+        cursor = self.conn.execute(f"SELECT {self.RIDE_COLUMNS} FROM rides WHERE driver_id = ? ORDER BY end_time, id", (driver_id,))
+        return [self._ride_from_row(row) for row in cursor]
+
+    # --- Startup ---
+    def load_into(self, zula):
+        """Fills an empty ZulaSystem's in-memory cache from the database and puts booked rides back on the road."""
+        with self.bulk(): # Restarted rides are re-saved by _start_ride; one commit at the end
+            self._load_into(zula)
+
+    def _load_into(self, zula):
+        for name, value in self.conn.execute("SELECT key, value FROM meta"):
+            setattr(zula, name, value)
+
+        for location_id, name, x, y in self.conn.execute("SELECT id, name, x, y FROM locations"):
+            zula.locations[location_id] = Location(location_id, name)
+            zula.location_names_to_ids[name] = location_id
+            zula.location_graph.add_node(location_id)
+            if x is not None:
+                zula.location_graph.set_coordinates(location_id, x, y)
+        for loc1_id, loc2_id, weight in self.conn.execute("SELECT loc1_id, loc2_id, weight FROM edges ORDER BY rowid"):
+            zula.location_graph.add_edge(loc1_id, loc2_id, weight)
+
+        for (user_id, role, name, password, age, gender, location_id, is_on_rest, rest_until,
+             total_trips, total_fare_earned, total_commission_earned) in self.conn.execute("SELECT * FROM users ORDER BY id"):
+            if role == "driver":
+                user = Driver(user_id, name, password, age, gender, location_id)
+                user.total_trips = total_trips
+                user.total_fare_earned = total_fare_earned
+                user.total_commission_earned = total_commission_earned
+                if is_on_rest:
+                    user.is_on_rest = True
+                    zula.unavailable_drivers.add(user_id)
+                    if rest_until is not None:
+                        user.rest_until = datetime.datetime.fromtimestamp(rest_until)
+                        zula.scheduler.schedule(user.rest_until, zula._end_rest_if_due, user_id, user.rest_until)
+                zula.cab_drivers[user_id] = user
+            elif role == "customer":
+                user = zula.customers[user_id] = Customer(user_id, name, password, age, gender)
+            else:
+                user = zula.admins[user_id] = Admin(user_id, name, password, age, gender)
+            zula.users_by_credentials[(name, password)] = user_id
+
+        for cab_id, driver_id, location_id in self.conn.execute("SELECT id, driver_id, current_location_id FROM cabs"):
+            zula.cabs[cab_id] = Cab(cab_id, location_id, driver_id)
+            zula.cabs_by_driver[driver_id] = cab_id
+            driver = zula.cab_drivers.get(driver_id)
+            zula.cab_index.add(cab_id, location_id, driver is not None and not driver.is_on_rest)
+
+        for row in self.conn.execute(f"SELECT {self.RIDE_COLUMNS} FROM rides ORDER BY end_time, id"): # Completion order, as in the ledger
+            ride = self._ride_from_row(row)
+            ledger_row = zula.ride_ledger.append(ride)
+            zula.ride_stats.record(ride)
+            for user in (zula.customers.get(ride.customer_id), zula.cab_drivers.get(ride.driver_id)):
+                if user:
+                    user.trip_history.append(ledger_row)
+
+        # Rides booked before the restart complete on the first run_pending_events once their time has passed
+        for row in self.conn.execute(f"SELECT {self.RIDE_COLUMNS} FROM active_rides ORDER BY id"):
+            zula._start_ride(self._ride_from_row(row))
+
+def read_records(file_path):
+    """
+    Streams records (dicts) from a bulk import file, one at a time, so large files are never held in memory.
+    .csv files need a header row; .jsonl/.ndjson files hold one JSON object per line; .json files hold a list of objects.
+    An unparseable JSON line is yielded as None so the loader can count it as skipped and carry on.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    with open(file_path, newline="") as f:
+        if extension == ".csv":
+            yield from csv.DictReader(f)
+        elif extension in (".jsonl", ".ndjson"):
+            for line in f:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        yield None
+        elif extension == ".json":
+            yield from json.load(f)
+        else:
+            raise ValueError(f"Unsupported bulk import format '{extension}' (use .csv, .jsonl or .json).")
+
+def parse_number(value):
+    """
+    Reads a distance or coordinate from a CSV string (JSON values are already numbers).
+    Raises ValueError for anything that is not a finite number, TypeError for a missing value.
+    """
+    if isinstance(value, str):
+        try:
+            value = int(value)
+        except ValueError:
+            value = float(value)
+    if isinstance(value, bool) or not math.isfinite(value):
+        raise ValueError(f"Not a finite number: {value!r}")
+    return value
 
 # --- 2. ZulaSystem - The Core Application Logic ---
 
@@ -191,7 +1586,18 @@ class ZulaSystem:
     Manages all data and operations for the Zula Cab Booking System.
     Acts as the central orchestrator, holding all in-memory data.
     """
-    def __init__(self):
+    MAX_RECOMMENDED_CABS = 5 # Cabs offered per hail; matching stops searching once it has this many
+    TRAVEL_SECONDS_PER_UNIT = 0.05 # Simulated trip duration per unit of distance
+    FAIRNESS_TIEBREAK_WEIGHT = 1e-6 # Per-trip cost added in optimal matching so equal distances favour fewer trips
+    DRIVER_REST_SECONDS = 60 # Mandatory rest after each trip; the driver is released automatically when it ends
+    BULK_ROW_ERRORS = (KeyError, TypeError, ValueError) # Malformed bulk import rows are skipped on these
+
+    SNAPSHOT_EVENTS = ("complete_ride", "_end_rest_if_due") # Scheduled callbacks a snapshot may hold
+
+    def __init__(self, precompute_routes=False, clock=None, routing_landmarks=0, contraction_hierarchy_path=None, store=None, quiet=False, state=None):
+        # Structured events go to each listener as listener(event, fields); quiet=True runs headless
+        self.listeners = [] if quiet else [ConsolePresenter(self)]
+
         self.next_user_id = 1
         self.next_location_id = 1
         self.next_cab_id = 1
@@ -206,14 +1612,191 @@ class ZulaSystem:
         self.locations = {}  # {location_id: Location object}
         self.location_names_to_ids = {} # {location_name: location_id} for quick lookup by name
         self.cabs = {}  # {cab_id: Cab object}
-        # {location_id: [cab_id1, cab_id2, ...]} - for quick lookup of cabs at a location
-        self.cab_locations = {}
+        self.cabs_by_driver = {} # {driver_id: cab_id} - each driver has at most one cab
+        # Cabs per location plus the available, non-resting subset - for quick lookup of cabs at a location
+        self.cab_index = CabIndex()
         self.unavailable_drivers = set() # {driver_id} - for drivers currently on rest
-        self.rides_history = {}  # {ride_id: Ride object} - all completed rides
+        self.ride_ledger = RideLedger() # All completed rides, stored column-wise
+        self.ride_stats = RideStats() # Running fare/commission totals over the ride ledger
+        self.active_rides = {}  # {ride_id: Ride object} - booked rides still on the road
+
+        # Trip completions fire as events on this clock instead of blocking the caller.
+        # Pass VirtualClock().now for simulations; defaults to wall-clock time.
+        self.clock = clock or datetime.datetime.now
+        self.scheduler = EventScheduler(self.clock)
 
         self.location_graph = Graph() # Graph for shortest path calculations
+        self.graph_version = 0 # Bumped on every topology change; invalidates route_cache
+        self.route_cache = RouteCache() # LRU of (source_id, destination_id) -> (distance, path)
+        self.contraction_hierarchy = None # Optional ContractionHierarchy for fast fare/path queries
+        self.contraction_hierarchy_version = None # graph_version the hierarchy matches
+
+        self.journal = None # Optional StateJournal; see open_persistent
+        self._journal_depth = 0 # Nesting of journaled calls; only the outermost one is logged
+        self.store = store # Optional SQLiteStore that every change is written through to
+
+        if state is not None:
+            self._restore_snapshot(state) # Resume from a StateJournal snapshot (see open_persistent)
+        elif store and not store.is_empty():
+            store.load_into(self) # Resume from the database instead of the dummy data
+        else:
+            self.initialize_data() # Populate with initial dummy data
+
+        if precompute_routes:
+            # Road network changes rarely but is queried constantly: pay for all-pairs once
+            self.location_graph.enable_all_pairs_precompute()
+        if routing_landmarks:
+            # ALT heuristic: lets A* fare/path queries on large graphs settle far fewer nodes
+            self.location_graph.enable_landmarks(routing_landmarks)
+        if contraction_hierarchy_path:
+            self.load_contraction_hierarchy(contraction_hierarchy_path)
+
+    @classmethod
+    def open_persistent(cls, directory, snapshot_every=1000, sync=False, **kwargs):
+        """
+        Opens a system backed by a StateJournal in `directory`: loads the latest snapshot
+        (or builds a fresh system on first use) and replays the log tail.
+        kwargs configure the system (clock, routing options, quiet) whether or not a snapshot exists.
+        """
+        journal = StateJournal(directory, snapshot_every, sync)
+        zula = cls(state=journal.load_snapshot(), **kwargs)
+        replayed = journal.replay(zula)
+        zula.journal = journal
+        if replayed or journal.torn or not os.path.exists(journal.snapshot_path):
+            journal.snapshot(zula) # Next start skips what was just replayed
+        else:
+            journal.open_log()
+        return zula
+
+    def _emit(self, event, **fields):
+        """Sends a structured event to every listener. Event names match ConsolePresenter's show_<event> methods."""
+        for listener in self.listeners:
+            listener(event, fields)
+
+    def _record(self, op, args=(), kwargs=None):
+        """Logs one mutation if a journal is attached and this is not a nested or replayed call."""
+        journal = self.journal
+        if journal is None or journal.replaying or self._journal_depth:
+            return
+        journal.append(op, list(args), kwargs or {})
+        if journal.records_since_snapshot >= journal.snapshot_every:
+            journal.snapshot(self)
+
+    def apply_journal_record(self, op, args, kwargs):
+        """Re-applies one logged mutation during replay."""
+        if op == "ride_booked":
+            self._start_ride(self._ride_from_record(kwargs))
+        elif op == "cab_relocated":
+            self._relocate_cab(*args)
+        elif getattr(getattr(type(self), op, None), "journaled", False):
+            getattr(self, op)(*args, **kwargs)
+        else:
+            raise ValueError(f"Unknown journal operation '{op}'.")
+
+    def _ride_to_record(self, ride):
+        return {
+            "id": ride.id, "customer_id": ride.customer_id, "driver_id": ride.driver_id, "cab_id": ride.cab_id,
+            "source_id": ride.source_id, "destination_id": ride.destination_id,
+            "fare": ride.fare, "zula_commission": ride.zula_commission, "path": ride.path,
+            "start_time": ride.start_time.isoformat(), "end_time": ride.end_time.isoformat(),
+        }
+
+    def _ride_from_record(self, record):
+        self.next_ride_id = max(self.next_ride_id, record["id"] + 1)
+        return Ride(record["id"], record["customer_id"], record["driver_id"], record["cab_id"],
+                    record["source_id"], record["destination_id"], record["fare"], record["zula_commission"],
+                    record["path"], datetime.datetime.fromisoformat(record["start_time"]),
+                    datetime.datetime.fromisoformat(record["end_time"]))
+
+    # --- Snapshots (StateJournal) ---
+    # Plain JSON data: entities as lists in constructor order, datetimes as ISO strings, rides as journal records.
+    # Derived structures (route cache, all-pairs table, landmarks, contraction hierarchy) are rebuilt on demand.
+    def to_snapshot(self):
+        """Returns the whole system state as JSON-ready data."""
+        graph = self.location_graph
+        events = []
+        for due_time, sequence, callback, args in self.scheduler.events:
+            if getattr(callback, "__self__", None) is not self or callback.__name__ not in self.SNAPSHOT_EVENTS:
+                raise ValueError(f"Cannot snapshot scheduled callback {callback!r}.")
+            events.append([due_time.isoformat(), sequence, callback.__name__,
+                           [arg.isoformat() if isinstance(arg, datetime.datetime) else arg for arg in args]])
+        return {
+            "counters": [self.next_user_id, self.next_location_id, self.next_cab_id, self.next_ride_id],
+            "graph_version": self.graph_version,
+            "locations": [[location.id, location.name] for location in self.locations.values()],
+            "adjacency": [[node_id, [list(edge) for edge in edges]] for node_id, edges in graph.adj_list.items()],
+            "coordinates": [[node_id, x, y] for node_id, (x, y) in graph.coordinates.items()],
+            "customers": [[c.id, c.name, c.password, c.age, c.gender, list(c.trip_history)] for c in self.customers.values()],
+            "drivers": [[d.id, d.name, d.password, d.age, d.gender, d.current_location_id, d.is_on_rest,
+                         d.rest_until.isoformat() if d.rest_until else None, d.total_trips, d.total_fare_earned,
+                         d.total_commission_earned, list(d.trip_history)] for d in self.cab_drivers.values()],
+            "admins": [[a.id, a.name, a.password, a.age, a.gender] for a in self.admins.values()],
+            "credentials": [[name, password, user_id] for (name, password), user_id in self.users_by_credentials.items()],
+            "cabs": [[cab.id, cab.current_location_id, cab.driver_id, cab.is_available] for cab in self.cabs.values()],
+            "cabs_by_driver": list(map(list, self.cabs_by_driver.items())),
+            "cab_index": [[location_id, [[cab_id, self.cab_index.is_available(cab_id)] for cab_id in cab_ids]]
+                          for location_id, cab_ids in self.cab_index.cabs_at.items()],
+            "unavailable_drivers": sorted(self.unavailable_drivers),
+            "rides": [self._ride_to_record(ride) for ride in self.ride_ledger.rides()],
+            "active_rides": [self._ride_to_record(ride) for ride in self.active_rides.values()],
+            "events": events,
+            "event_sequence": self.scheduler._sequence,
+        }
 
-        self.initialize_data() # Populate with initial dummy data
+    def _restore_snapshot(self, state):
+        """Fills an empty system from to_snapshot() data."""
+        self.next_user_id, self.next_location_id, self.next_cab_id, self.next_ride_id = state["counters"]
+        self.graph_version = state["graph_version"]
+        for location_id, name in state["locations"]:
+            self.locations[location_id] = Location(location_id, name)
+            self.location_names_to_ids[name] = location_id
+        graph = self.location_graph
+        for node_id, edges in state["adjacency"]:
+            graph.adj_list[node_id] = [tuple(edge) for edge in edges]
+        for node_id, x, y in state["coordinates"]:
+            graph.set_coordinates(node_id, x, y)
+        graph._topology_changed()
+
+        for user_id, name, password, age, gender, trip_history in state["customers"]:
+            customer = self.customers[user_id] = Customer(user_id, name, password, age, gender)
+            customer.trip_history.extend(trip_history)
+        for (user_id, name, password, age, gender, location_id, is_on_rest, rest_until,
+             total_trips, total_fare_earned, total_commission_earned, trip_history) in state["drivers"]:
+            driver = self.cab_drivers[user_id] = Driver(user_id, name, password, age, gender, location_id)
+            driver.is_on_rest = is_on_rest
+            driver.rest_until = datetime.datetime.fromisoformat(rest_until) if rest_until else None
+            driver.total_trips = total_trips
+            driver.total_fare_earned = total_fare_earned
+            driver.total_commission_earned = total_commission_earned
+            driver.trip_history.extend(trip_history)
+        for user_id, name, password, age, gender in state["admins"]:
+            self.admins[user_id] = Admin(user_id, name, password, age, gender)
+        for name, password, user_id in state["credentials"]:
+            self.users_by_credentials[(name, password)] = user_id
+
+        for cab_id, location_id, driver_id, is_available in state["cabs"]:
+            cab = self.cabs[cab_id] = Cab(cab_id, location_id, driver_id)
+            cab.is_available = is_available
+        self.cabs_by_driver = dict(state["cabs_by_driver"])
+        for location_id, entries in state["cab_index"]:
+            for cab_id, available in entries:
+                self.cab_index.add(cab_id, location_id, available)
+        self.unavailable_drivers = set(state["unavailable_drivers"])
+
+        for record in state["rides"]:
+            ride = self._ride_from_record(record)
+            self.ride_ledger.append(ride)
+            self.ride_stats.record(ride)
+        for record in state["active_rides"]:
+            ride = self._ride_from_record(record)
+            self.active_rides[ride.id] = ride
+        for due_time, sequence, name, args in state["events"]:
+            if name not in self.SNAPSHOT_EVENTS:
+                raise ValueError(f"Unknown scheduled event '{name}' in snapshot.")
+            if name == "_end_rest_if_due":
+                args = [args[0], datetime.datetime.fromisoformat(args[1])]
+            self.scheduler.events.append((datetime.datetime.fromisoformat(due_time), sequence, getattr(self, name), tuple(args)))
+        self.scheduler._sequence = state["event_sequence"] # Events were saved in heap order, so the list is still a heap
 
     def _generate_id(self, prefix):
         """Generates a unique ID based on the prefix."""
@@ -231,6 +1814,8 @@ class ZulaSystem:
             self.next_ride_id += 1
         else:
             raise ValueError("Invalid ID prefix")
+        if self.store:
+            self.store.save_counter(f"next_{prefix}_id", _id + 1)
         return _id
 
     # --- Task 1: Initialize Tables ---
@@ -289,6 +1874,10 @@ class ZulaSystem:
     def get_cab_by_id(self, cab_id):
         return self.cabs.get(cab_id)
 
+    def get_cab_for_driver(self, driver_id):
+        cab_id = self.cabs_by_driver.get(driver_id)
+        return self.cabs.get(cab_id) if cab_id is not None else None
+
     def get_location_name(self, location_id):
         loc = self.get_location_by_id(location_id)
         return loc.name if loc else "Unknown Location"
@@ -302,10 +1891,11 @@ class ZulaSystem:
         return driver.name if driver else "Unknown Driver"
 
     # --- Task 2: Login / Sign Up ---
+    @journaled
     def signup(self, user_type, name, password, age, gender, initial_location_name=None):
         """Registers a new user (customer, driver, or admin)."""
         if (name, password) in self.users_by_credentials:
-            print(f"Error: User with name '{name}' and password already exists.")
+            self._emit("error", message=f"Error: User with name '{name}' and password already exists.")
             return None
 
         user_id = self._generate_id("user")
@@ -316,11 +1906,11 @@ class ZulaSystem:
             self.customers[user_id] = user
         elif user_type == "driver":
             if not initial_location_name:
-                print("Error: Driver must have an initial location.")
+                self._emit("error", message="Error: Driver must have an initial location.")
                 return None
             location_id = self._get_location_id_by_name(initial_location_name)
             if location_id is None:
-                print(f"Error: Location '{initial_location_name}' not found.")
+                self._emit("error", message=f"Error: Location '{initial_location_name}' not found.")
                 return None
 
             user = Driver(user_id, name, password, age, gender, location_id)
@@ -330,26 +1920,29 @@ class ZulaSystem:
             cab_id = self._generate_id("cab")
             cab = Cab(cab_id, location_id, user_id)
             self.cabs[cab_id] = cab
-            if location_id not in self.cab_locations:
-                self.cab_locations[location_id] = []
-            self.cab_locations[location_id].append(cab_id)
-            print(f"Cab {cab_id} assigned to driver {user.name} at {self.get_location_name(location_id)}.")
+            self.cabs_by_driver[user_id] = cab_id
+            self.cab_index.add(cab_id, location_id)
+            if self.store:
+                self.store.save_cab(cab)
+            self._emit("cab_assigned", cab_id=cab_id, driver_name=user.name, location_id=location_id)
         elif user_type == "admin":
             user = Admin(user_id, name, password, age, gender)
             self.admins[user_id] = user
         else:
-            print("Invalid user type.")
+            self._emit("error", message="Invalid user type.")
             return None
 
         self.users_by_credentials[(name, password)] = user_id
-        print(f"Successfully signed up {user_type} {name} with ID {user_id}.")
+        if self.store:
+            self.store.save_user(user)
+        self._emit("user_signed_up", user_type=user_type, name=name, user_id=user_id)
         return user
 
     def login(self, user_type, name, password):
         """Authenticates a user for login."""
         user_id = self.users_by_credentials.get((name, password))
         if not user_id:
-            print("Login failed: Invalid credentials.")
+            self._emit("error", message="Login failed: Invalid credentials.")
             return None
 
         user = None
@@ -360,51 +1953,95 @@ class ZulaSystem:
         elif user_type == "admin" and user_id in self.admins:
             user = self.admins[user_id]
         else:
-            print("Login failed: User type mismatch or user not found.")
+            self._emit("error", message="Login failed: User type mismatch or user not found.")
             return None
 
         if user and user.login(name, password):
-            print(f"Login successful for {user_type} {name}.")
+            self._emit("logged_in", user_type=user_type, name=name)
             return user
         else:
-            print("Login failed: Internal error or credentials mismatch.")
+            self._emit("error", message="Login failed: Internal error or credentials mismatch.")
             return None
 
     # --- Task 4: Hail a Cab & Fare Calculation (Updated for optimal path) ---
     def calculate_fare(self, source_id, destination_id):
         """Calculates fare based on the shortest path distance."""
-        distance, _ = self.location_graph.get_shortest_path(source_id, destination_id)
+        distance, _ = self.get_optimal_path(source_id, destination_id)
         if distance == float('inf'):
             return None # No path found
         fare = distance * 10 # Fare is distance multiplied by 10 for each unit
         return fare
 
     def get_optimal_path(self, source_id, destination_id):
-        """Returns the optimal path (list of location IDs) and its distance."""
-        return self.location_graph.get_shortest_path(source_id, destination_id)
+        """
+        Returns the optimal distance and path (list of location IDs), served from the route cache when possible.
+        Misses are answered by the contraction hierarchy if one matches the current graph, else by the graph itself.
+        """
+        route = self.route_cache.get(source_id, destination_id, self.graph_version)
+        if route is None:
+            if self.contraction_hierarchy and self.contraction_hierarchy_version == self.graph_version:
+                route = self.contraction_hierarchy.get_shortest_path(source_id, destination_id)
+            else:
+                route = self.location_graph.get_shortest_path(source_id, destination_id)
+            self.route_cache.put(source_id, destination_id, self.graph_version, route)
+        return route
+
+    def build_contraction_hierarchy(self, file_path=None):
+        """Preprocesses the current road network into a contraction hierarchy, optionally saving it."""
+        self.contraction_hierarchy = ContractionHierarchy.build(self.location_graph)
+        self.contraction_hierarchy_version = self.graph_version
+        if file_path:
+            self.contraction_hierarchy.save(file_path)
+        return self.contraction_hierarchy
+
+    def load_contraction_hierarchy(self, file_path):
+        """Loads a saved contraction hierarchy if it was built from the current road network."""
+        try:
+            hierarchy = ContractionHierarchy.load(file_path)
+        except (OSError, ValueError, KeyError) as e:
+            self._emit("warning", message=f"Warning: Could not load contraction hierarchy from '{file_path}': {e}")
+            return False
+        if hierarchy.fingerprint != ContractionHierarchy.graph_fingerprint(self.location_graph):
+            self._emit("warning", message=f"Warning: Contraction hierarchy in '{file_path}' does not match the road network. Using Dijkstra.")
+            return False
+        self.contraction_hierarchy = hierarchy
+        self.contraction_hierarchy_version = self.graph_version
+        return True
 
-    def get_closest_available_driver_info(self, source_location_id):
+    def get_closest_available_driver_info(self, source_location_id, limit=None):
         """
         Finds available drivers closest to the source, prioritizing those
         not on rest and then by fair allocation (fewer trips).
+        Reads candidates from the cab index: Dijkstra expands outward from the pickup
+        only until `limit` cabs are found (all of them if limit is None). When the
+        graph keeps an all-pairs table, each available cab is scored straight from the table.
         """
+        graph = self.location_graph
         available_cabs_info = []
-        for cab_id, cab in self.cabs.items():
-            if not cab.is_available: # Cab is currently on a trip
-                continue
-
-            driver = self.get_driver_by_id(cab.driver_id)
-            if not driver or driver.is_on_rest: # Task 3: Driver is on rest
-                continue
-
-            # Calculate path from cab's current location to customer's pickup location
-            dist_to_pickup, path_to_pickup = self.get_optimal_path(cab.current_location_id, source_location_id)
 
-            if dist_to_pickup != float('inf'): # Only consider if a path exists
+        if graph.all_pairs_enabled:
+            for location_id, cab_ids in self.cab_index.available_at.items():
+                dist_to_pickup = graph.get_distance(location_id, source_location_id)
+                if dist_to_pickup == float('inf'): # Only consider if a path exists
+                    continue
+                _, path_to_pickup = graph.get_shortest_path(location_id, source_location_id)
+                for cab_id in cab_ids:
+                    available_cabs_info.append({
+                        "cab_id": cab_id,
+                        "driver_id": self.cabs[cab_id].driver_id,
+                        "current_location_id": location_id,
+                        "distance_to_pickup": dist_to_pickup,
+                        "path_to_pickup": path_to_pickup
+                    })
+        else:
+            matches, previous_nodes = self.cab_index.nearest_available(graph, source_location_id, limit)
+            for cab_id, location_id, dist_to_pickup in matches:
+                # The search tree is rooted at the pickup, so reverse it to get cab -> pickup
+                path_to_pickup = graph.reconstruct_path(previous_nodes, source_location_id, location_id)[::-1]
                 available_cabs_info.append({
-                    "cab_id": cab.id,
-                    "driver_id": driver.id,
-                    "current_location_id": cab.current_location_id,
+                    "cab_id": cab_id,
+                    "driver_id": self.cabs[cab_id].driver_id,
+                    "current_location_id": location_id,
                     "distance_to_pickup": dist_to_pickup,
                     "path_to_pickup": path_to_pickup
                 })
@@ -412,6 +2049,8 @@ class ZulaSystem:
         # Task 8: Allocate fairly - sort by distance to pickup, then by driver's total trips
         available_cabs_info.sort(key=lambda x: (x["distance_to_pickup"], self.cab_drivers[x["driver_id"]].total_trips))
 
+        if limit is not None:
+            available_cabs_info = available_cabs_info[:limit]
         return available_cabs_info
 
     def hail_cab(self, customer_id, source_location_name, destination_location_name):
@@ -420,35 +2059,30 @@ class ZulaSystem:
         """
         customer = self.get_customer_by_id(customer_id)
         if not customer:
-            print("Error: Customer not found.")
+            self._emit("error", message="Error: Customer not found.")
             return None
 
+        self.run_pending_events() # Release cabs whose trips have already finished
+
         source_loc_id = self._get_location_id_by_name(source_location_name)
         dest_loc_id = self._get_location_id_by_name(destination_location_name)
         if source_loc_id is None:
-            print(f"Error: Source location '{source_location_name}' not found.")
+            self._emit("error", message=f"Error: Source location '{source_location_name}' not found.")
             return None
         if dest_loc_id is None:
-            print(f"Error: Destination location '{destination_location_name}' not found.")
-            return None
-
-        fare_for_ride = self.calculate_fare(source_loc_id, dest_loc_id)
-        if fare_for_ride is None:
-            print("Error: No path found between source and destination. Cannot hail cab.")
+            self._emit("error", message=f"Error: Destination location '{destination_location_name}' not found.")
             return None
 
-        ride_path, ride_distance = self.get_optimal_path(source_loc_id, dest_loc_id)
+        # One route lookup per request: fare and path both come from the same result
+        ride_distance, ride_path = self.get_optimal_path(source_loc_id, dest_loc_id)
         if ride_distance == float('inf'):
-            print("Error: No optimal path found for the ride. Cannot hail cab.")
+            self._emit("error", message="Error: No path found between source and destination. Cannot hail cab.")
             return None
+        fare_for_ride = ride_distance * 10 # Same rate as calculate_fare
 
         recommended_cabs_info = []
-        closest_drivers_info = self.get_closest_available_driver_info(source_loc_id)
+        closest_drivers_info = self.get_closest_available_driver_info(source_loc_id, limit=self.MAX_RECOMMENDED_CABS)
 
-        print("\nRecommended Cabs:")
-        print("-------------------------------------------------------------------------------------------------")
-        print(f"{'Cab Location':<15} {'Cab ID':<10} {'Driver':<15} {'Dist to Pickup':<18} {'Ride Fare':<12} {'Optimal Path':<30}")
-        print("-------------------------------------------------------------------------------------------------")
         for cab_info in closest_drivers_info:
             cab_id = cab_info["cab_id"]
             driver_id = cab_info["driver_id"]
@@ -469,18 +2103,16 @@ class ZulaSystem:
                     "fare": fare_for_ride,
                     "ride_path": ride_path # This is the path for the actual ride
                 })
-                path_names = "->".join([self.get_location_name(loc_id) for loc_id in ride_path])
-                print(f"{self.get_location_name(current_location_id):<15} {cab_id:<10} {driver.name:<15} {distance_to_pickup:<18.2f} ${fare_for_ride:<11.2f} {path_names:<30}")
+        self._emit("cabs_recommended", cabs=recommended_cabs_info, ride_path=ride_path)
 
         if not recommended_cabs_info:
-            print("No cabs available at the moment or no path found for the requested ride.")
+            self._emit("notice", message="No cabs available at the moment or no path found for the requested ride.")
             return None
 
         # For simplicity, automatically select the first recommended cab.
         # In a real system, the customer would choose and "accept".
         chosen_cab_info = recommended_cabs_info[0]
-        print(f"\nCustomer confirms booking with Cab ID {chosen_cab_info['cab_id']} "
-              f"driven by {chosen_cab_info['driver_name']}.")
+        self._emit("booking_confirmed", cab_id=chosen_cab_info["cab_id"], driver_name=chosen_cab_info["driver_name"])
 
         # Process the ride
         ride = self.process_ride(
@@ -494,83 +2126,232 @@ class ZulaSystem:
         )
         return ride
 
+    def hail_cabs_batch(self, requests, strategy="greedy"):
+        """
+        Matches a whole batch of hails in one pass.
+        requests: list of (customer_id, source_location_name, destination_location_name).
+        Routes are shared per distinct (source, destination) pair and the cab search runs once
+        per distinct pickup location.
+        strategy "greedy": requests are served in order, each taking the best cab not already
+        assigned earlier in the batch.
+        strategy "optimal": minimizes total pickup distance over the whole batch (Hungarian
+        algorithm), still preferring drivers with fewer trips on equal distances.
+        Returns a list aligned with `requests`: the booked Ride, or None if it could not be served.
+        """
+        if strategy not in ("greedy", "optimal"):
+            raise ValueError(f"Unknown matching strategy '{strategy}'")
+
+        self.run_pending_events() # Release cabs whose trips have already finished
+
+        results = [None] * len(requests)
+        valid_requests = [] # [(index, customer_id, source_id, destination_id, distance, path)]
+        for index, (customer_id, source_location_name, destination_location_name) in enumerate(requests):
+            if not self.get_customer_by_id(customer_id):
+                self._emit("error", message=f"Batch request {index}: customer {customer_id} not found.")
+                continue
+            source_loc_id = self._get_location_id_by_name(source_location_name)
+            dest_loc_id = self._get_location_id_by_name(destination_location_name)
+            if source_loc_id is None or dest_loc_id is None:
+                self._emit("error", message=f"Batch request {index}: unknown location '{source_location_name}' or '{destination_location_name}'.")
+                continue
+            ride_distance, ride_path = self.get_optimal_path(source_loc_id, dest_loc_id)
+            if ride_distance == float('inf'):
+                self._emit("error", message=f"Batch request {index}: no path from {source_location_name} to {destination_location_name}.")
+                continue
+            valid_requests.append((index, customer_id, source_loc_id, dest_loc_id, ride_distance, ride_path))
+
+        # One search per distinct pickup. Asking for as many cabs as there are requests
+        # guarantees a free candidate even if every other request takes one of ours.
+        candidates_by_pickup = {}
+        for _, _, source_loc_id, _, _, _ in valid_requests:
+            if source_loc_id not in candidates_by_pickup:
+                candidates_by_pickup[source_loc_id] = self.get_closest_available_driver_info(
+                    source_loc_id, limit=len(valid_requests))
+
+        if strategy == "optimal":
+            chosen_cabs = self._assign_batch_optimally(valid_requests, candidates_by_pickup)
+        else:
+            chosen_cabs = self._assign_batch_greedily(valid_requests, candidates_by_pickup)
+
+        for (index, customer_id, source_loc_id, dest_loc_id, ride_distance, ride_path), chosen_cab_info in zip(valid_requests, chosen_cabs):
+            if not chosen_cab_info:
+                self._emit("error", message=f"Batch request {index}: no cab available.")
+                continue
+            results[index] = self.process_ride(
+                customer_id,
+                chosen_cab_info["driver_id"],
+                chosen_cab_info["cab_id"],
+                source_loc_id,
+                dest_loc_id,
+                ride_distance * 10, # Same rate as calculate_fare
+                ride_path
+            )
+        return results
+
+    def _assign_batch_greedily(self, valid_requests, candidates_by_pickup):
+        """Gives each request, in order, its best candidate cab not yet taken in this batch."""
+        assigned_cab_ids = set()
+        chosen_cabs = []
+        for _, _, source_loc_id, _, _, _ in valid_requests:
+            chosen_cab_info = next((info for info in candidates_by_pickup[source_loc_id]
+                                    if info["cab_id"] not in assigned_cab_ids), None)
+            if chosen_cab_info:
+                assigned_cab_ids.add(chosen_cab_info["cab_id"])
+            chosen_cabs.append(chosen_cab_info)
+        return chosen_cabs
+
+    def _assign_batch_optimally(self, valid_requests, candidates_by_pickup):
+        """
+        Solves the batch as an assignment problem: rows are requests, columns are every cab
+        that is a candidate for at least one pickup, cost is distance to pickup plus a tiny
+        per-trip fairness term. Each pickup's candidate list holds as many cabs as the batch
+        has requests, which is enough for an optimal assignment to exist among them.
+        """
+        cab_columns = {} # {cab_id: column index}
+        for candidates in candidates_by_pickup.values():
+            for info in candidates:
+                cab_columns.setdefault(info["cab_id"], len(cab_columns))
+
+        # Non-candidate pairs and padding columns get a cost larger than any real assignment
+        max_distance = max((info["distance_to_pickup"] for candidates in candidates_by_pickup.values()
+                            for info in candidates), default=0)
+        unassignable_cost = (max_distance + 1) * (len(valid_requests) + 1)
+        column_count = max(len(cab_columns), len(valid_requests))
+
+        cost_rows_by_pickup = {}
+        for source_loc_id, candidates in candidates_by_pickup.items():
+            row = [unassignable_cost] * column_count
+            for info in candidates:
+                driver = self.cab_drivers[info["driver_id"]]
+                row[cab_columns[info["cab_id"]]] = info["distance_to_pickup"] + self.FAIRNESS_TIEBREAK_WEIGHT * driver.total_trips
+            cost_rows_by_pickup[source_loc_id] = row
+        cost_matrix = [cost_rows_by_pickup[source_loc_id] for _, _, source_loc_id, _, _, _ in valid_requests]
+
+        cab_info_by_column = {}
+        for source_loc_id, candidates in candidates_by_pickup.items():
+            for info in candidates:
+                cab_info_by_column[(source_loc_id, cab_columns[info["cab_id"]])] = info
+
+        chosen_cabs = []
+        for (_, _, source_loc_id, _, _, _), column in zip(valid_requests, solve_assignment(cost_matrix)):
+            chosen_cabs.append(cab_info_by_column.get((source_loc_id, column)))
+        return chosen_cabs
+
     def process_ride(self, customer_id, driver_id, cab_id, source_id, destination_id, fare, path):
         """
-        Completes a ride transaction, updates system state, and records history.
+        Books a ride and returns immediately. The cab is taken off the market and the
+        trip completes later, when its arrival event fires (see run_pending_events).
         """
         customer = self.get_customer_by_id(customer_id)
         driver = self.get_driver_by_id(driver_id)
         cab = self.get_cab_by_id(cab_id)
 
         if not all([customer, driver, cab]):
-            print("Error: Invalid data for processing ride.")
+            self._emit("error", message="Error: Invalid data for processing ride.")
             return None
 
         zula_commission = fare * 0.30  # Task 6: Zula's 30% commission
 
-        start_time = datetime.datetime.now()
-        # Simulate travel time based on distance. A small delay per unit of distance.
-        distance, _ = self.get_optimal_path(source_id, destination_id)
+        start_time = self.clock()
+        # Trip duration is based on distance; the ride ends on a scheduled event, not a sleep.
+        distance, _ = self.get_optimal_path(source_id, destination_id) # Route cache hit after hail_cab
         if distance == float('inf'): # Fallback, should not happen if hail_cab works
             distance = 1
-        time.sleep(distance * 0.05) # Adjust sleep time for simulation speed
-        end_time = datetime.datetime.now()
+        end_time = start_time + datetime.timedelta(seconds=distance * self.TRAVEL_SECONDS_PER_UNIT)
 
         ride_id = self._generate_id("ride")
         ride = Ride(ride_id, customer_id, driver_id, cab_id, source_id, destination_id, fare, zula_commission, path, start_time, end_time)
-        self.rides_history[ride_id] = ride
+        self._start_ride(ride)
+        # Matching and the clock make booking non-deterministic, so the outcome is logged rather than the call
+        self._record("ride_booked", kwargs=self._ride_to_record(ride))
 
-        # Update driver and cab status
-        driver.complete_ride(ride)
-        cab.set_location(destination_id) # Cab's location is updated to the destination
-        cab.set_availability(True) # Cab is available after dropping off
-        self.unavailable_drivers.add(driver.id) # Driver is now on rest (Task 3)
+        self._emit("ride_booked", ride=ride, driver_name=driver.name)
+        return ride
 
-        # Update cab_locations mapping in the system's memory
-        self.update_cab_location_in_memory(cab_id, source_id, destination_id)
+    def _start_ride(self, ride):
+        """Puts a booked ride on the road: the cab is unavailable until its completion event fires."""
+        self.active_rides[ride.id] = ride
+        cab = self.get_cab_by_id(ride.cab_id)
+        cab.set_availability(False)
+        self._refresh_cab_availability(cab)
+        self.scheduler.schedule(ride.end_time, self.complete_ride, ride.id)
+        if self.store:
+            self.store.save_active_ride(ride)
+
+    @journaled
+    def complete_ride(self, ride_id):
+        """
+        Finishes an in-flight ride: updates system state and records history.
+        Called by the scheduler when the ride's arrival time is reached.
+        """
+        ride = self.active_rides.pop(ride_id, None)
+        if not ride:
+            return None
 
-        customer.trip_history.append(ride)
+        customer = self.get_customer_by_id(ride.customer_id)
+        driver = self.get_driver_by_id(ride.driver_id)
+        cab = self.get_cab_by_id(ride.cab_id)
+        row = self.ride_ledger.append(ride) # From here on the ride lives only as a ledger row
+        self.ride_stats.record(ride)
 
-        print(f"\nRide completed! Ride ID: {ride.id}")
-        print(f"  From: {self.get_location_name(source_id)} to {self.get_location_name(destination_id)}")
-        print(f"  Cab ID: {cab_id}, Driver: {driver.name}")
-        print(f"  Fare: ${fare:.2f}")
-        print(f"  Zula's Commission: ${zula_commission:.2f}")
-        print(f"  Optimal Path: {' -> '.join([self.get_location_name(loc) for loc in path])}")
-        print(f"  Driver {driver.name} is now on rest.")
+        # Update driver and cab status
+        if driver:
+            driver.complete_ride(ride, row)
+            self.unavailable_drivers.add(driver.id) # Driver is now on rest (Task 3)
+            # Rest runs from the arrival time, even if this event fired late
+            driver.rest_until = ride.end_time + datetime.timedelta(seconds=self.DRIVER_REST_SECONDS)
+            self.scheduler.schedule(driver.rest_until, self._end_rest_if_due, driver.id, driver.rest_until)
+        if cab:
+            cab.set_location(ride.destination_id) # Cab's location is updated to the destination
+            cab.set_availability(True) # Cab is available after dropping off
+            # Update the cab index: new position, and not matchable while the driver rests
+            self.update_cab_location_in_memory(cab.id, ride.source_id, ride.destination_id)
+            self._refresh_cab_availability(cab)
+        if customer:
+            customer.trip_history.append(row)
+        if self.store:
+            self.store.add_ride(ride, driver, cab) # Batched; the ride stays in active_rides until its batch commits
+
+        self._emit("ride_completed", ride=ride, rest_until=driver.rest_until if driver else None)
         return ride
 
+    def run_pending_events(self):
+        """Fires all scheduled events (e.g. trip completions) that are due on the system clock."""
+        fired = self.scheduler.run_due()
+        if self.store:
+            self.store.flush_due() # Also the timer that commits a partial batch of completed rides
+        return fired
+
     # --- Task 5: View Customer History ---
     def view_customer_history(self, customer_id):
-        """Prints the ride history for a given customer."""
+        """Returns a customer's completed rides (and shows them as a table)."""
         customer = self.get_customer_by_id(customer_id)
         if not customer:
-            print("Error: Customer not found.")
+            self._emit("error", message="Error: Customer not found.")
             return
 
-        if not customer.trip_history:
-            print(f"Customer {customer.name} has no ride history.")
-            return
+        rides = self._completed_rides(customer)
+        self._emit("customer_history", customer_name=customer.name, rides=rides)
+        return rides
 
-        print(f"\n--- Ride History for Customer: {customer.name} ---")
-        print("--------------------------------------------------------------------------------------------------------------------")
-        print(f"{'Source':<10} {'Destination':<12} {'Cab ID':<8} {'Fare':<8} {'Driver':<15} {'Zula Commission':<18} {'Path Taken':<30}")
-        print("--------------------------------------------------------------------------------------------------------------------")
-        for ride in customer.trip_history:
-            driver_name = self.get_driver_name(ride.driver_id)
-            source_name = self.get_location_name(ride.source_id)
-            destination_name = self.get_location_name(ride.destination_id)
-            path_names = "->".join([self.get_location_name(loc_id) for loc_id in ride.path])
-            print(f"{source_name:<10} {destination_name:<12} {ride.cab_id:<8} {ride.fare:<8.2f} {driver_name:<15} {ride.zula_commission:<18.2f} {path_names:<30}")
-        print("--------------------------------------------------------------------------------------------------------------------")
+    def _completed_rides(self, user):
+        """A customer's or driver's completed rides: an indexed SQL query if a store is attached, else from the ledger."""
+        if self.store:
+            if isinstance(user, Driver):
+                return self.store.rides_for_driver(user.id)
+            return self.store.rides_for_customer(user.id)
+        return list(self.ride_ledger.rides(user.trip_history))
 
     # --- Task 6: Zula's Commission ---
     def view_zula_commission_summary(self):
-        """Calculates and prints the total commission earned by Zula."""
-        total_zula_commission = sum(ride.zula_commission for ride in self.rides_history.values())
-        print(f"\n--- Zula's Commission Summary ---")
-        print(f"Total Zula's Commission from all rides: ${total_zula_commission:.2f}")
-        return {"total_zula_commission": total_zula_commission}
+        """Returns (and shows) Zula's total commission from the running ride totals (O(1); SQLiteStore.load_into fills them)."""
+        totals = self.ride_stats.totals()
+        self._emit("commission_summary", totals=totals)
+        return {"total_zula_commission": totals["zula_commission"], "total_rides": totals["rides"], "total_fare": totals["fare"]}
+
+    def get_ride_stats(self, group=None, key=None):
+        """Running ride totals, overall or for one driver/cab/location/hour. See RideStats.totals."""
+        return self.ride_stats.totals(group, key)
 
     # --- Task 7: Admin - Redirect Cabs ---
     def redirect_cabs(self, admin_id, source_location_name):
@@ -580,17 +2361,18 @@ class ZulaSystem:
         """
         admin = self.get_admin_by_id(admin_id)
         if not admin:
-            print("Error: Admin not found.")
+            self._emit("error", message="Error: Admin not found.")
             return False
 
         source_loc_id = self._get_location_id_by_name(source_location_name)
         if source_loc_id is None:
-            print(f"Error: Location '{source_location_name}' not found.")
+            self._emit("error", message=f"Error: Location '{source_location_name}' not found.")
             return False
 
-        cabs_at_location = self.cab_locations.get(source_loc_id, [])
+        # Cabs on a ride finish at their drop-off, so only parked cabs count and can be moved
+        cabs_at_location = [cab_id for cab_id in self.cab_index.cabs_at_location(source_loc_id) if self.cabs[cab_id].is_available]
         if len(cabs_at_location) <= 2:
-            print(f"No more than 2 cabs at {source_location_name}. No redirection needed.")
+            self._emit("notice", message=f"No more than 2 cabs at {source_location_name}. No redirection needed.")
             return False
 
         cabs_to_redirect_ids = cabs_at_location[2:] # Keep first 2, redirect the rest
@@ -599,123 +2381,162 @@ class ZulaSystem:
         # Find available target locations (all nodes in the graph except the source)
         target_locations = [loc_id for loc_id in self.locations.keys() if loc_id != source_loc_id]
         if not target_locations:
-            print("No other locations available for redirection.")
+            self._emit("notice", message="No other locations available for redirection.")
             return False
 
-        print(f"\nRedirecting cabs from {self.get_location_name(source_loc_id)}:")
+        moves = [] # [(cab_id, driver_name, new_location_id)]
         for cab_id in cabs_to_redirect_ids:
             cab = self.get_cab_by_id(cab_id)
             if cab:
                 # Select a random new location for the cab
                 new_location_id = random.choice(target_locations)
-                new_location_name = self.get_location_name(new_location_id)
 
-                self.update_cab_location_in_memory(cab.id, source_loc_id, new_location_id)
-                cab.set_location(new_location_id)
+                self._relocate_cab(cab.id, new_location_id)
+                self._record("cab_relocated", [cab.id, new_location_id]) # Random target: log where it went
                 driver = self.get_driver_by_id(cab.driver_id)
-                if driver:
-                    driver.current_location_id = new_location_id
-                print(f"  Cab {cab.id} (Driver: {driver.name if driver else 'N/A'}) redirected from {self.get_location_name(source_loc_id)} to {new_location_name}.")
+                moves.append((cab.id, driver.name if driver else "N/A", new_location_id))
                 redirected_count += 1
-        print(f"Total {redirected_count} cabs redirected.")
+        self._emit("cabs_redirected", source_id=source_loc_id, moves=moves)
         return True
 
+    def _relocate_cab(self, cab_id, new_location_id):
+        """Moves a cab (and its driver) to a new location."""
+        cab = self.get_cab_by_id(cab_id)
+        self.update_cab_location_in_memory(cab_id, cab.current_location_id, new_location_id)
+        cab.set_location(new_location_id)
+        driver = self.get_driver_by_id(cab.driver_id)
+        if driver:
+            driver.current_location_id = new_location_id
+        self._store_cab_and_driver(cab)
+
+    def _store_cab_and_driver(self, cab):
+        """Writes a cab and its driver through to the store, if one is attached."""
+        if self.store:
+            self.store.save_cab(cab)
+            driver = self.get_driver_by_id(cab.driver_id)
+            if driver:
+                self.store.save_user(driver)
+
     def update_cab_location_in_memory(self, cab_id, old_location_id, new_location_id):
-        """Helper to update cab's position in the cab_locations dictionary."""
-        # Remove cab from old location's list
-        if old_location_id in self.cab_locations and cab_id in self.cab_locations[old_location_id]:
-            self.cab_locations[old_location_id].remove(cab_id)
-            if not self.cab_locations[old_location_id]:
-                del self.cab_locations[old_location_id] # Clean up empty list
-
-        # Add cab to new location's list
-        if new_location_id not in self.cab_locations:
-            self.cab_locations[new_location_id] = []
-        if cab_id not in self.cab_locations[new_location_id]: # Avoid duplicates
-            self.cab_locations[new_location_id].append(cab_id)
+        """Helper to update cab's position in the cab index."""
+        self.cab_index.move(cab_id, new_location_id)
+
+    def _refresh_cab_availability(self, cab):
+        """Syncs a cab's entry in the cab index with its own and its driver's state."""
+        driver = self.get_driver_by_id(cab.driver_id)
+        self.cab_index.set_available(cab.id, cab.is_available and driver is not None and not driver.is_on_rest)
+
+    def _end_rest_if_due(self, driver_id, rest_until):
+        """Scheduled rest expiry. Ignored if the rest was already ended (or replaced by a newer one)."""
+        driver = self.get_driver_by_id(driver_id)
+        if driver and driver.rest_until == rest_until:
+            self.end_driver_rest(driver_id)
+
+    @journaled
+    def end_driver_rest(self, driver_id):
+        """Ends a driver's rest period and makes their cab matchable again."""
+        driver = self.get_driver_by_id(driver_id)
+        if not driver or not driver.is_on_rest:
+            return False
+        driver.is_on_rest = False
+        driver.rest_until = None
+        self.unavailable_drivers.discard(driver_id)
+        cab = self.get_cab_for_driver(driver_id)
+        if cab:
+            self._refresh_cab_availability(cab)
+        if self.store:
+            self.store.save_user(driver)
+        return True
 
     # --- Task 8: Allocate fairly to all drivers (Integrated into get_closest_available_driver_info sorting) ---
 
     # --- Task 9: Admin CURD Cabs (Add/ Remove / Update) ---
+    @journaled
     def admin_add_cab(self, admin_id, driver_id, initial_location_name):
         """Admin adds a new cab and assigns it to an existing driver."""
         admin = self.get_admin_by_id(admin_id)
         if not admin:
-            print("Error: Admin not found.")
+            self._emit("error", message="Error: Admin not found.")
             return False
 
         driver = self.get_driver_by_id(driver_id)
         if not driver:
-            print(f"Error: Driver with ID {driver_id} not found.")
+            self._emit("error", message=f"Error: Driver with ID {driver_id} not found.")
             return False
 
         # Check if driver already has a cab
-        for cab_obj in self.cabs.values():
-            if cab_obj.driver_id == driver_id:
-                print(f"Error: Driver {driver.name} already has a cab (ID: {cab_obj.id}).")
-                return False
+        cab_obj = self.get_cab_for_driver(driver_id)
+        if cab_obj:
+            self._emit("error", message=f"Error: Driver {driver.name} already has a cab (ID: {cab_obj.id}).")
+            return False
 
         location_id = self._get_location_id_by_name(initial_location_name)
         if location_id is None:
-            print(f"Error: Location '{initial_location_name}' not found.")
+            self._emit("error", message=f"Error: Location '{initial_location_name}' not found.")
             return False
 
         cab_id = self._generate_id("cab")
         cab = Cab(cab_id, location_id, driver_id)
         self.cabs[cab_id] = cab
-
-        if location_id not in self.cab_locations:
-            self.cab_locations[location_id] = []
-        self.cab_locations[location_id].append(cab_id)
+        self.cabs_by_driver[driver_id] = cab_id
+        self.cab_index.add(cab_id, location_id, not driver.is_on_rest)
 
         driver.current_location_id = location_id # Update driver's location
-        print(f"Admin added Cab {cab_id} for driver {driver.name} at {self.get_location_name(location_id)}.")
+        self._store_cab_and_driver(cab)
+        self._emit("notice", message=f"Admin added Cab {cab_id} for driver {driver.name} at {self.get_location_name(location_id)}.")
         return True
 
+    @journaled
     def admin_remove_cab(self, admin_id, cab_id):
         """Admin removes a cab from the system."""
         admin = self.get_admin_by_id(admin_id)
         if not admin:
-            print("Error: Admin not found.")
+            self._emit("error", message="Error: Admin not found.")
             return False
 
         cab = self.get_cab_by_id(cab_id)
         if not cab:
-            print(f"Error: Cab with ID {cab_id} not found.")
+            self._emit("error", message=f"Error: Cab with ID {cab_id} not found.")
             return False
 
-        # Remove from cab_locations
-        if cab.current_location_id in self.cab_locations and cab_id in self.cab_locations[cab.current_location_id]:
-            self.cab_locations[cab.current_location_id].remove(cab_id)
-            if not self.cab_locations[cab.current_location_id]:
-                del self.cab_locations[cab.current_location_id]
+        # Remove from the cab index
+        self.cab_index.remove(cab_id)
 
         # Remove from cabs dictionary
         del self.cabs[cab_id]
+        if self.cabs_by_driver.get(cab.driver_id) == cab_id:
+            del self.cabs_by_driver[cab.driver_id]
+        if self.store:
+            self.store.delete_cab(cab_id)
 
         # Optionally, disassociate from driver (e.g., driver is now cab-less)
         driver = self.get_driver_by_id(cab.driver_id)
         if driver:
-            print(f"Driver {driver.name} is now without a cab.")
+            self._emit("notice", message=f"Driver {driver.name} is now without a cab.")
 
-        print(f"Admin removed Cab {cab_id}.")
+        self._emit("notice", message=f"Admin removed Cab {cab_id}.")
         return True
 
+    @journaled
     def admin_update_cab_location(self, admin_id, cab_id, new_location_name):
         """Admin updates a cab's current location."""
         admin = self.get_admin_by_id(admin_id)
         if not admin:
-            print("Error: Admin not found.")
+            self._emit("error", message="Error: Admin not found.")
             return False
 
         cab = self.get_cab_by_id(cab_id)
         if not cab:
-            print(f"Error: Cab with ID {cab_id} not found.")
+            self._emit("error", message=f"Error: Cab with ID {cab_id} not found.")
+            return False
+        if not cab.is_available:
+            # complete_ride would put it at the drop-off anyway
+            self._emit("error", message=f"Error: Cab {cab_id} is on a ride and can only be moved once it completes.")
             return False
 
         new_location_id = self._get_location_id_by_name(new_location_name)
         if new_location_id is None:
-            print(f"Error: New location '{new_location_name}' not found.")
+            self._emit("error", message=f"Error: New location '{new_location_name}' not found.")
             return False
 
         old_location_id = cab.current_location_id
@@ -725,39 +2546,46 @@ class ZulaSystem:
         driver = self.get_driver_by_id(cab.driver_id)
         if driver:
             driver.current_location_id = new_location_id
+        self._store_cab_and_driver(cab)
 
-        print(f"Admin updated Cab {cab_id} location from {self.get_location_name(old_location_id)} to {new_location_name}.")
+        self._emit("notice", message=f"Admin updated Cab {cab_id} location from {self.get_location_name(old_location_id)} to {new_location_name}.")
         return True
 
     # --- Task 10: Admin CURD Locations ---
-    def add_location_to_system(self, admin_id=None, name=None):
+    @journaled
+    def add_location_to_system(self, admin_id=None, name=None, coordinates=None):
         """
         Adds a new location to the system and the location graph.
         Can be called by admin or internally during initialization.
+        coordinates: optional (x, y) used by the A* straight-line heuristic.
         """
         if admin_id: # Only require admin for manual add, not for initial data load
             admin = self.get_admin_by_id(admin_id)
             if not admin:
-                print("Error: Admin not found.")
+                self._emit("error", message="Error: Admin not found.")
                 return False
 
         if not name:
-            print("Error: Name is required for adding a location.")
+            self._emit("error", message="Error: Name is required for adding a location.")
             return None
 
         if self._get_location_id_by_name(name) is not None:
-            print(f"Error: Location with name '{name}' already exists.")
+            self._emit("error", message=f"Error: Location with name '{name}' already exists.")
             return None
 
         location_id = self._generate_id("location")
         location = Location(location_id, name)
         self.locations[location_id] = location
         self.location_names_to_ids[name] = location_id
-        self.cab_locations[location_id] = [] # Initialize empty list for cabs at this location
         self.location_graph.add_node(location_id) # Add node to the graph
-        print(f"Location '{name}' (ID: {location_id}) added.")
+        if coordinates is not None:
+            self.location_graph.set_coordinates(location_id, *coordinates)
+        if self.store:
+            self.store.save_location(location, coordinates)
+        self._emit("location_added", name=name, location_id=location_id)
         return location
 
+    @journaled
     def add_road_connection(self, loc1_name, loc2_name, distance):
         """
         Adds a road connection (edge) between two existing locations in the graph.
@@ -766,36 +2594,40 @@ class ZulaSystem:
         loc1_id = self._get_location_id_by_name(loc1_name)
         loc2_id = self._get_location_id_by_name(loc2_name)
         if loc1_id is None or loc2_id is None:
-            print(f"Error: One or both locations ({loc1_name}, {loc2_name}) not found to add connection.")
+            self._emit("error", message=f"Error: One or both locations ({loc1_name}, {loc2_name}) not found to add connection.")
             return False
         if distance <= 0:
-            print("Error: Distance must be positive for a road connection.")
+            self._emit("error", message="Error: Distance must be positive for a road connection.")
             return False
         self.location_graph.add_edge(loc1_id, loc2_id, distance)
-        print(f"Added road connection between {loc1_name} and {loc2_name} with distance {distance}.")
+        self.graph_version += 1 # Cached routes may now have a shorter alternative
+        if self.store:
+            self.store.add_edge(loc1_id, loc2_id, distance)
+        self._emit("road_added", loc1_name=loc1_name, loc2_name=loc2_name, distance=distance)
         return True
 
+    @journaled
     def admin_remove_location(self, admin_id, location_name):
         """Admin removes a location from the system."""
         admin = self.get_admin_by_id(admin_id)
         if not admin:
-            print("Error: Admin not found.")
+            self._emit("error", message="Error: Admin not found.")
             return False
 
         location_id = self._get_location_id_by_name(location_name)
         if location_id is None:
-            print(f"Error: Location '{location_name}' not found.")
+            self._emit("error", message=f"Error: Location '{location_name}' not found.")
             return False
 
         # Check if any cabs are currently at this location
-        if self.cab_locations.get(location_id):
-            print(f"Error: Cannot remove location '{location_name}'. Cabs are currently assigned to it. Redirect them first.")
+        if self.cab_index.count_at(location_id):
+            self._emit("error", message=f"Error: Cannot remove location '{location_name}'. Cabs are currently assigned to it. Redirect them first.")
             return False
 
         # Check if any drivers have this as their current location (without a cab)
         for driver in self.cab_drivers.values():
             if driver.current_location_id == location_id:
-                print(f"Error: Driver {driver.name} is currently at location '{location_name}'. Reassign them first.")
+                self._emit("error", message=f"Error: Driver {driver.name} is currently at location '{location_name}'. Reassign them first.")
                 return False
 
         # NOTE: In a more complex system, you'd also need to handle historical rides
@@ -805,33 +2637,37 @@ class ZulaSystem:
 
         del self.locations[location_id]
         del self.location_names_to_ids[location_name]
-        if location_id in self.cab_locations:
-            del self.cab_locations[location_id] # Remove its entry
+        self.graph_version += 1 # Drop cached routes that may start or end at the removed location
+        if self.store:
+            self.store.delete_location(location_id)
 
-        print(f"Admin removed Location '{location_name}' (ID: {location_id}).")
+        self._emit("notice", message=f"Admin removed Location '{location_name}' (ID: {location_id}).")
         return True
 
+    @journaled
     def admin_update_location_name(self, admin_id, old_location_name, new_location_name):
         """Admin updates a location's name."""
         admin = self.get_admin_by_id(admin_id)
         if not admin:
-            print("Error: Admin not found.")
+            self._emit("error", message="Error: Admin not found.")
             return False
 
         location_obj = self.locations.get(self._get_location_id_by_name(old_location_name))
         if not location_obj:
-            print(f"Error: Location '{old_location_name}' not found.")
+            self._emit("error", message=f"Error: Location '{old_location_name}' not found.")
             return False
 
         if self._get_location_id_by_name(new_location_name) is not None:
-            print(f"Error: A location with the new name '{new_location_name}' already exists.")
+            self._emit("error", message=f"Error: A location with the new name '{new_location_name}' already exists.")
             return False
 
         # Update the name in the Location object and the name-to-ID mapping
         location_obj.name = new_location_name
         del self.location_names_to_ids[old_location_name]
         self.location_names_to_ids[new_location_name] = location_obj.id
-        print(f"Admin updated Location name from '{old_location_name}' to '{new_location_name}'.")
+        if self.store:
+            self.store.save_location(location_obj, self.location_graph.coordinates.get(location_obj.id))
+        self._emit("notice", message=f"Admin updated Location name from '{old_location_name}' to '{new_location_name}'.")
         return True
     
     # NOTE: Updating distances would require removing and re-adding edges in the Graph.
@@ -839,99 +2675,71 @@ class ZulaSystem:
 
     # --- Task 11: View summary of all cabs (Admin) ---
     def view_all_cabs_summary(self, admin_id):
-        """Admin views a detailed summary of all cabs and their drivers."""
+        """
+        Admin views a detailed summary of all cabs and their drivers.
+        Returns one dict per cab (driver_id is None for a cab without a driver).
+        """
         admin = self.get_admin_by_id(admin_id)
         if not admin:
-            print("Error: Admin not found.")
-            return
-
-        print("\n--- Zula Cab Summary (Admin View) ---")
-        if not self.cabs:
-            print("No cabs registered in the system.")
-            return
+            self._emit("error", message="Error: Admin not found.")
+            return None
 
+        cabs = []
         for cab_id, cab in self.cabs.items():
             driver = self.get_driver_by_id(cab.driver_id)
             if not driver:
-                print(f"Cab ID: {cab_id} has no associated driver. Skipping details.")
+                cabs.append({"cab_id": cab_id, "driver_id": None})
                 continue
 
-            print(f"\nCab ID: {cab.id}")
-            print(f"  Driver: {driver.name} (ID: {driver.id})")
-            print(f"  Current Location: {self.get_location_name(cab.current_location_id)}")
-            print(f"  Availability: {'Available' if cab.is_available and not driver.is_on_rest else 'Busy/On Rest'}")
-            print(f"  Total Trips: {driver.total_trips}")
-            print(f"  Total Fare Earned (by driver): ${driver.total_fare_earned:.2f}")
-            print(f"  Total Driver Commission (from Zula): ${driver.total_commission_earned:.2f}")
-
-            print("  Trip Details:")
-            if not driver.trip_history:
-                print("    No trips recorded for this cab/driver.")
-            else:
-                print("    --------------------------------------------------------------------------------------------------------------------")
-                print(f"    {'Source':<10} {'Destination':<12} {'Fare':<8} {'Path Taken':<30} {'Start Time':<20} {'End Time':<20}")
-                print("    --------------------------------------------------------------------------------------------------------------------")
-                for ride in driver.trip_history:
-                    source_name = self.get_location_name(ride.source_id)
-                    destination_name = self.get_location_name(ride.destination_id)
-                    path_names = "->".join([self.get_location_name(loc_id) for loc_id in ride.path])
-                    print(f"    {source_name:<10} {destination_name:<12} {ride.fare:<8.2f} {path_names:<30} {ride.start_time.strftime('%H:%M:%S'):<20} {ride.end_time.strftime('%H:%M:%S'):<20}")
-                print("    --------------------------------------------------------------------------------------------------------------------")
+            rides = self._completed_rides(driver) # Indexed per-driver query with a store attached
+            cabs.append({
+                "cab_id": cab.id,
+                "driver_id": driver.id,
+                "driver_name": driver.name,
+                "current_location_id": cab.current_location_id,
+                "available": cab.is_available and not driver.is_on_rest,
+                "total_trips": driver.total_trips,
+                "total_fare_earned": driver.total_fare_earned,
+                "total_commission_earned": driver.total_commission_earned,
+                "rides": rides,
+            })
+        self._emit("cabs_summary", cabs=cabs)
+        return cabs
 
     # --- Task 12: Driver sees only his/her details ---
     def view_driver_summary(self, driver_id):
-        """A driver views their own performance summary."""
+        """A driver views their own performance summary. Returns the summary dict."""
         driver = self.get_driver_by_id(driver_id)
         if not driver:
-            print("Error: Driver not found.")
-            return
-
-        print(f"\n--- Driver Summary for {driver.name} (ID: {driver.id}) ---")
-        summary = driver.view_my_summary()
-        print(f"  Current Location: {self.get_location_name(driver.current_location_id)}")
-        print(f"  Status: {'On Rest' if driver.is_on_rest else 'Available'}")
-        print(f"  Total Trips: {summary['Total Trips']}")
-        print(f"  Total Fare Earned: ${summary['Total Fare Earned']:.2f}")
-        print(f"  Total Commission from Zula: ${summary['Total Commission Earned (from Zula)']:.2f}")
+            self._emit("error", message="Error: Driver not found.")
+            return None
 
-        print("\n  Trip Details:")
-        if not summary["Trip Details"]:
-            print("    No trips recorded.")
-        else:
-            print("    --------------------------------------------------------------------------------------------------------------------")
-            print(f"    {'Source':<10} {'Destination':<12} {'Fare':<8} {'Path Taken':<30} {'Start Time':<20} {'End Time':<20}")
-            print("    --------------------------------------------------------------------------------------------------------------------")
-            for trip in summary["Trip Details"]:
-                source_name = self.get_location_name(trip['Source'])
-                destination_name = self.get_location_name(trip['Destination'])
-                path_names = "->".join([self.get_location_name(loc_id) for loc_id in trip['Path']])
-                print(f"    {source_name:<10} {destination_name:<12} {trip['Fare']:<8.2f} {path_names:<30} {trip['Start Time']:<20} {trip['End Time']:<20}")
-            print("    --------------------------------------------------------------------------------------------------------------------")
+        summary = driver.view_my_summary(self.ride_ledger)
+        self._emit("driver_summary", driver=driver, summary=summary)
+        return summary
 
     # --- Task 13: Admin CURD All Tables (Users, Locations, Cabs) ---
     # Admin CURD for Cab Driver Table (User management - drivers)
+    @journaled
     def admin_add_driver(self, admin_id, name, password, age, gender, initial_location_name):
         """Admin adds a new driver (and automatically a cab)."""
         return self.signup("driver", name, password, age, gender, initial_location_name)
 
+    @journaled
     def admin_remove_driver(self, admin_id, driver_id):
         """Admin removes a driver and their associated cab."""
         admin = self.get_admin_by_id(admin_id)
         if not admin:
-            print("Error: Admin not found.")
+            self._emit("error", message="Error: Admin not found.")
             return False
 
         driver = self.get_driver_by_id(driver_id)
         if not driver:
-            print(f"Error: Driver with ID {driver_id} not found.")
+            self._emit("error", message=f"Error: Driver with ID {driver_id} not found.")
             return False
 
         # Remove associated cab if any
-        cab_to_remove = None
-        for cab_id, cab in self.cabs.items():
-            if cab.driver_id == driver_id:
-                cab_to_remove = cab_id
-                break
+        cab_to_remove = self.cabs_by_driver.get(driver_id)
         if cab_to_remove:
             self.admin_remove_cab(admin_id, cab_to_remove) # Use admin_remove_cab for consistency
 
@@ -944,19 +2752,23 @@ class ZulaSystem:
                 break
         
         del self.cab_drivers[driver_id]
-        print(f"Admin removed Driver {driver.name} (ID: {driver_id}).")
+        self.unavailable_drivers.discard(driver_id)
+        if self.store:
+            self.store.delete_user(driver_id)
+        self._emit("notice", message=f"Admin removed Driver {driver.name} (ID: {driver_id}).")
         return True
 
+    @journaled
     def admin_update_driver(self, admin_id, driver_id, name=None, password=None, age=None, gender=None, current_location_name=None):
         """Admin updates a driver's details."""
         admin = self.get_admin_by_id(admin_id)
         if not admin:
-            print("Error: Admin not found.")
+            self._emit("error", message="Error: Admin not found.")
             return False
 
         driver = self.get_driver_by_id(driver_id)
         if not driver:
-            print(f"Error: Driver with ID {driver_id} not found.")
+            self._emit("error", message=f"Error: Driver with ID {driver_id} not found.")
             return False
 
         updated = False
@@ -976,17 +2788,20 @@ class ZulaSystem:
             updated = True
         if current_location_name:
             new_loc_id = self._get_location_id_by_name(current_location_name)
-            if new_loc_id:
+            cab = self.get_cab_for_driver(driver_id)
+            if new_loc_id and cab and not cab.is_available:
+                self._emit("warning", message=f"Warning: Driver {driver.name}'s cab is on a ride. Location not changed.")
+            elif new_loc_id:
                 driver.current_location_id = new_loc_id
                 # Also update associated cab's location if it exists
-                for cab_id, cab in self.cabs.items():
-                    if cab.driver_id == driver_id:
-                        self.update_cab_location_in_memory(cab_id, cab.current_location_id, new_loc_id)
-                        cab.set_location(new_loc_id)
-                        break
+                if cab:
+                    self.update_cab_location_in_memory(cab.id, cab.current_location_id, new_loc_id)
+                    cab.set_location(new_loc_id)
+                    if self.store:
+                        self.store.save_cab(cab)
                 updated = True
             else:
-                print(f"Warning: New location '{current_location_name}' not found for driver update. Location not changed.")
+                self._emit("warning", message=f"Warning: New location '{current_location_name}' not found for driver update. Location not changed.")
 
         if updated:
             # Update users_by_credentials if name or password changed
@@ -994,26 +2809,30 @@ class ZulaSystem:
                 if old_name_password in self.users_by_credentials:
                     del self.users_by_credentials[old_name_password]
                 self.users_by_credentials[(driver.name, driver.password)] = driver_id
-            print(f"Admin updated Driver {driver.name} (ID: {driver_id}).")
+            if self.store:
+                self.store.save_user(driver)
+            self._emit("notice", message=f"Admin updated Driver {driver.name} (ID: {driver_id}).")
         else:
-            print(f"No updates for Driver {driver.name} (ID: {driver_id}).")
+            self._emit("notice", message=f"No updates for Driver {driver.name} (ID: {driver_id}).")
         return updated
 
     # Admin CURD for Customer Table (User management - customers)
+    @journaled
     def admin_add_customer(self, admin_id, name, password, age, gender):
         """Admin adds a new customer."""
         return self.signup("customer", name, password, age, gender)
 
+    @journaled
     def admin_remove_customer(self, admin_id, customer_id):
         """Admin removes a customer."""
         admin = self.get_admin_by_id(admin_id)
         if not admin:
-            print("Error: Admin not found.")
+            self._emit("error", message="Error: Admin not found.")
             return False
 
         customer = self.get_customer_by_id(customer_id)
         if not customer:
-            print(f"Error: Customer with ID {customer_id} not found.")
+            self._emit("error", message=f"Error: Customer with ID {customer_id} not found.")
             return False
         
         # Remove from users_by_credentials
@@ -1025,19 +2844,22 @@ class ZulaSystem:
                 break
 
         del self.customers[customer_id]
-        print(f"Admin removed Customer {customer.name} (ID: {customer_id}).")
+        if self.store:
+            self.store.delete_user(customer_id)
+        self._emit("notice", message=f"Admin removed Customer {customer.name} (ID: {customer_id}).")
         return True
 
+    @journaled
     def admin_update_customer(self, admin_id, customer_id, name=None, password=None, age=None, gender=None):
         """Admin updates a customer's details."""
         admin = self.get_admin_by_id(admin_id)
         if not admin:
-            print("Error: Admin not found.")
+            self._emit("error", message="Error: Admin not found.")
             return False
 
         customer = self.get_customer_by_id(customer_id)
         if not customer:
-            print(f"Error: Customer with ID {customer_id} not found.")
+            self._emit("error", message=f"Error: Customer with ID {customer_id} not found.")
             return False
 
         updated = False
@@ -1062,30 +2884,34 @@ class ZulaSystem:
                 if old_name_password in self.users_by_credentials:
                     del self.users_by_credentials[old_name_password]
                 self.users_by_credentials[(customer.name, customer.password)] = customer_id
-            print(f"Admin updated Customer {customer.name} (ID: {customer_id}).")
+            if self.store:
+                self.store.save_user(customer)
+            self._emit("notice", message=f"Admin updated Customer {customer.name} (ID: {customer_id}).")
         else:
-            print(f"No updates for Customer {customer.name} (ID: {customer_id}).")
+            self._emit("notice", message=f"No updates for Customer {customer.name} (ID: {customer_id}).")
         return updated
 
     # Admin CURD for Admin Table (User management - admins)
+    @journaled
     def admin_add_admin(self, admin_id, name, password, age, gender):
         """Admin adds a new admin user."""
         return self.signup("admin", name, password, age, gender)
 
+    @journaled
     def admin_remove_admin(self, admin_id, target_admin_id):
         """Admin removes another admin user."""
         acting_admin = self.get_admin_by_id(admin_id)
         if not acting_admin:
-            print("Error: Admin not found.")
+            self._emit("error", message="Error: Admin not found.")
             return False
 
         if admin_id == target_admin_id:
-            print("Error: An admin cannot remove themselves.")
+            self._emit("error", message="Error: An admin cannot remove themselves.")
             return False
 
         target_admin = self.get_admin_by_id(target_admin_id)
         if not target_admin:
-            print(f"Error: Admin with ID {target_admin_id} not found.")
+            self._emit("error", message=f"Error: Admin with ID {target_admin_id} not found.")
             return False
         
         # Remove from users_by_credentials
@@ -1097,19 +2923,22 @@ class ZulaSystem:
                 break
 
         del self.admins[target_admin_id]
-        print(f"Admin removed Admin {target_admin.name} (ID: {target_admin_id}).")
+        if self.store:
+            self.store.delete_user(target_admin_id)
+        self._emit("notice", message=f"Admin removed Admin {target_admin.name} (ID: {target_admin_id}).")
         return True
 
+    @journaled
     def admin_update_admin(self, admin_id, target_admin_id, name=None, password=None, age=None, gender=None):
         """Admin updates another admin user's details."""
         acting_admin = self.get_admin_by_id(admin_id)
         if not acting_admin:
-            print("Error: Admin not found.")
+            self._emit("error", message="Error: Admin not found.")
             return False
 
         target_admin = self.get_admin_by_id(target_admin_id)
         if not target_admin:
-            print(f"Error: Admin with ID {target_admin_id} not found.")
+            self._emit("error", message=f"Error: Admin with ID {target_admin_id} not found.")
             return False
 
         updated = False
@@ -1134,17 +2963,300 @@ class ZulaSystem:
                 if old_name_password in self.users_by_credentials:
                     del self.users_by_credentials[old_name_password]
                 self.users_by_credentials[(target_admin.name, target_admin.password)] = target_admin_id
-            print(f"Admin updated Admin {target_admin.name} (ID: {target_admin_id}).")
+            if self.store:
+                self.store.save_user(target_admin)
+            self._emit("notice", message=f"Admin updated Admin {target_admin.name} (ID: {target_admin_id}).")
         else:
-            print(f"No updates for Admin {target_admin.name} (ID: {target_admin_id}).")
+            self._emit("notice", message=f"No updates for Admin {target_admin.name} (ID: {target_admin_id}).")
         return updated
 
+    # --- Bulk import (CSV / JSON lines) ---
+    # Loads whole networks and fleets in one pass: no per-row printing, no admin checks, and graph
+    # caches are invalidated once per file. Rows that would fail (missing fields, unparseable numbers,
+    # duplicate names or credentials, unknown locations, non-positive distances) are skipped and counted
+    # instead of reported one by one. Each row is fully parsed before anything is added, so a bad row
+    # never leaves a half-added record behind and the import always reaches _bulk_loaded.
+    @bulk_import
+    def load_locations(self, file_path):
+        """Adds locations from rows with `name` and optional `x`, `y`. Returns (loaded, skipped)."""
+        graph = self.location_graph
+        loaded = skipped = 0
+        for record in read_records(file_path):
+            try:
+                name = record["name"]
+                coordinates = None
+                if record.get("x") not in (None, "") and record.get("y") not in (None, ""):
+                    coordinates = (parse_number(record["x"]), parse_number(record["y"]))
+                duplicate = name in self.location_names_to_ids
+            except self.BULK_ROW_ERRORS:
+                skipped += 1
+                continue
+            if not name or duplicate:
+                skipped += 1
+                continue
+            location_id = self._generate_id("location")
+            location = Location(location_id, name)
+            self.locations[location_id] = location
+            self.location_names_to_ids[name] = location_id
+            graph.adj_list.setdefault(location_id, [])
+            if coordinates is not None:
+                graph.set_coordinates(location_id, *coordinates)
+            if self.store:
+                self.store.save_location(location, coordinates)
+            loaded += 1
+        graph._topology_changed()
+        return self._bulk_loaded("locations", file_path, loaded, skipped)
+
+    @bulk_import
+    def load_roads(self, file_path):
+        """Adds road connections from rows with `from`, `to` (location names) and `distance`. Returns (loaded, skipped)."""
+        names_to_ids = self.location_names_to_ids
+        edges = []
+        skipped = 0
+        for record in read_records(file_path):
+            try:
+                loc1_id = names_to_ids.get(record["from"])
+                loc2_id = names_to_ids.get(record["to"])
+                distance = parse_number(record["distance"])
+            except self.BULK_ROW_ERRORS:
+                skipped += 1
+                continue
+            if loc1_id is None or loc2_id is None or distance <= 0:
+                skipped += 1
+                continue
+            edges.append((loc1_id, loc2_id, distance))
+        self.location_graph.add_edges(edges)
+        self.graph_version += 1
+        if self.store:
+            self.store.add_edges(edges)
+        return self._bulk_loaded("roads", file_path, len(edges), skipped)
+
+    @bulk_import
+    def load_drivers(self, file_path):
+        """
+        Adds drivers, each with a cab at their location, from rows with
+        `name`, `password`, `age`, `gender` and `location` (a location name). Returns (loaded, skipped).
+        """
+        loaded = skipped = 0
+        for record in read_records(file_path):
+            try:
+                name, password, gender = record["name"], record["password"], record["gender"]
+                age = int(record["age"])
+                location_id = self.location_names_to_ids.get(record["location"])
+                duplicate = (name, password) in self.users_by_credentials
+            except self.BULK_ROW_ERRORS:
+                skipped += 1
+                continue
+            if location_id is None or duplicate:
+                skipped += 1
+                continue
+            driver = Driver(self._generate_id("user"), name, password, age, gender, location_id)
+            cab = Cab(self._generate_id("cab"), location_id, driver.id)
+            self.cab_drivers[driver.id] = driver
+            self.users_by_credentials[(name, password)] = driver.id
+            self.cabs[cab.id] = cab
+            self.cabs_by_driver[driver.id] = cab.id
+            self.cab_index.add(cab.id, location_id)
+            if self.store:
+                self.store.save_user(driver)
+                self.store.save_cab(cab)
+            loaded += 1
+        return self._bulk_loaded("drivers", file_path, loaded, skipped)
+
+    @bulk_import
+    def load_customers(self, file_path):
+        """Adds customers from rows with `name`, `password`, `age` and `gender`. Returns (loaded, skipped)."""
+        loaded = skipped = 0
+        for record in read_records(file_path):
+            try:
+                name, password, gender = record["name"], record["password"], record["gender"]
+                age = int(record["age"])
+                duplicate = (name, password) in self.users_by_credentials
+            except self.BULK_ROW_ERRORS:
+                skipped += 1
+                continue
+            if duplicate:
+                skipped += 1
+                continue
+            customer = Customer(self._generate_id("user"), name, password, age, gender)
+            self.customers[customer.id] = customer
+            self.users_by_credentials[(name, password)] = customer.id
+            if self.store:
+                self.store.save_user(customer)
+            loaded += 1
+        return self._bulk_loaded("customers", file_path, loaded, skipped)
+
+    def _bulk_loaded(self, kind, file_path, loaded, skipped):
+        """Reports one bulk import and makes it durable."""
+        if self.store:
+            self.store.flush()
+        if self.journal:
+            # The import is not journaled row by row; a snapshot captures it (and replay never re-reads the file)
+            self.journal.snapshot(self)
+        self._emit("bulk_loaded", kind=kind, file_path=file_path, loaded=loaded, skipped=skipped)
+        return loaded, skipped
+
+
+# --- 3. Console Presentation ---
+
+class ConsolePresenter:
+    """
+    Prints the structured events a ZulaSystem emits as the text the console app shows.
+    Attached to every ZulaSystem unless it is created with quiet=True; formatting (name lookups,
+    path joins, tables) happens only here, so a headless system never pays for it.
+    Each event is handled by the show_<event> method with the event's fields as keyword arguments.
+    """
+    RULE = "-" * 97
+    WIDE_RULE = "-" * 116
+
+    def __init__(self, zula):
+        self.zula = zula
+
+    def __call__(self, event, fields):
+        getattr(self, f"show_{event}")(**fields)
+
+    def path_names(self, path, separator="->"):
+        return separator.join([self.zula.get_location_name(loc_id) for loc_id in path])
+
+    def show_message(self, message):
+        print(message)
+
+    show_error = show_warning = show_notice = show_message
+
+    def show_user_signed_up(self, user_type, name, user_id):
+        print(f"Successfully signed up {user_type} {name} with ID {user_id}.")
+
+    def show_cab_assigned(self, cab_id, driver_name, location_id):
+        print(f"Cab {cab_id} assigned to driver {driver_name} at {self.zula.get_location_name(location_id)}.")
+
+    def show_logged_in(self, user_type, name):
+        print(f"Login successful for {user_type} {name}.")
 
-# --- 3. Main Program Loop for Interaction ---
+    def show_location_added(self, name, location_id):
+        print(f"Location '{name}' (ID: {location_id}) added.")
+
+    def show_road_added(self, loc1_name, loc2_name, distance):
+        print(f"Added road connection between {loc1_name} and {loc2_name} with distance {distance}.")
 
-def main():
-    """Main function to run the Zula Cab Booking System interactive console."""
-    zula = ZulaSystem()
+    def show_bulk_loaded(self, kind, file_path, loaded, skipped):
+        print(f"Loaded {loaded} {kind} from {file_path} ({skipped} skipped).")
+
+    def show_cabs_recommended(self, cabs, ride_path):
+        print("\nRecommended Cabs:")
+        print(self.RULE)
+        print(f"{'Cab Location':<15} {'Cab ID':<10} {'Driver':<15} {'Dist to Pickup':<18} {'Ride Fare':<12} {'Optimal Path':<30}")
+        print(self.RULE)
+        path_names = self.path_names(ride_path) # Same route for every cab
+        for cab in cabs:
+            print(f"{cab['location_name']:<15} {cab['cab_id']:<10} {cab['driver_name']:<15} {cab['distance_to_pickup']:<18.2f} ${cab['fare']:<11.2f} {path_names:<30}")
+
+    def show_booking_confirmed(self, cab_id, driver_name):
+        print(f"\nCustomer confirms booking with Cab ID {cab_id} driven by {driver_name}.")
+
+    def show_ride_booked(self, ride, driver_name):
+        print(f"\nRide booked! Ride ID: {ride.id}")
+        print(f"  From: {self.zula.get_location_name(ride.source_id)} to {self.zula.get_location_name(ride.destination_id)}")
+        print(f"  Cab ID: {ride.cab_id}, Driver: {driver_name}")
+        print(f"  Fare: ${ride.fare:.2f}")
+        print(f"  Optimal Path: {self.path_names(ride.path, ' -> ')}")
+        print(f"  Expected arrival: {ride.end_time.strftime('%H:%M:%S')}")
+
+    def show_ride_completed(self, ride, rest_until):
+        driver_name = self.zula.get_driver_name(ride.driver_id)
+        print(f"\nRide completed! Ride ID: {ride.id}")
+        print(f"  From: {self.zula.get_location_name(ride.source_id)} to {self.zula.get_location_name(ride.destination_id)}")
+        print(f"  Cab ID: {ride.cab_id}, Driver: {driver_name}")
+        print(f"  Fare: ${ride.fare:.2f}")
+        print(f"  Zula's Commission: ${ride.zula_commission:.2f}")
+        if rest_until:
+            print(f"  Driver {driver_name} is now on rest until {rest_until.strftime('%H:%M:%S')}.")
+
+    def show_cabs_redirected(self, source_id, moves):
+        source_name = self.zula.get_location_name(source_id)
+        print(f"\nRedirecting cabs from {source_name}:")
+        for cab_id, driver_name, new_location_id in moves:
+            print(f"  Cab {cab_id} (Driver: {driver_name}) redirected from {source_name} to {self.zula.get_location_name(new_location_id)}.")
+        print(f"Total {len(moves)} cabs redirected.")
+
+    def show_customer_history(self, customer_name, rides):
+        if not rides:
+            print(f"Customer {customer_name} has no ride history.")
+            return
+        print(f"\n--- Ride History for Customer: {customer_name} ---")
+        print(self.WIDE_RULE)
+        print(f"{'Source':<10} {'Destination':<12} {'Cab ID':<8} {'Fare':<8} {'Driver':<15} {'Zula Commission':<18} {'Path Taken':<30}")
+        print(self.WIDE_RULE)
+        for ride in rides:
+            driver_name = self.zula.get_driver_name(ride.driver_id)
+            source_name = self.zula.get_location_name(ride.source_id)
+            destination_name = self.zula.get_location_name(ride.destination_id)
+            print(f"{source_name:<10} {destination_name:<12} {ride.cab_id:<8} {ride.fare:<8.2f} {driver_name:<15} {ride.zula_commission:<18.2f} {self.path_names(ride.path):<30}")
+        print(self.WIDE_RULE)
+
+    def show_commission_summary(self, totals):
+        print(f"\n--- Zula's Commission Summary ---")
+        print(f"Completed rides: {totals['rides']}, Total fare: ${totals['fare']:.2f}")
+        print(f"Total Zula's Commission from all rides: ${totals['zula_commission']:.2f}")
+
+    def print_trip_table(self, trips):
+        """Prints (source_id, destination_id, fare, path, start, end) rows as an indented table."""
+        print(f"    {self.WIDE_RULE}")
+        print(f"    {'Source':<10} {'Destination':<12} {'Fare':<8} {'Path Taken':<30} {'Start Time':<20} {'End Time':<20}")
+        print(f"    {self.WIDE_RULE}")
+        for source_id, destination_id, fare, path, start, end in trips:
+            source_name = self.zula.get_location_name(source_id)
+            destination_name = self.zula.get_location_name(destination_id)
+            print(f"    {source_name:<10} {destination_name:<12} {fare:<8.2f} {self.path_names(path):<30} {start:<20} {end:<20}")
+        print(f"    {self.WIDE_RULE}")
+
+    def show_cabs_summary(self, cabs):
+        print("\n--- Zula Cab Summary (Admin View) ---")
+        if not cabs:
+            print("No cabs registered in the system.")
+            return
+        for cab in cabs:
+            if cab["driver_id"] is None:
+                print(f"Cab ID: {cab['cab_id']} has no associated driver. Skipping details.")
+                continue
+            print(f"\nCab ID: {cab['cab_id']}")
+            print(f"  Driver: {cab['driver_name']} (ID: {cab['driver_id']})")
+            print(f"  Current Location: {self.zula.get_location_name(cab['current_location_id'])}")
+            print(f"  Availability: {'Available' if cab['available'] else 'Busy/On Rest'}")
+            print(f"  Total Trips: {cab['total_trips']}")
+            print(f"  Total Fare Earned (by driver): ${cab['total_fare_earned']:.2f}")
+            print(f"  Total Driver Commission (from Zula): ${cab['total_commission_earned']:.2f}")
+            print("  Trip Details:")
+            if not cab["rides"]:
+                print("    No trips recorded for this cab/driver.")
+            else:
+                self.print_trip_table((ride.source_id, ride.destination_id, ride.fare, ride.path,
+                                       ride.start_time.strftime('%H:%M:%S'), ride.end_time.strftime('%H:%M:%S'))
+                                      for ride in cab["rides"])
+
+    def show_driver_summary(self, driver, summary):
+        print(f"\n--- Driver Summary for {driver.name} (ID: {driver.id}) ---")
+        print(f"  Current Location: {self.zula.get_location_name(driver.current_location_id)}")
+        print(f"  Status: {'On Rest' if driver.is_on_rest else 'Available'}")
+        print(f"  Total Trips: {summary['Total Trips']}")
+        print(f"  Total Fare Earned: ${summary['Total Fare Earned']:.2f}")
+        print(f"  Total Commission from Zula: ${summary['Total Commission Earned (from Zula)']:.2f}")
+        print("\n  Trip Details:")
+        if not summary["Trip Details"]:
+            print("    No trips recorded.")
+        else:
+            self.print_trip_table((trip['Source'], trip['Destination'], trip['Fare'], trip['Path'],
+                                   trip['Start Time'], trip['End Time'])
+                                  for trip in summary["Trip Details"])
+
+
+# --- 4. Main Program Loop for Interaction ---
+
+def main(data_dir=None):
+    """
+    Main function to run the Zula Cab Booking System interactive console.
+    With data_dir, state is kept on disk there (snapshot + journal) and survives restarts.
+    """
+    zula = ZulaSystem.open_persistent(data_dir) if data_dir else ZulaSystem()
     current_user = None
 
     while True:
@@ -1182,6 +3294,7 @@ def main():
             print("0. Logout")
 
         choice = input("Enter your choice: ")
+        zula.run_pending_events() # Complete any trips that arrived while we were waiting for input
 
         if choice == '1': # Login
             user_type = input("Enter user type (customer/driver/admin): ").lower()
@@ -1213,6 +3326,8 @@ def main():
                 current_user = None
             else:
                 print("Exiting Zula System. Goodbye!")
+                if zula.journal:
+                    zula.journal.close()
                 break
         elif current_user: # Actions only if logged in
             if isinstance(current_user, Customer):
@@ -1228,10 +3343,7 @@ def main():
                 if choice == '7': # View My Summary
                     zula.view_driver_summary(current_user.id)
                 elif choice == '8': # End Rest Period
-                    if current_user.is_on_rest:
-                        current_user.is_on_rest = False
-                        if current_user.id in zula.unavailable_drivers:
-                            zula.unavailable_drivers.remove(current_user.id)
+                    if zula.end_driver_rest(current_user.id):
                         print(f"Driver {current_user.name} is now available for rides!")
                     else:
                         print("You are not currently on rest.")
@@ -1358,4 +3470,4 @@ def main():
             print("Invalid choice. Please login or sign up.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(sys.argv[1] if len(sys.argv) > 1 else None) # Optional data directory
\ No newline at end of file